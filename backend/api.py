@@ -1,80 +1,456 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import pandas as pd
-from typing import Dict, Any, List
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
 import asyncio
+import hashlib
+import json
+import os
 import threading
-from main import find_stocks_in_x_strategies
+import time
+from collections import deque
+from cache import SingleFlight
+from events import EventBus
+from export import EXPORT_FORMATS, stream_export
+from leader import LeaderLease
+from metrics import CONTENT_TYPE, FAST_BUCKETS, REGISTRY
+from main import (profile_scan, refresh_strategies, restore_snapshot, scan_strategies, strategy_manager,
+                  upstream_requests)
+from responses import EncodedResponse, ResponseCache
+from scheduler import RefreshScheduler
+from store import SnapshotStore
 
 app = FastAPI()
 
 
 
-# Cache for storing results
+# Strategy counts the API accepts for /search
+MIN_STRATEGIES_RANGE = range(2, 8)
+
+# On-disk snapshot store so restarts come up already serving
+SNAPSHOT_DB_PATH = os.environ.get(
+    "SNAPSHOT_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots.db")
+)
+snapshot_store = SnapshotStore(SNAPSHOT_DB_PATH)
+
+# With several worker processes only the lease holder scrapes; the others serve
+# the snapshots it saves to the shared store, checking for new ones this often
+leader_lease = LeaderLease(os.environ.get("LEADER_LOCK_PATH", SNAPSHOT_DB_PATH + ".lock"))
+WORKER_POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", 5))
+last_refresh_request = {"at": 0.0}
+
+# Cache for storing results: one immutable scan snapshot answers every strategy
+# count. New snapshots are built off to the side and swapped in with a single
+# assignment, so readers always see one complete version.
 cache = {
-    "data": {},
-    "last_updated": None,
+    "snapshot": None,
     "is_loading": False
 }
+publish_lock = threading.Lock()
+
+# Recently published snapshots, newest last, for /changes
+SNAPSHOT_HISTORY = int(os.environ.get("SNAPSHOT_HISTORY", 8))
+snapshot_history = deque(maxlen=SNAPSHOT_HISTORY)
+
+# Response bodies encoded once per snapshot version, with gzip/brotli variants
+encoded_responses = ResponseCache()
+# One-off query responses (custom weights, batches, sorted or filtered searches)
+# are kept apart, so they never push out the pre-built thresholds, and are only
+# compressed for the encoding a client asks for
+query_responses = ResponseCache(max_entries=256)
+
+# Refresh lifecycle events pushed to /events subscribers
+event_bus = EventBus()
+
+# Admin endpoints stay disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+
+# Only one refresh runs at a time, and concurrent scans share one upstream scrape
+refresh_lock = threading.Lock()
+scan_flight = SingleFlight()
+
+# Each strategy is re-scraped on its own adaptive interval (in the leader only),
+# within a budget of upstream page requests per hour
+refresh_scheduler = RefreshScheduler(
+    {name: config.refresh_interval for name, config in strategy_manager.get_all_strategies().items()},
+    min_interval=float(os.environ.get("REFRESH_MIN_INTERVAL", 900)),
+    max_interval=float(os.environ.get("REFRESH_MAX_INTERVAL", 86400)),
+    off_hours_factor=float(os.environ.get("REFRESH_OFF_HOURS_FACTOR", 4)),
+    requests_per_hour=float(os.environ.get("UPSTREAM_REQUESTS_PER_HOUR", 600))
+)
+
+# Serve strategy tables older than this, but revalidate them in the background.
+# By default that is the longest interval the scheduler lets a strategy wait.
+STALE_AFTER_SECONDS = float(os.environ.get("STALE_AFTER_SECONDS", refresh_scheduler.max_interval))
+
+# API instrumentation; scrape and cache metrics are registered by the modules doing the work
+REQUEST_SECONDS = REGISTRY.histogram(
+    "screener_api_request_seconds", "Time to answer an API request", ["endpoint"], FAST_BUCKETS)
+REGISTRY.gauge("screener_snapshot_age_seconds", "Age of the served snapshot").set_function(
+    lambda: cache["snapshot"].age_seconds if cache["snapshot"] is not None else None)
+REGISTRY.gauge("screener_snapshot_version", "Version of the served snapshot").set_function(
+    lambda: cache["snapshot"].version if cache["snapshot"] is not None else None)
+REGISTRY.gauge("screener_refresh_in_progress", "1 while a background refresh runs").set_function(
+    lambda: 1.0 if cache["is_loading"] else 0.0)
+REGISTRY.gauge("screener_event_subscribers", "Connected /events clients").set_function(
+    lambda: event_bus.subscriber_count)
+REGISTRY.gauge("screener_worker_is_leader", "1 in the worker that scrapes for all workers").set_function(
+    lambda: 1.0 if leader_lease.is_leader else 0.0)
+
+def publish_snapshot(snapshot) -> bool:
+    """Atomically make a snapshot the one served, unless it has no data or is older than the current one"""
+    if snapshot.strategy_count == 0:
+        return False
+    
+    with publish_lock:
+        current = cache["snapshot"]
+        if current is not None and current.version >= snapshot.version:
+            return False
+        snapshot_history.append(snapshot)
+        cache["snapshot"] = snapshot
+    return True
+
+def trigger_refresh() -> bool:
+    """Start a background refresh unless one is already running; followers ask the leader instead"""
+    if not leader_lease.is_leader:
+        # One request per poll interval is plenty, the leader picks it up on its next check
+        now = time.monotonic()
+        if now - last_refresh_request["at"] >= WORKER_POLL_SECONDS:
+            last_refresh_request["at"] = now
+            snapshot_store.request_refresh()
+        return True
+    
+    if refresh_lock.locked():
+        return False
+    
+    thread = threading.Thread(target=background_fetch, daemon=True)
+    thread.start()
+    return True
+
+def snapshot_info(snapshot) -> Dict[str, Any]:
+    """Version details for a served snapshot, fixed for the snapshot's lifetime"""
+    if snapshot is None:
+        return {"snapshot_version": None, "last_updated": None}
+    
+    return {
+        "snapshot_version": snapshot.version,
+        "last_updated": snapshot.created_at.isoformat()
+    }
+
+def snapshot_tag(snapshot) -> str:
+    """Version and creation time of a snapshot, the prefix of every ETag derived from it
+
+    Versions restart at 1 when the snapshot store is lost (e.g. a redeploy on
+    an ephemeral disk), so the version alone could revalidate a client's copy
+    of different data.
+    """
+    if snapshot is None:
+        return "v0"
+    return f"v{snapshot.version}-{snapshot.created_at.value // 1000:x}"
+
+def freshness_headers(snapshot) -> Dict[str, str]:
+    """Age and staleness of a served snapshot, sent as headers so bodies can be pre-encoded"""
+    if snapshot is None:
+        return {}
+    
+    return {
+        "Age": str(int(snapshot.age_seconds)),
+        "X-Snapshot-Version": str(snapshot.version),
+        # Partial refreshes renew the snapshot but not every table in it
+        "X-Snapshot-Stale": "true" if snapshot.data_age_seconds > STALE_AFTER_SECONDS else "false"
+    }
+
+def search_payload(snapshot, min_strategies: int, from_cache: bool = True,
+                   request: Optional["SearchRequest"] = None) -> Dict[str, Any]:
+    """The /search response body for a threshold, optionally filtered, sorted and paged"""
+    if request is None or not query_key(request):
+        data: List[Dict[str, Any]] = snapshot.records(min_strategies)
+        total = len(data)
+        paging = {}
+    else:
+        total, data = snapshot.query(
+            min_strategies,
+            sort=request.sort,
+            filters=[(f.column, f.min, f.max) for f in request.filters],
+            limit=request.limit,
+            offset=request.offset
+        )
+        paging = {"offset": request.offset, "limit": request.limit}
+    
+    if not total:
+        return {
+            "success": False,
+            "message": f"No stocks found in {min_strategies}+ strategies",
+            "data": [],
+            "total": 0,
+            **paging,
+            "from_cache": from_cache,
+            **snapshot_info(snapshot)
+        }
+    
+    cached_note = " (cached)" if from_cache else ""
+    return {
+        "success": True,
+        "message": f"Found {total} stocks in {min_strategies}+ strategies{cached_note}",
+        "data": data,
+        "total": total,
+        **paging,
+        "from_cache": from_cache,
+        **snapshot_info(snapshot)
+    }
+
+def query_key(request: "SearchRequest") -> str:
+    """Short digest of a request's sort/filter/page options, empty when it uses none"""
+    options = request.model_dump(exclude={"min_strategies"}, exclude_defaults=True)
+    if not options:
+        return ""
+    return hashlib.sha1(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+
+def encoded_search(snapshot, min_strategies: int, from_cache: bool = True,
+                   request: Optional["SearchRequest"] = None) -> EncodedResponse:
+    """The pre-encoded /search response for a query, built once per snapshot"""
+    options = query_key(request) if request is not None else ""
+    etag = (f"{snapshot_tag(snapshot)}-search-{min_strategies}" + (f"-{options}" if options else "")
+            + ("" if from_cache else "-fresh"))
+    if options:
+        return query_responses.get(etag, lambda: EncodedResponse(
+            search_payload(snapshot, min_strategies, from_cache, request), etag, precompress=False), "/search")
+    return encoded_responses.get(
+        etag, lambda: EncodedResponse(search_payload(snapshot, min_strategies, from_cache, request), etag),
+        "/search"
+    )
+
+def warm_responses(snapshot) -> None:
+    """Encode every threshold's response, and build the subset lattice, ahead of the first request"""
+    for min_strat in MIN_STRATEGIES_RANGE:
+        encoded_search(snapshot, min_strat)
+    snapshot.index.intersections
+    snapshot.index.cooccurrence
+
+def revalidate_if_stale(snapshot) -> None:
+    """Refresh the strategies whose tables are past the staleness limit, through the scheduler
+
+    They are marked due, so the request budget and market hours still apply.
+    Followers leave this to the leader's scheduler.
+    """
+    if snapshot is None or snapshot.data_age_seconds <= STALE_AFTER_SECONDS:
+        return
+    if not leader_lease.is_leader or refresh_lock.locked():
+        return
+    
+    refresh_scheduler.expedite(snapshot.stale_strategies(STALE_AFTER_SECONDS))
+    due = refresh_scheduler.due()
+    if due:
+        print(f"♻️ Snapshot v{snapshot.version} is stale, revalidating {len(due)} strategies in background")
+        threading.Thread(target=refresh_due_strategies, args=(due,), daemon=True).start()
+
+def load_stored_snapshot() -> bool:
+    """Serve the last snapshot saved to disk until the first refresh completes"""
+    try:
+        stored = snapshot_store.load()
+    except Exception as e:
+        print(f"❌ Could not load stored snapshot: {e}")
+        return False
+    
+    if stored is None:
+        print("💾 No stored snapshot found")
+        return False
+    
+    snapshot = restore_snapshot(stored.strategy_data, stored.version, stored.created_at, stored.records,
+                                stored.fetched_at)
+    if publish_snapshot(snapshot):
+        warm_responses(snapshot)
+        print(f"💾 Restored snapshot v{snapshot.version} from {stored.created_at.isoformat()}")
+        return True
+    return False
+
+def sync_from_store() -> bool:
+    """Serve a newer snapshot saved by the leader, if there is one"""
+    latest = snapshot_store.latest_version()
+    current = cache["snapshot"]
+    if latest is None or (current is not None and latest <= current.version):
+        return False
+    
+    if not load_stored_snapshot():
+        return False
+    event_bus.publish("refresh-completed", {"published": True, **snapshot_info(cache["snapshot"])})
+    return True
+
+def record_refreshes(snapshot, rows: Dict[str, int], requests_before: Dict[str, int]) -> None:
+    """Tell the scheduler what each strategy's scrape found and cost; no rows means it failed"""
+    for name, before in requests_before.items():
+        df = snapshot.strategy_data.get(name)
+        failed = not rows.get(name) or df is None
+        refresh_scheduler.record(name, None if failed else df["Name"].tolist(), upstream_requests(name) - before)
+
+def scan_and_publish(refresh: bool, strategy_names: Optional[List[str]] = None, scan=None):
+    """Scan all strategies (or re-scrape just the given ones) and publish the snapshot
+
+    Concurrent callers share one scan. scan, if given, replaces the full scan
+    (e.g. to run it under the profiler) and is called as scan(progress, base).
+    """
+    def run():
+        names = strategy_names if strategy_names is not None else list(strategy_manager.get_all_strategies())
+        total = len(names)
+        completed: Dict[str, int] = {}
+        
+        def progress(strategy_name: str, rows: int):
+            completed[strategy_name] = rows
+            event_bus.publish("strategy-progress", {
+                "strategy": strategy_manager.get_short_name(strategy_name),
+                "rows": rows,
+                "completed": len(completed),
+                "total": total
+            })
+        
+        event_bus.publish("refresh-started", {"refresh": refresh, "total": total})
+        requests_before = {name: upstream_requests(name) for name in names}
+        try:
+            if scan is not None:
+                snapshot = scan(progress, cache["snapshot"])
+            elif strategy_names is not None:
+                snapshot = refresh_strategies(strategy_names, cache["snapshot"], progress)
+            else:
+                snapshot = scan_strategies(refresh=refresh, progress=progress, base=cache["snapshot"])
+        except Exception as e:
+            event_bus.publish("refresh-failed", {"error": str(e)})
+            raise
+        
+        if strategy_names is not None or refresh:
+            record_refreshes(snapshot, completed, requests_before)
+        
+        published = publish_snapshot(snapshot)
+        if published:
+            warm_responses(snapshot)
+            snapshot_store.save(snapshot)
+        
+        current = cache["snapshot"]
+        event_bus.publish("refresh-completed", {
+            "published": published,
+            **snapshot_info(current)
+        })
+        return snapshot
+    
+    # A replacement scan never joins (or is joined by) a plain one
+    key = ("scan", tuple(strategy_names or ())) if scan is None else ("custom-scan", id(scan))
+    return scan_flight.do(key, run)
+
+def set_loading(loading: bool) -> None:
+    """Flag a refresh as running here, and in the store so followers can report it too"""
+    cache["is_loading"] = loading
+    try:
+        snapshot_store.set_leader_loading(loading)
+    except Exception as e:
+        print(f"⚠️ Could not share loading state with other workers: {e}")
+
+def sync_loading_from_store() -> None:
+    """Report the leader's refresh state on a follower, whose own scrapers stay idle"""
+    cache["is_loading"] = snapshot_store.leader_loading()
 
 def background_fetch():
-    """Fetch data in background for common strategy counts"""
-    global cache
-    if cache["is_loading"]:
+    """Scan all strategies in background and publish the snapshot"""
+    if not refresh_lock.acquire(blocking=False):
         return
     
-    cache["is_loading"] = True
+    set_loading(True)
     print("🔄 Starting background data fetch...")
     
     try:
-        # Pre-fetch common strategy counts
-        for min_strat in [2, 3, 4]:
-            print(f"📊 Fetching stocks for {min_strat}+ strategies...")
-            result = find_stocks_in_x_strategies(min_strat)
-            if not result.empty:
-                cache["data"][min_strat] = result.to_dict('records')
-                print(f"✅ Cached {len(cache['data'][min_strat])} stocks for {min_strat}+ strategies")
-        
-        cache["last_updated"] = pd.Timestamp.now()
-        print("🎉 Background fetch completed!")
+        print("📊 Scanning all strategies...")
+        snapshot = scan_and_publish(refresh=True)
+        if snapshot.strategy_count:
+            for min_strat in MIN_STRATEGIES_RANGE:
+                print(f"✅ Cached {len(snapshot.records(min_strat))} stocks for {min_strat}+ strategies")
+            print("🎉 Background fetch completed!")
+        else:
+            print("⚠️ Background fetch returned no data, keeping previous snapshot")
         
     except Exception as e:
         print(f"❌ Background fetch error: {e}")
     finally:
-        cache["is_loading"] = False
+        set_loading(False)
+        refresh_lock.release()
+
+def refresh_due_strategies(strategy_names: List[str]):
+    """Re-scrape the strategies the scheduler says are due and publish the result"""
+    with refresh_lock:
+        set_loading(True)
+        short_names = ", ".join(strategy_manager.get_short_name(name) for name in strategy_names)
+        print(f"⏰ Scheduled refresh of {short_names}")
+        try:
+            snapshot = scan_and_publish(refresh=True, strategy_names=strategy_names)
+            print(f"✅ Snapshot v{snapshot.version} refreshed {short_names}")
+        except Exception as e:
+            print(f"❌ Scheduled refresh error: {e}")
+            for name in strategy_names:
+                refresh_scheduler.record(name, None)
+        finally:
+            set_loading(False)
 
-async def periodic_cache_refresh():
-    """Periodically refresh cache every 3 hours"""
+async def run_refresh_scheduler():
+    """Refresh each strategy whenever its adaptive interval comes round"""
     while True:
         try:
-            # Wait 3 hours (10800 seconds)
-            await asyncio.sleep(10800)
-            
-            print("⏰ 3-hour cache refresh triggered...")
+            # Re-check at least every minute, since full refreshes reschedule strategies too
+            await asyncio.sleep(min(60.0, max(1.0, refresh_scheduler.seconds_until_due())))
+            if refresh_lock.locked():
+                continue
             
-            # Run the background fetch in a thread to avoid blocking
-            def refresh_cache():
-                background_fetch()
-            
-            thread = threading.Thread(target=refresh_cache, daemon=True)
-            thread.start()
+            due = refresh_scheduler.due()
+            if due:
+                # Run the scrape in a thread to avoid blocking
+                await asyncio.to_thread(refresh_due_strategies, due)
             
         except Exception as e:
-            print(f"❌ Periodic cache refresh error: {e}")
+            print(f"❌ Refresh scheduler error: {e}")
             # Continue the loop even if there's an error
             await asyncio.sleep(60)  # Wait 1 minute before retrying
 
+def start_leader_duties():
+    """Scrape now and on the periodic schedule, on behalf of every worker"""
+    # Run initial background fetch in a separate thread
+    trigger_refresh()
+    
+    # Start the per-strategy refresh scheduler
+    asyncio.create_task(run_refresh_scheduler())
+    print("🕐 Started adaptive refresh scheduler")
+
+async def coordinate_workers():
+    """Take over scraping if the leader has gone, otherwise follow its snapshots"""
+    while True:
+        await asyncio.sleep(WORKER_POLL_SECONDS)
+        try:
+            if leader_lease.is_leader:
+                if snapshot_store.take_refresh_request():
+                    print("📨 Refresh requested by another worker")
+                    trigger_refresh()
+                continue
+            
+            # Catch up first, so a new leader's scans continue from the latest version
+            await asyncio.to_thread(sync_from_store)
+            await asyncio.to_thread(sync_loading_from_store)
+            if leader_lease.try_acquire():
+                print(f"👑 Worker {os.getpid()} took over as leader")
+                start_leader_duties()
+        except Exception as e:
+            print(f"❌ Worker coordination error: {e}")
+
 # Start background fetch on startup
 @app.on_event("startup")
 async def startup_event():
-    # Run initial background fetch in a separate thread
-    thread = threading.Thread(target=background_fetch, daemon=True)
-    thread.start()
+    # Serve the last stored snapshot right away, then reconcile with a fresh scan
+    load_stored_snapshot()
+    
+    if leader_lease.try_acquire():
+        print(f"👑 Worker {os.getpid()} is the leader and scrapes for every worker")
+        start_leader_duties()
+    else:
+        print(f"👥 Worker {os.getpid()} follows leader {leader_lease.holder()}, "
+              f"checking the snapshot store every {WORKER_POLL_SECONDS:g}s")
     
-    # Start periodic cache refresh task
-    asyncio.create_task(periodic_cache_refresh())
-    print("🕐 Started periodic cache refresh (every 3 hours)")
+    asyncio.create_task(coordinate_workers())
 
 # CORS for React frontend
 app.add_middleware(
@@ -83,106 +459,439 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Age", "X-Snapshot-Version", "X-Snapshot-Stale"],
 )
 
+class RangeFilter(BaseModel):
+    column: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+
 class SearchRequest(BaseModel):
     min_strategies: int
+    # Column to order by, e.g. "CMPRs." or "-Strategies_Count" for descending
+    sort: Optional[str] = None
+    filters: List[RangeFilter] = []
+    limit: Optional[int] = Field(default=None, ge=1)
+    offset: int = Field(default=0, ge=0)
+
+class BatchQuery(BaseModel):
+    # A threshold, a strategy subset (full or short names), or both
+    min_strategies: Optional[int] = Field(default=None, ge=1)
+    strategies: List[str] = []
+    sort: Optional[str] = None
+    filters: List[RangeFilter] = []
+    limit: Optional[int] = Field(default=None, ge=1)
+    offset: int = Field(default=0, ge=0)
+
+class BatchSearchRequest(BaseModel):
+    queries: List[BatchQuery] = Field(min_length=1, max_length=50)
+
+class RankRequest(BaseModel):
+    # Per-strategy weights by name or short name (e.g. {"S5": 2.0}); others weigh 1
+    weights: Dict[str, float] = {}
+    # Weights for numeric columns, each scaled to 0-1 before weighting
+    column_weights: Dict[str, float] = {}
+    limit: int = Field(default=50, ge=1, le=1000)
+    min_strategies: int = Field(default=1, ge=1)
 
 @app.get("/")
 def root() -> Dict[str, str]:
     return {"message": "API is running"}
 
 @app.get("/status")
-def get_status() -> Dict[str, Any]:
+def get_status(http_request: Request) -> Response:
     """Check loading status and cache info"""
-    return {
-        "is_loading": cache["is_loading"],
-        "cached_strategies": list(cache["data"].keys()),
-        "last_updated": cache["last_updated"].isoformat() if cache["last_updated"] else None,
-        "cache_size": len(cache["data"])
-    }
+    with REQUEST_SECONDS.time(endpoint="/status"):
+        return _get_status(http_request)
+
+def _get_status(http_request: Request) -> Response:
+    snapshot = cache["snapshot"]
+    is_loading = cache["is_loading"]
+    cached_strategies = list(MIN_STRATEGIES_RANGE) if snapshot else []
+    
+    role = "leader" if leader_lease.is_leader else "follower"
+    etag = f"{snapshot_tag(snapshot)}-status-{'loading' if is_loading else 'idle'}-{role}"
+    encoded = encoded_responses.get(etag, lambda: EncodedResponse({
+        "is_loading": is_loading,
+        "cached_strategies": cached_strategies,
+        "cache_size": len(cached_strategies),
+        "role": role,
+        **snapshot_info(snapshot)
+    }, etag), "/status")
+    return encoded.render(http_request, freshness_headers(snapshot))
 
 @app.post("/refresh-cache")
 def refresh_cache_endpoint() -> Dict[str, Any]:
     """Manually trigger cache refresh"""
-    if cache["is_loading"]:
+    # Start refresh in background thread
+    if not trigger_refresh():
         return {
             "success": False,
             "message": "Cache refresh already in progress"
         }
     
-    # Start refresh in background thread
-    thread = threading.Thread(target=background_fetch, daemon=True)
-    thread.start()
+    if not leader_lease.is_leader:
+        return {
+            "success": True,
+            "message": "Cache refresh requested from the leader worker"
+        }
     
     return {
         "success": True,
         "message": "Cache refresh triggered successfully"
     }
 
+def snapshot_for_request():
+    """The snapshot to answer from and whether it was already cached
+
+    Every query is answered from the latest complete snapshot, even a stale
+    one, while a refresh runs in the background. The snapshot is None on a
+    follower that hasn't seen the leader's first scan yet.
+    """
+    snapshot = cache["snapshot"]
+    revalidate_if_stale(snapshot)
+    if snapshot is not None:
+        return snapshot, True
+    
+    # Followers never scrape: the leader's first snapshot may already be stored
+    if not leader_lease.is_leader:
+        sync_from_store()
+        return cache["snapshot"], True
+    
+    # Only scrape when no scan has completed yet; concurrent requests (and a
+    # running refresh) share the same scan instead of starting their own
+    print("🔍 No snapshot yet, waiting on a scan...")
+    return scan_and_publish(refresh=False), False
+
+def batch_payload(snapshot, request: BatchSearchRequest) -> Dict[str, Any]:
+    """Results of several queries against one snapshot, each listing keys into one shared stock map"""
+    stocks: Dict[str, Dict[str, Any]] = {}
+    results = []
+    for query in request.queries:
+        try:
+            positions = snapshot.positions(
+                query.min_strategies,
+                snapshot.resolve_strategies(query.strategies) if query.strategies else None,
+                query.sort,
+                [(f.column, f.min, f.max) for f in query.filters]
+            )
+        except ValueError as e:
+            results.append({"success": False, "message": f"Error: {str(e)}", "keys": [], "total": 0})
+            continue
+        
+        page = positions[query.offset:] if query.limit is None else positions[query.offset:query.offset + query.limit]
+        keys = []
+        for position in page:
+            key = snapshot.index.keys[position]
+            if key not in stocks:
+                stocks[key] = snapshot.stock_record(int(position))
+            keys.append(key)
+        results.append({
+            "success": bool(len(positions)),
+            "keys": keys,
+            "total": len(positions),
+            "offset": query.offset,
+            "limit": query.limit
+        })
+    
+    return {
+        "success": True,
+        "message": f"Answered {len(results)} queries with {len(stocks)} distinct stocks",
+        "results": results,
+        "stocks": stocks,
+        **snapshot_info(snapshot)
+    }
+
 @app.post("/search")
-def search_stocks(request: SearchRequest) -> Dict[str, Any]:
+def search_stocks(request: SearchRequest, http_request: Request) -> Response:
+    with REQUEST_SECONDS.time(endpoint="/search"):
+        return _search_stocks(request, http_request)
+
+def _search_stocks(request: SearchRequest, http_request: Request) -> Response:
     try:
-        if request.min_strategies < 2:
+        # Every accepted threshold has a pre-built response, so others never reach the cache
+        if request.min_strategies not in MIN_STRATEGIES_RANGE:
             return {
                 "success": False,
-                "message": "Minimum strategies must be at least 2",
+                "message": f"Minimum strategies must be between {MIN_STRATEGIES_RANGE.start} "
+                           f"and {MIN_STRATEGIES_RANGE.stop - 1}",
                 "data": [],
                 "total": 0
             }
         
-        # Check if we have cached data
-        if request.min_strategies in cache["data"]:
-            data = cache["data"][request.min_strategies]
+        snapshot, from_cache = snapshot_for_request()
+        if snapshot is None:
             return {
-                "success": True,
-                "message": f"Found {len(data)} stocks in {request.min_strategies}+ strategies (cached)",
-                "data": data,
-                "total": len(data),
-                "from_cache": True
+                "success": False,
+                "message": "Data is still loading, please try again shortly",
+                "data": [],
+                "total": 0
             }
         
-        # If not cached, fetch fresh data
-        print(f"🔍 Fetching fresh data for {request.min_strategies}+ strategies...")
-        result = find_stocks_in_x_strategies(request.min_strategies)
+        encoded = encoded_search(snapshot, request.min_strategies, from_cache, request)
+        return encoded.render(http_request, freshness_headers(snapshot))
         
-        if result.empty:
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Error: {str(e)}",
+            "data": [],
+            "total": 0
+        }
+
+@app.post("/search/batch")
+def batch_search(request: BatchSearchRequest, http_request: Request) -> Response:
+    """Answer many thresholds and strategy subsets from one snapshot, sharing stock records between them"""
+    with REQUEST_SECONDS.time(endpoint="/search/batch"):
+        snapshot, _ = snapshot_for_request()
+        if snapshot is None:
             return {
                 "success": False,
-                "message": f"No stocks found in {request.min_strategies}+ strategies",
-                "data": [],
-                "total": 0,
-                "from_cache": False
+                "message": "Data is still loading, please try again shortly",
+                "results": [],
+                "stocks": {}
             }
         
-        # Convert DataFrame to list of dictionaries
-        data: List[Dict[str, Any]] = result.to_dict('records')
-        
-        # Clean up any problematic values
-        for record in data:
-            for key, value in record.items():
-                if isinstance(value, float):
-                    if pd.isna(value) or value == float('inf') or value == float('-inf'):
-                        record[key] = None
-        
-        # Cache the result
-        cache["data"][request.min_strategies] = data
-        
+        options = request.model_dump(exclude_defaults=True)
+        digest = hashlib.sha1(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+        etag = f"{snapshot_tag(snapshot)}-batch-{digest}"
+        encoded = query_responses.get(
+            etag, lambda: EncodedResponse(batch_payload(snapshot, request), etag, precompress=False), "/search/batch")
+        return encoded.render(http_request, freshness_headers(snapshot))
+
+@app.post("/rank")
+def rank_stocks(request: RankRequest, http_request: Request) -> Response:
+    """Top stocks by weighted confluence score, e.g. counting S5 more than S6a"""
+    with REQUEST_SECONDS.time(endpoint="/rank"):
+        return _rank_stocks(request, http_request)
+
+def _rank_stocks(request: RankRequest, http_request: Request) -> Response:
+    snapshot = cache["snapshot"]
+    if snapshot is None:
         return {
-            "success": True,
-            "message": f"Found {len(data)} stocks in {request.min_strategies}+ strategies",
+            "success": False,
+            "message": "No snapshot available yet",
+            "data": [],
+            "total": 0
+        }
+    revalidate_if_stale(snapshot)
+    
+    options = request.model_dump()
+    digest = hashlib.sha1(json.dumps(options, sort_keys=True).encode()).hexdigest()[:16]
+    etag = f"{snapshot_tag(snapshot)}-rank-{digest}"
+    
+    def build() -> EncodedResponse:
+        total, data = snapshot.rank(request.weights, request.column_weights, request.limit, request.min_strategies)
+        return EncodedResponse({
+            "success": bool(data),
+            "message": f"Top {len(data)} of {total} stocks by weighted score",
             "data": data,
-            "total": len(data),
-            "from_cache": False
+            "total": total,
+            **snapshot_info(snapshot)
+        }, etag, precompress=False)
+    
+    try:
+        encoded = query_responses.get(etag, build, "/rank")
+    except ValueError as e:
+        return {
+            "success": False,
+            "message": f"Error: {str(e)}",
+            "data": [],
+            "total": 0
         }
-        
-    except Exception as e:
+    return encoded.render(http_request, freshness_headers(snapshot))
+
+@app.get("/subsets")
+def get_subsets(http_request: Request, strategies: Optional[str] = None) -> Response:
+    """Stocks common to a comma-separated set of strategies, or the size of every subset when none are given"""
+    with REQUEST_SECONDS.time(endpoint="/subsets"):
+        return _get_subsets(http_request, strategies)
+
+def _get_subsets(http_request: Request, strategies: Optional[str]) -> Response:
+    snapshot = cache["snapshot"]
+    if snapshot is None:
+        return {
+            "success": False,
+            "message": "No snapshot available yet",
+            "data": [],
+            "total": 0
+        }
+    revalidate_if_stale(snapshot)
+    
+    if not strategies:
+        etag = f"{snapshot_tag(snapshot)}-subsets"
+        encoded = encoded_responses.get(etag, lambda: EncodedResponse({
+            "success": True,
+            "message": f"Overlap of all {2 ** len(snapshot.index.strategy_names) - 1} strategy subsets",
+            "data": snapshot.subset_sizes(),
+            **snapshot_info(snapshot)
+        }, etag), "/subsets")
+        return encoded.render(http_request, freshness_headers(snapshot))
+    
+    try:
+        selected = snapshot.resolve_strategies([name.strip() for name in strategies.split(",") if name.strip()])
+    except ValueError as e:
         return {
             "success": False,
             "message": f"Error: {str(e)}",
             "data": [],
             "total": 0
         }
+    
+    short_names = [strategy_manager.get_short_name(name) for name in selected]
+    etag = f"{snapshot_tag(snapshot)}-subsets-{'-'.join(short_names)}"
+    
+    def build() -> EncodedResponse:
+        data = snapshot.subset_records(selected)
+        return EncodedResponse({
+            "success": bool(data),
+            "message": f"Found {len(data)} stocks common to {', '.join(short_names)}",
+            "data": data,
+            "total": len(data),
+            "strategies": short_names,
+            **snapshot_info(snapshot)
+        }, etag, precompress=False)
+    
+    # 127 possible subsets would crowd the pre-built thresholds out of encoded_responses
+    encoded = query_responses.get(etag, build, "/subsets")
+    return encoded.render(http_request, freshness_headers(snapshot))
+
+@app.get("/cooccurrence")
+def get_cooccurrence(http_request: Request) -> Response:
+    """Number of stocks each pair of strategies has in common"""
+    snapshot = cache["snapshot"]
+    if snapshot is None:
+        return {
+            "success": False,
+            "message": "No snapshot available yet"
+        }
+    revalidate_if_stale(snapshot)
+    
+    etag = f"{snapshot_tag(snapshot)}-cooccurrence"
+    encoded = encoded_responses.get(etag, lambda: EncodedResponse({
+        "success": True,
+        **snapshot.cooccurrence(),
+        **snapshot_info(snapshot)
+    }, etag), "/cooccurrence")
+    return encoded.render(http_request, freshness_headers(snapshot))
+
+@app.get("/schedule")
+def get_schedule() -> Dict[str, Any]:
+    """Each strategy's current refresh interval, churn and request cost"""
+    if not leader_lease.is_leader:
+        return {"role": "follower", "leader": leader_lease.holder()}
+    return {"role": "leader", **refresh_scheduler.stats()}
+
+@app.get("/metrics")
+def get_metrics() -> Response:
+    """Prometheus metrics for scraping, parsing, caching and the API"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.post("/admin/profile")
+def profile_refresh(refresh: bool = True, interval_ms: float = 5.0,
+                    output_format: str = Query(default="json", alias="format"),
+                    x_admin_token: Optional[str] = Header(default=None)) -> Response:
+    """Run one refresh under the sampling profiler and return its stage breakdown and folded stacks"""
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        return Response(status_code=404)
+    if not leader_lease.is_leader:
+        return {"success": False, "message": f"Only the leader worker ({leader_lease.holder()}) scrapes, retry there"}
+    if not refresh_lock.acquire(blocking=False):
+        return {"success": False, "message": "Cache refresh already in progress"}
+    
+    profiles = []
+    
+    def profiled_scan(progress, base):
+        snapshot, scan_profile = profile_scan(refresh=refresh, interval=max(interval_ms, 1.0) / 1000,
+                                              progress=progress, base=base)
+        profiles.append(scan_profile)
+        return snapshot
+    
+    set_loading(True)
+    print("🔬 Profiling a full scan...")
+    try:
+        snapshot = scan_and_publish(refresh=refresh, scan=profiled_scan)
+    except Exception as e:
+        print(f"❌ Profiled scan error: {e}")
+        return {"success": False, "message": f"Error: {str(e)}"}
+    finally:
+        set_loading(False)
+        refresh_lock.release()
+    
+    scan_profile = profiles[0]
+    if output_format == "folded":
+        return Response(content=scan_profile.folded, media_type="text/plain")
+    return {"success": True, **snapshot_info(snapshot), **scan_profile.to_dict()}
+
+@app.get("/export")
+def export_snapshot(export_format: str = Query(default="ndjson", alias="format"),
+                    min_strategies: int = 1) -> Response:
+    """Stream every stock in the current snapshot with its strategy flags and scraped columns
+
+    format is ndjson, csv or arrow (an Arrow IPC stream, when pyarrow is installed).
+    """
+    # Times the response setup; the rows stream to the client afterwards
+    with REQUEST_SECONDS.time(endpoint="/export"):
+        return _export_snapshot(export_format, min_strategies)
+
+def _export_snapshot(export_format: str, min_strategies: int) -> Response:
+    snapshot = cache["snapshot"]
+    if snapshot is None:
+        return {"success": False, "message": "No snapshot available yet"}
+    
+    try:
+        chunks = stream_export(snapshot, export_format, min_strategies)
+    except ValueError as e:
+        return {"success": False, "message": f"Error: {str(e)}"}
+    
+    extension = "arrows" if export_format == "arrow" else export_format
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="snapshot-v{snapshot.version}.{extension}"',
+            **freshness_headers(snapshot)
+        }
+    )
+
+@app.get("/events")
+async def stream_events() -> StreamingResponse:
+    """Push refresh-started, strategy-progress and refresh-completed events as Server-Sent Events"""
+    initial = {"id": 0, "event": "snapshot", "data": {"is_loading": cache["is_loading"], **snapshot_info(cache["snapshot"])}}
+    return StreamingResponse(
+        event_bus.stream(initial),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/changes")
+def get_changes(since: int, http_request: Request) -> Response:
+    """Stocks that entered or left each confluence level since a snapshot version"""
+    snapshot = cache["snapshot"]
+    if snapshot is None:
+        return {
+            "success": False,
+            "message": "No snapshot available yet",
+            "full_resync": True
+        }
+    
+    older = next((s for s in list(snapshot_history) if s.version == since), None)
+    if older is None:
+        return {
+            "success": False,
+            "message": f"Version {since} is no longer in history, fetch /search again",
+            "full_resync": True,
+            **snapshot_info(snapshot)
+        }
+    
+    etag = f"{snapshot_tag(snapshot)}-changes-{since}"
+    encoded = encoded_responses.get(etag, lambda: EncodedResponse({
+        "success": True,
+        "full_resync": False,
+        **snapshot.diff(older, MIN_STRATEGIES_RANGE)
+    }, etag), "/changes")
+    return encoded.render(http_request, freshness_headers(snapshot))
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,61 @@
+"""Parse-throughput benchmark for WebScraper page parsing.
+
+Runs every saved screen page in fixtures/ through both parser backends,
+checks they produce the same table and reports pages/sec and the speedup.
+
+Usage (from backend/):
+    python benchmarks/bench_parse.py [--iterations 200]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import WebScraper  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def time_parser(scraper: WebScraper, pages, iterations: int) -> float:
+    """Return parsed pages per second for a scraper over the given pages"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for content in pages:
+            scraper._parse_page(content)
+    elapsed = time.perf_counter() - start
+    return (iterations * len(pages)) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    fixtures = sorted(FIXTURES_DIR.glob("*.html"))
+    pages = [path.read_bytes() for path in fixtures]
+    if not pages:
+        sys.exit(f"No fixtures found in {FIXTURES_DIR}")
+
+    scrapers = {name: WebScraper(parser=name) for name in ("html.parser", "lxml")}
+
+    # Both backends must agree before their speed is worth comparing
+    for path, content in zip(fixtures, pages):
+        baseline = scrapers["html.parser"]._parse_page(content)
+        fast = scrapers["lxml"]._parse_page(content)
+        if not (baseline.data is not None and fast.data is not None and baseline.data.equals(fast.data)
+                and baseline.has_next == fast.has_next and baseline.page_count == fast.page_count):
+            sys.exit(f"Parser output differs for {path.name}")
+
+    results = {name: time_parser(scraper, pages, args.iterations) for name, scraper in scrapers.items()}
+
+    print(f"{len(pages)} fixture pages x {args.iterations} iterations")
+    for name, pages_per_sec in results.items():
+        print(f"  {name:<12} {pages_per_sec:10.1f} pages/sec")
+    print(f"  speedup      {results['lxml'] / results['html.parser']:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
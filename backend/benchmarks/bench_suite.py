@@ -0,0 +1,189 @@
+"""End-to-end benchmark suite run against the local Screener stand-in.
+
+Measures parse throughput, cold scan time per scraper backend, refresh
+(revalidation) time and /search latency at several screen sizes, and
+writes the results as JSON so runs can be compared. With --compare, any
+metric that got worse than a previous run by more than --threshold is
+reported and the exit status is 1, so this can gate a deploy.
+
+Usage (from backend/):
+    python benchmarks/bench_suite.py [--pages 2 8 20] [--output results.json]
+    python benchmarks/bench_suite.py --compare baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from standin import FIXTURES_DIR, StandInConfig, StandInServer  # noqa: E402
+
+
+def metric(results: List[Dict[str, Any]], name: str, value: float, unit: str, better: str,
+           **params: Any) -> None:
+    results.append({"name": name, "value": round(value, 6), "unit": unit, "better": better, "params": params})
+    print(f"  {name:<40} {value:12.4f} {unit}", file=sys.stderr)
+
+
+def latency_metrics(results: List[Dict[str, Any]], name: str, samples: List[float], **params: Any) -> None:
+    """Record p50/p95/mean of latency samples given in seconds"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    metric(results, f"{name}.p50", statistics.median(ordered) * 1000, "ms", "lower", **params)
+    metric(results, f"{name}.p95", p95 * 1000, "ms", "lower", **params)
+    metric(results, f"{name}.mean", statistics.fmean(ordered) * 1000, "ms", "lower", **params)
+
+
+def bench_parse(results: List[Dict[str, Any]], iterations: int) -> None:
+    from bench_parse import time_parser
+    from main import WebScraper
+
+    pages = [path.read_bytes() for path in sorted(FIXTURES_DIR.glob("*.html"))]
+    for parser in ("html.parser", "lxml"):
+        pages_per_sec = time_parser(WebScraper(parser=parser), pages, iterations)
+        metric(results, f"parse.{parser}", pages_per_sec, "pages/s", "higher", iterations=iterations)
+
+
+def bench_size(results: List[Dict[str, Any]], server: StandInServer, pages: int, requests: int) -> None:
+    """Cold scan, refresh and /search latency for screens of one size"""
+    import api
+    import main
+    from fastapi.testclient import TestClient
+    from responses import ResponseCache
+
+    server.config.pages = pages
+    rows = server.config.rows_per_screen
+    snapshot = None
+
+    for backend in ("sync", "async"):
+        analyzer = main.StockAnalyzer(main.StrategyManager(), scraper_backend=backend)
+        server.reset_stats()
+        started = time.perf_counter()
+        snapshot = analyzer.scan()
+        metric(results, f"scan.cold.{backend}", time.perf_counter() - started, "s", "lower",
+               rows_per_screen=rows, requests=server.stats.get("requests", 0))
+
+        # Pages are stale immediately (page TTL 0), so a refresh revalidates page 1 of every
+        # screen and, finding them unchanged, stops there
+        server.reset_stats()
+        started = time.perf_counter()
+        analyzer.scan(refresh=True)
+        metric(results, f"scan.refresh.{backend}", time.perf_counter() - started, "s", "lower",
+               rows_per_screen=rows, requests=server.stats.get("requests", 0),
+               not_modified=server.stats.get("304", 0))
+
+    api.encoded_responses = ResponseCache()
+    api.query_responses = ResponseCache(max_entries=256)
+    api.cache["snapshot"] = snapshot
+    client = TestClient(api.app)
+
+    def timed(body: Dict[str, Any]) -> float:
+        started = time.perf_counter()
+        response = client.post("/search", json=body)
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"/search returned {response.status_code}: {response.text[:200]}")
+        return elapsed
+
+    latency_metrics(results, "search.default", [timed({"min_strategies": 2}) for _ in range(requests)],
+                    rows_per_screen=rows)
+    # A new offset each time misses the response cache, so these measure the vectorized query itself
+    query = {"min_strategies": 2, "sort": "-CMPRs.", "filters": [{"column": "P/E", "max": 60}], "limit": 20}
+    latency_metrics(results, "search.query_uncached",
+                    [timed({**query, "offset": i}) for i in range(requests)], rows_per_screen=rows)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: List[Dict[str, Any]], baseline_path: Path, threshold: float) -> List[str]:
+    """Describe every metric that regressed by more than threshold against a baseline run"""
+    baseline = {
+        (entry["name"], json.dumps(entry["params"].get("rows_per_screen"))): entry
+        for entry in json.loads(baseline_path.read_text())["results"]
+    }
+    regressions = []
+    for entry in current:
+        old = baseline.get((entry["name"], json.dumps(entry["params"].get("rows_per_screen"))))
+        if old is None or not old["value"]:
+            continue
+        change = (entry["value"] - old["value"]) / old["value"]
+        worse = change > threshold if entry["better"] == "lower" else change < -threshold
+        if worse:
+            rows = entry["params"].get("rows_per_screen")
+            label = entry["name"] + (f" [{rows} rows]" if rows else "")
+            regressions.append(f"{label}: {old['value']:.4f} -> {entry['value']:.4f} {entry['unit']} ({change:+.1%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 8, 20],
+                        help="pagination depths to benchmark, 25 rows per page")
+    parser.add_argument("--latency", type=float, default=0.02, help="stand-in response latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered 429")
+    parser.add_argument("--parse-iterations", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200, help="/search requests per size")
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="previous JSON results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    config = StandInConfig(latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    with StandInServer(config) as server, tempfile.TemporaryDirectory() as workdir:
+        # main and api read these at import time
+        os.environ["SCREENER_BASE_URL"] = server.base_url
+        os.environ["SNAPSHOT_DB_PATH"] = os.path.join(workdir, "snapshots.db")
+        import main  # noqa: F401
+        logging.getLogger().setLevel(logging.WARNING)
+
+        results: List[Dict[str, Any]] = []
+        print("parse", file=sys.stderr)
+        bench_parse(results, args.parse_iterations)
+        for pages in args.pages:
+            print(f"{pages * config.rows_per_page} rows per screen", file=sys.stderr)
+            bench_size(results, server, pages, args.requests)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()}
+        },
+        "results": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    else:
+        print(output)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""Local stand-in for screener.in that replays the recorded screen pages.
+
+Rows from the pages in fixtures/ are recombined into screens of any size,
+so scrapes exercise the real markup without touching the live site. Each
+screen draws its stocks from one shared universe, which gives the
+strategies realistic overlap. Latency, pagination depth and injected 500s
+or 429s are all configurable. ETag/If-None-Match is honoured, so refreshes
+can revalidate.
+
+Point the scrapers at it with SCREENER_BASE_URL. Usage (from backend/):
+    python benchmarks/standin.py [--port 8765] [--pages 4] [--latency 0.05]
+    SCREENER_BASE_URL=http://127.0.0.1:8765 uvicorn api:app
+"""
+import argparse
+import copy
+import hashlib
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import lxml.html
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+SCREEN_PATH = re.compile(r"^/screens/(\d+)/[^/]+/?$")
+PAGINATION = re.compile(r'<div class="pagination">.*?</div>', re.S)
+RESULT_COUNT = re.compile(r'[\d,]+ results found: Showing page \d+ of \d+')
+
+# Screener repeats the header row every this many rows
+HEADER_EVERY = 15
+
+
+@dataclass
+class StandInConfig:
+    """How the stand-in behaves; fields may be changed while it is running"""
+    rows_per_page: int = 25
+    pages: int = 4
+    # Universe size as a multiple of one screen, lower means more overlap between screens
+    universe_factor: float = 2.5
+    latency: float = 0.05
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: int = 1
+    etags: bool = True
+    # Without numbered links the scraper can't fetch pages in parallel and follows Next instead
+    page_links: bool = True
+    # Show only this many page numbers, from the current page on, like a windowed paginator
+    page_window: Optional[int] = None
+    seed: int = 7
+
+    @property
+    def rows_per_screen(self) -> int:
+        return self.rows_per_page * self.pages
+
+
+class FixtureCorpus:
+    """Header and row templates cut out of the recorded pages"""
+
+    def __init__(self, fixtures_dir: Path = FIXTURES_DIR):
+        paths = sorted(fixtures_dir.glob("*.html"))
+        if not paths:
+            raise FileNotFoundError(f"No fixtures found in {fixtures_dir}")
+
+        page = paths[0].read_text(encoding="utf-8")
+        tbody_start = page.index("<tbody>") + len("<tbody>")
+        tbody_end = page.index("</tbody>")
+        self.prefix, self.suffix = page[:tbody_start], page[tbody_end:]
+
+        self.header = ""
+        self.rows: List[str] = []
+        seen = set()
+        for path in paths:
+            root = lxml.html.parse(str(path)).getroot()
+            for tr in root.xpath("//table//tr"):
+                if tr.xpath("./th"):
+                    if not self.header:
+                        self.header = lxml.html.tostring(tr, encoding="unicode")
+                    continue
+                cells = tr.xpath("./td")
+                link = cells[1].find(".//a") if len(cells) > 1 else None
+                name = cells[1].text_content().strip() if len(cells) > 1 else ""
+                if link is None or not name or name in seen:
+                    continue
+                seen.add(name)
+                template = copy.deepcopy(tr)
+                template_cells = template.xpath("./td")
+                template_cells[0].text = "__SNO__."
+                template_cells[1].find(".//a").text = "__NAME__"
+                self.rows.append((name, lxml.html.tostring(template, encoding="unicode")))
+
+    def row(self, stock_id: int, serial: int) -> str:
+        """Row for a stock, renaming recycled templates so every stock id is a distinct company"""
+        name, template = self.rows[stock_id % len(self.rows)]
+        cycle = stock_id // len(self.rows)
+        if cycle:
+            name = f"{name} {cycle + 1}"
+        return template.replace("__SNO__", str(serial)).replace("__NAME__", name)
+
+
+class StandInServer:
+    """Threaded HTTP server serving synthetic screens; use as a context manager"""
+
+    def __init__(self, config: Optional[StandInConfig] = None, port: int = 0,
+                 fixtures_dir: Path = FIXTURES_DIR):
+        self.config = config or StandInConfig()
+        self.corpus = FixtureCorpus(fixtures_dir)
+        self.stats: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._pages: Dict[Tuple, Tuple[bytes, str]] = {}
+        self._revisions: Dict[int, int] = {}
+        self._failures: Dict[Tuple[int, int], List[int]] = {}
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.stats = {}
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def revise(self, screen_id: int) -> None:
+        """Swap the last stock of a screen for a new company, changing only its last page"""
+        with self._lock:
+            self._revisions[screen_id] = self._revisions.get(screen_id, 0) + 1
+
+    def fail(self, screen_id: int, page: int, times: int = 1, status: int = 500) -> None:
+        """Answer the next few requests for one page of a screen with an error (a 429 sends Retry-After)"""
+        with self._lock:
+            self._failures.setdefault((screen_id, page), []).extend([status] * times)
+
+    def _take_failure(self, screen_id: int, page: int) -> Optional[int]:
+        with self._lock:
+            queued = self._failures.get((screen_id, page))
+            return queued.pop(0) if queued else None
+
+    def screen_stocks(self, screen_id: int) -> List[int]:
+        """Stock ids listed by a screen, drawn from the universe shared by every screen"""
+        config = self.config
+        universe = max(config.rows_per_screen, int(config.rows_per_screen * config.universe_factor))
+        stocks = sorted(random.Random(config.seed * 1_000_003 + screen_id).sample(range(universe),
+                                                                                   config.rows_per_screen))
+        revision = self._revisions.get(screen_id, 0)
+        if revision:
+            stocks[-1] = universe + revision
+        return stocks
+
+    def render(self, screen_id: int, page: int) -> Tuple[bytes, str]:
+        """Body and ETag of one page of a screen, rendered once per configuration"""
+        config = self.config
+        key = (screen_id, page, config.rows_per_page, config.pages, config.universe_factor, config.seed,
+               config.page_links, config.page_window, self._revisions.get(screen_id, 0))
+        cached = self._pages.get(key)
+        if cached is not None:
+            return cached
+
+        stocks = self.screen_stocks(screen_id)
+        start = (page - 1) * config.rows_per_page
+        rows = [self.corpus.header]
+        for offset, stock_id in enumerate(stocks[start:start + config.rows_per_page]):
+            if offset and offset % HEADER_EVERY == 0:
+                rows.append(self.corpus.header)
+            rows.append(self.corpus.row(stock_id, start + offset + 1))
+
+        links = [
+            f'<span class="button button-primary">{number}</span>' if number == page
+            else f'<a class="button button-secondary" href="?page={number}">{number}</a>'
+            for number in range(1, config.pages + 1)
+            if config.page_window is None or page <= number < page + config.page_window
+        ] if config.page_links else []
+        if page < config.pages:
+            links.append(f'<a class="button button-secondary" href="?page={page + 1}">Next <i class="icon-right"></i></a>')
+        pagination = '<div class="pagination">\n' + "\n".join(links) + "\n</div>"
+
+        html = self.corpus.prefix + "\n".join(rows) + self.corpus.suffix
+        html = RESULT_COUNT.sub(f"{config.rows_per_screen} results found: Showing page {page} of {config.pages}",
+                                html, count=1)
+        body = PAGINATION.sub(lambda _: pagination, html, count=1).encode("utf-8")
+        rendered = (body, '"%s"' % hashlib.md5(body).hexdigest())
+        self._pages[key] = rendered
+        return rendered
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                config = server.config
+                server._count("requests")
+                delay = config.latency + (server._random.uniform(0, config.jitter) if config.jitter else 0.0)
+                if delay > 0:
+                    time.sleep(delay)
+
+                parsed = urlparse(self.path)
+                match = SCREEN_PATH.match(parsed.path)
+                page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+                if match is None or page < 1 or page > config.pages:
+                    server._count("404")
+                    return self._send(404, b"")
+
+                status = server._take_failure(int(match.group(1)), page)
+                if status is not None:
+                    server._count(str(status))
+                    headers = {"Retry-After": str(config.retry_after)} if status == 429 else {}
+                    return self._send(status, b"", headers)
+                with server._lock:
+                    roll = server._random.random()
+                if roll < config.throttle_rate:
+                    server._count("429")
+                    return self._send(429, b"", {"Retry-After": str(config.retry_after)})
+                if roll < config.throttle_rate + config.error_rate:
+                    server._count("500")
+                    return self._send(500, b"")
+
+                body, etag = server.render(int(match.group(1)), page)
+                if config.etags and self.headers.get("If-None-Match") == etag:
+                    server._count("304")
+                    return self._send(304, b"", {"ETag": etag})
+
+                server._count("200")
+                server._count("bytes", len(body))
+                return self._send(200, body, {"ETag": etag} if config.etags else {})
+
+            def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if status != 304:
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=4, help="pagination depth of every screen")
+    parser.add_argument("--rows-per-page", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered 429")
+    args = parser.parse_args()
+
+    config = StandInConfig(rows_per_page=args.rows_per_page, pages=args.pages, latency=args.latency,
+                           jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    with StandInServer(config, port=args.port) as server:
+        print(f"Serving {config.rows_per_screen} rows per screen at {server.base_url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
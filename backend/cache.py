@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its expiry time and optional HTTP validators"""
+    value: Any
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.stored_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that let the server answer 304 if the entry is unchanged"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache with a TTL per entry
+
+    Expired entries are not returned by get() but stay available through
+    get_entry() until evicted, so their validators can be used to revalidate.
+    """
+
+    def __init__(self, max_entries: int = 128, default_ttl: float = 3600.0):
+        self.max_entries = max(1, max_entries)
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a fresh value, or default if missing or expired"""
+        entry = self.get_entry(key)
+        if entry is None or not entry.is_fresh:
+            return default
+        return entry.value
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Get an entry whether or not it has expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> CacheEntry:
+        """Store a value, evicting the least recently used entries beyond max_entries"""
+        ttl = self.default_ttl if ttl is None else ttl
+        entry = CacheEntry(value, time.monotonic() + ttl, etag, last_modified)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def touch(self, key: Hashable, ttl: Optional[float] = None) -> Optional[CacheEntry]:
+        """Extend an entry's lifetime after it was revalidated"""
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + ttl
+                entry.stored_at = time.monotonic()
+                self._entries.move_to_end(key)
+            return entry
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop one entry, returning whether it existed"""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches the predicate"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Iterate over fresh (key, value) pairs"""
+        with self._lock:
+            entries = list(self._entries.items())
+        return ((key, entry.value) for key, entry in entries if entry.is_fresh)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self.get_entry(key)
+        return entry is not None and entry.is_fresh
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time; concurrent callers share its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the run already in flight and return its result"""
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class EventBus:
+    """Fans out events published from any thread to asyncio subscribers as Server-Sent Events"""
+
+    def __init__(self, max_queue: int = 100, heartbeat_seconds: float = 15.0):
+        self.max_queue = max_queue
+        self.heartbeat_seconds = heartbeat_seconds
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+        self._event_id = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a queue on the running event loop that will receive every event"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        # A slow client loses its oldest events rather than holding up everyone else
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(event)
+
+    def publish(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Send an event to every subscriber; safe to call from any thread"""
+        with self._lock:
+            self._event_id += 1
+            event = {"id": self._event_id, "event": event_type, "data": {**(data or {}), "ts": time.time()}}
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:  # the subscriber's loop has closed
+                self.unsubscribe(queue)
+
+    @staticmethod
+    def format(event: Dict[str, Any]) -> str:
+        """Render an event in text/event-stream format"""
+        return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+    async def stream(self, initial: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Yield SSE messages for one client until it disconnects, with periodic heartbeats"""
+        queue = self.subscribe()
+        try:
+            # Tell clients how long to wait before reconnecting
+            yield "retry: 5000\n\n"
+            if initial is not None:
+                yield self.format(initial)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield self.format(event)
+        finally:
+            self.unsubscribe(queue)
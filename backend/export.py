@@ -0,0 +1,160 @@
+import csv
+import io
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from responses import dumps
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow export is unavailable
+    pa = None
+
+# Media type of each export format
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream"
+}
+
+
+def export_columns(snapshot) -> Tuple[List[str], List[str]]:
+    """Strategy flag columns (short names) and scraped columns, in a fixed order"""
+    flags = list(snapshot.short_names.values())
+    scraped = [column for column in dict.fromkeys(column for record in snapshot.index.records for column in record)
+               if column != 'Name']
+    return flags, scraped
+
+
+def _chunks(snapshot, positions: np.ndarray, chunk_size: int) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """Positions in slices, with every strategy's membership flags for each slice"""
+    index = snapshot.index
+    bits = {name: bit for bit, name in enumerate(index.strategy_names)}
+    for start in range(0, len(positions), chunk_size):
+        chunk = positions[start:start + chunk_size]
+        masks = index.masks[chunk]
+        # Strategies that returned no data this scan list nobody
+        flags = {
+            short: ((masks >> bits[name]) & 1).astype(bool) if name in bits else np.zeros(len(chunk), dtype=bool)
+            for name, short in snapshot.short_names.items()
+        }
+        yield chunk, flags
+
+
+def _scraped_value(value):
+    return None if value is None or pd.isna(value) else value
+
+
+def stream_ndjson(snapshot, positions: np.ndarray, chunk_size: int = 500) -> Iterator[bytes]:
+    """One JSON object per stock per line"""
+    index = snapshot.index
+    _, scraped = export_columns(snapshot)
+    for chunk, flags in _chunks(snapshot, positions, chunk_size):
+        lines = []
+        for offset, position in enumerate(chunk):
+            record = index.records[position]
+            row = {'Name': record['Name'], 'Strategies_Count': int(index.counts[position])}
+            row.update((short, bool(values[offset])) for short, values in flags.items())
+            row.update((column, _scraped_value(record.get(column))) for column in scraped)
+            lines.append(dumps(row))
+        yield b'\n'.join(lines) + b'\n'
+
+
+def stream_csv(snapshot, positions: np.ndarray, chunk_size: int = 500) -> Iterator[bytes]:
+    """A header row, then one row per stock with strategy flags as 0/1"""
+    index = snapshot.index
+    flag_columns, scraped = export_columns(snapshot)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['Name', 'Strategies_Count', *flag_columns, *scraped])
+    for chunk, flags in _chunks(snapshot, positions, chunk_size):
+        for offset, position in enumerate(chunk):
+            record = index.records[position]
+            writer.writerow([
+                record['Name'],
+                int(index.counts[position]),
+                *(int(values[offset]) for values in flags.values()),
+                *(_scraped_value(record.get(column)) for column in scraped)
+            ])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class _ChunkSink:
+    """File-like object collecting what an Arrow writer emits until it is drained"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def stream_arrow(snapshot, positions: np.ndarray, chunk_size: int = 500) -> Iterator[bytes]:
+    """An Arrow IPC stream with one record batch per chunk; numeric columns are float64"""
+    if pa is None:
+        raise ValueError("Arrow export needs pyarrow installed")
+
+    index = snapshot.index
+    flag_columns, scraped = export_columns(snapshot)
+    fields = [pa.field('Name', pa.string()), pa.field('Strategies_Count', pa.int64())]
+    fields += [pa.field(column, pa.bool_()) for column in flag_columns]
+    fields += [pa.field(column, pa.float64() if column in index.numeric else pa.string()) for column in scraped]
+    schema = pa.schema(fields)
+
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode='w'), schema) as writer:
+        yield sink.drain()
+        for chunk, flags in _chunks(snapshot, positions, chunk_size):
+            records = [index.records[position] for position in chunk]
+            arrays = [
+                pa.array([record['Name'] for record in records], pa.string()),
+                pa.array(index.counts[chunk], pa.int64()),
+                *(pa.array(flags[column], pa.bool_()) for column in flag_columns)
+            ]
+            for column in scraped:
+                if column in index.numeric:
+                    arrays.append(pa.array(index.numeric[column][chunk], pa.float64(), from_pandas=True))
+                else:
+                    arrays.append(pa.array([_scraped_value(record.get(column)) for record in records], pa.string()))
+            writer.write_batch(pa.record_batch(arrays, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+STREAMERS = {
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+    "arrow": stream_arrow
+}
+
+
+def stream_export(snapshot, export_format: str, min_strategies: int = 1,
+                  chunk_size: int = 500) -> Iterator[bytes]:
+    """Stream every stock in at least min_strategies strategies, by count then name, in chunks
+
+    Raises ValueError up front for an unknown format or missing pyarrow, so
+    the caller can answer with an error instead of a broken stream.
+    """
+    if export_format not in STREAMERS:
+        raise ValueError(f"Unknown export format: {export_format}, expected one of {', '.join(STREAMERS)}")
+    if export_format == "arrow" and pa is None:
+        raise ValueError("Arrow export needs pyarrow installed")
+    positions = snapshot.index.at_least(max(1, min_strategies))
+    return STREAMERS[export_format](snapshot, positions, max(1, chunk_size))
@@ -0,0 +1,62 @@
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # no flock (Windows): every process runs as its own leader
+    fcntl = None
+
+
+class LeaderLease:
+    """Exclusive lock file held by the one worker process allowed to scrape
+
+    The lock is an flock on an open file, so the OS releases it when the
+    holder exits or crashes and another worker can take over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Become the leader if nobody else is, without blocking"""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+
+        # Record the holder for anyone inspecting the lock file
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+    def holder(self) -> Optional[int]:
+        """PID written by the current (or last) leader"""
+        if self.is_leader:
+            return os.getpid()
+        try:
+            with open(self.path) as f:
+                return int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
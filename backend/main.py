@@ -1,14 +1,33 @@
 import requests
+import httpx
 from bs4 import BeautifulSoup, Tag
+import lxml.html
+import numpy as np
 import pandas as pd
+import asyncio
+import contextvars
+import hashlib
+import os
+import re
 import time
 import logging
-from typing import Dict, List, Set, Optional, Tuple, Union
-from dataclasses import dataclass
+import threading
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from types import MappingProxyType
+from typing import AsyncIterator, Callable, Dict, List, Mapping, Set, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
 import sys
 from urllib.parse import urljoin, urlparse
 
+from cache import CacheEntry, TTLCache
+from metrics import FAST_BUCKETS, REGISTRY, SCAN_BUCKETS
+from ratelimit import AdaptiveRateLimiter, THROTTLE_STATUSES
+from scoring import ConfluenceScorer
+from tracing import Profile, in_context, profile, span, traced
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,6 +39,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Override to point the scrapers at a mirror or the benchmark stand-in server
+SCREENER_BASE_URL = os.environ.get("SCREENER_BASE_URL", "https://www.screener.in").rstrip('/')
+
+# Called with (strategy_name, rows) as each strategy finishes during a scan
+ProgressCallback = Callable[[str, int], None]
+
+# Scrape and scan instrumentation, served by the API at /metrics
+PAGE_FETCH_SECONDS = REGISTRY.histogram(
+    'screener_page_fetch_seconds', 'Time to fetch one screen page', ['strategy'])
+PAGE_RESPONSES = REGISTRY.counter(
+    'screener_page_responses_total', 'Screen page responses by HTTP status', ['strategy', 'status'])
+PAGE_CACHE = REGISTRY.counter(
+    'screener_page_cache_total',
+    'Page cache lookups: fresh hit, revalidated by 304, downloaded but unchanged, or downloaded', ['result'])
+FETCH_RETRIES = REGISTRY.counter(
+    'screener_fetch_retries_total', 'Page fetch attempts that were retried', ['strategy', 'reason'])
+DOWNLOADED_BYTES = REGISTRY.counter(
+    'screener_downloaded_bytes_total', 'Bytes of screen pages downloaded', ['strategy'])
+PARSE_SECONDS = REGISTRY.histogram(
+    'screener_parse_seconds', 'Time to parse one screen page', ['parser'], FAST_BUCKETS)
+PARSE_FALLBACKS = REGISTRY.counter(
+    'screener_parse_fallbacks_total', 'Pages the lxml fast path handed to BeautifulSoup')
+STRATEGY_SCRAPE_SECONDS = REGISTRY.histogram(
+    'screener_strategy_scrape_seconds', 'Time to scrape every page of a strategy', ['strategy'], SCAN_BUCKETS)
+STRATEGY_ROWS = REGISTRY.gauge(
+    'screener_strategy_rows', 'Rows in the latest scrape of each strategy', ['strategy'])
+SCRAPE_SHORT_CIRCUITS = REGISTRY.counter(
+    'screener_scrape_short_circuits_total', 'Scrapes that stopped after page 1 because the screen was unchanged',
+    ['strategy'])
+STRATEGY_CACHE = REGISTRY.counter(
+    'screener_strategy_cache_total', 'Strategy table cache lookups', ['result'])
+SCAN_SECONDS = REGISTRY.histogram(
+    'screener_scan_duration_seconds', 'Time to scan every strategy', ['refresh'], SCAN_BUCKETS)
+
+
+def screen_label(url: str) -> str:
+    """Metric label for a screen or page URL, e.g. 'strategy1'"""
+    parsed = urlparse(url)
+    parts = [part for part in parsed.path.split('/') if part]
+    return parts[-1] if parts else parsed.netloc
+
 
 class StrategyType(Enum):
     """Enumeration of available investment strategies"""
@@ -39,6 +99,8 @@ class StrategyConfig:
     url: str
     display_name: str
     short_name: str
+    # Starting refresh interval in seconds; the scheduler adapts it to how often the screen changes
+    refresh_interval: float = 3 * 3600
 
 
 @dataclass
@@ -48,63 +110,113 @@ class StockData:
     cmp: str
     strategies: List[str]
     strategy_count: int
+    metrics: Dict[str, str] = field(default_factory=dict)
+    
+    @classmethod
+    def from_record(cls, record: Mapping[str, object], strategies: List[str]) -> 'StockData':
+        """Build from a table row, keeping every other Screener column as a metric"""
+        return cls(
+            name=record['Name'],
+            cmp=record.get('CMPRs.', '-'),
+            strategies=strategies,
+            strategy_count=len(strategies),
+            metrics={
+                column: value for column, value in record.items()
+                if column not in ('Name', 'CMPRs.') and pd.notna(value)
+            }
+        )
     
     def to_dict(self) -> Dict[str, Union[str, int]]:
         """Convert to dictionary for API responses"""
         return {
             'Name': self.name,
             'CMPRs.': self.cmp,
+            **self.metrics,
             'Strategies_Count': self.strategy_count,
             'Strategies': ', '.join(self.strategies)
         }
 
 
+@dataclass
+class ParsedPage:
+    """Table data and pagination info extracted from one screen page"""
+    data: Optional[pd.DataFrame]
+    has_next: bool
+    page_count: Optional[int]
+    # Rows in the whole screen ("93 results found"), and a hash of this page's table and that count
+    result_count: Optional[int] = None
+    fingerprint: Optional[str] = None
+
+
+@dataclass
+class ScrapeState:
+    """Page fingerprints and combined table from the last full scrape of a screen"""
+    fingerprints: Tuple[Optional[str], ...]
+    result_count: Optional[int]
+    data: pd.DataFrame
+    # Scrapes answered from page 1 alone since the last full walk
+    quiet_runs: int = 0
+
+
 class StrategyManager:
     """Manages all strategy configurations and mappings"""
     
     def __init__(self):
         self.strategies: Dict[str, StrategyConfig] = {
+            # Starting refresh intervals follow each screen's data cadence, then the scheduler adapts them.
+            # Daily volume and price action move through the session
             StrategyType.STRATEGY1.value: StrategyConfig(
                 name="Strategy1",
-                url="https://www.screener.in/screens/2902497/strategy1/",
+                url=f"{SCREENER_BASE_URL}/screens/2902497/strategy1/",
                 display_name="Strategy 1",
-                short_name="S1"
+                short_name="S1",
+                refresh_interval=3600
             ),
             StrategyType.STRATEGY2.value: StrategyConfig(
                 name="Strategy2",
-                url="https://www.screener.in/screens/2902503/strategy2/",
+                url=f"{SCREENER_BASE_URL}/screens/2902503/strategy2/",
                 display_name="Strategy 2",
-                short_name="S2"
+                short_name="S2",
+                refresh_interval=3600
             ),
+            # FII holdings only change with quarterly shareholding filings
             StrategyType.STRATEGY3.value: StrategyConfig(
                 name="Strategy3",
-                url="https://www.screener.in/screens/2902506/strategy3/",
+                url=f"{SCREENER_BASE_URL}/screens/2902506/strategy3/",
                 display_name="Strategy 3",
-                short_name="S3"
+                short_name="S3",
+                refresh_interval=24 * 3600
             ),
+            # Volume turns over intraday, FII holdings barely at all
             StrategyType.STRATEGY4.value: StrategyConfig(
                 name="Strategy4",
-                url="https://www.screener.in/screens/2902508/strategy4/",
+                url=f"{SCREENER_BASE_URL}/screens/2902508/strategy4/",
                 display_name="Strategy 4",
-                short_name="S4"
+                short_name="S4",
+                refresh_interval=2 * 3600
             ),
+            # SEPA trend templates rest on daily closes
             StrategyType.STRATEGY5.value: StrategyConfig(
                 name="Strategy5",
-                url="https://www.screener.in/screens/2902511/strategy5/",
+                url=f"{SCREENER_BASE_URL}/screens/2902511/strategy5/",
                 display_name="Strategy 5",
-                short_name="S5"
+                short_name="S5",
+                refresh_interval=4 * 3600
             ),
+            # MACD crossovers build over several sessions
             StrategyType.STRATEGY6A.value: StrategyConfig(
                 name="Strategy6a",
-                url="https://www.screener.in/screens/2902519/strategy6a/",
+                url=f"{SCREENER_BASE_URL}/screens/2902519/strategy6a/",
                 display_name="Strategy 6a",
-                short_name="S6a"
+                short_name="S6a",
+                refresh_interval=2 * 3600
             ),
             StrategyType.STRATEGY6B.value: StrategyConfig(
                 name="Strategy6b",
-                url="https://www.screener.in/screens/2902525/strategy6b/",
+                url=f"{SCREENER_BASE_URL}/screens/2902525/strategy6b/",
                 display_name="Strategy 6b",
-                short_name="S6b"
+                short_name="S6b",
+                refresh_interval=2 * 3600
             )
         }
     
@@ -122,21 +234,77 @@ class StrategyManager:
         return strategy.short_name if strategy else strategy_name
 
 
-class WebScraper:
-    """Robust web scraper with retry logic and error handling"""
+
+class BaseScraper:
+    """Shared configuration and HTML parsing for the sync and async scrapers"""
     
-    def __init__(self, max_retries: int = 3, delay: float = 0.5):
+    # Columns every screen table must have; the rest are kept as they come
+    REQUIRED_COLUMNS = ['Name', 'CMPRs.']
+    
+    # Located in the raw page so an unchanged download can be recognised without parsing it
+    TABLE_PATTERN = re.compile(rb'<table\b.*?</table>', re.S | re.I)
+    RESULT_COUNT_PATTERN = re.compile(rb'([\d,]+)\s+results?\s+found')
+    WHITESPACE_PATTERN = re.compile(rb'\s+')
+    
+    def __init__(self, max_retries: int = 3, delay: float = 0.5, max_concurrent_per_host: int = 4,
+                 max_requests_per_second: float = 8.0, parser: str = "lxml",
+                 page_cache: Optional[TTLCache] = None, page_ttl: float = 0.0,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        if parser not in ("lxml", "html.parser"):
+            raise ValueError(f"Unknown parser: {parser}")
+        
         self.max_retries = max_retries
         self.delay = delay
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.parser = parser
+        # Pages stay cached past their TTL so they can be revalidated with a conditional request
+        self.page_cache = page_cache if page_cache is not None else TTLCache(max_entries=512, default_ttl=page_ttl)
+        self.page_ttl = page_ttl
+        self.max_concurrent_per_host = max(1, max_concurrent_per_host)
+        # Pass one limiter to every scraper that should share a host's request budget
+        self.rate_limiter = rate_limiter if rate_limiter is not None else AdaptiveRateLimiter(
+            initial_rate=max_requests_per_second
+        )
+        self._lxml_parser = lxml.html.HTMLParser(encoding='utf-8')
+        # A change past page 1 that keeps the result count is invisible to the quick
+        # check, so every this many quiet scrapes the whole screen is walked anyway
+        self.verify_every = 6
+        self._scrapes: Dict[str, ScrapeState] = {}
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept-Encoding': 'gzip, deflate, br',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
-        })
+        }
+    
+    def _reserve_request_slot(self, url: str) -> float:
+        """Reserve the next request start for the URL's host and return how long to wait"""
+        return self.rate_limiter.reserve(url)
+    
+    def _record_response(self, page_url: str, latency: float, status: Optional[int] = None,
+                         retry_after: Optional[str] = None, size: int = 0) -> None:
+        """Feed one response, or a failed request when status is None, to the rate limiter and metrics"""
+        self.rate_limiter.record(page_url, latency, status, retry_after)
+        label = screen_label(page_url)
+        PAGE_FETCH_SECONDS.observe(latency, strategy=label)
+        PAGE_RESPONSES.inc(strategy=label, status=str(status) if status is not None else 'error')
+        if size:
+            DOWNLOADED_BYTES.inc(size, strategy=label)
+    
+    @staticmethod
+    def _record_retry(page_url: str, status: Optional[int]) -> None:
+        reason = 'throttled' if status in THROTTLE_STATUSES else 'error'
+        FETCH_RETRIES.inc(strategy=screen_label(page_url), reason=reason)
+    
+    def _retry_wait(self, attempt: int, status: Optional[int]) -> Optional[float]:
+        """Seconds to back off before retrying a failed attempt, or None when retrying won't help"""
+        if status in THROTTLE_STATUSES:
+            # The rate limiter already holds the host until its Retry-After
+            return 0.0
+        if status is not None and 400 <= status < 500:
+            return None
+        return self.delay * (2 ** attempt)  # Exponential backoff
     
     def _has_next_button(self, soup: BeautifulSoup) -> bool:
         """Check if pagination has a next button"""
@@ -155,6 +323,7 @@ class WebScraper:
             logger.warning(f"Error checking pagination: {e}")
             return False
     
+    @traced("extract_table")
     def _extract_table_data(self, soup: BeautifulSoup) -> Optional[pd.DataFrame]:
         """Extract stock data from HTML table"""
         try:
@@ -227,13 +396,6 @@ class WebScraper:
             if 'S.No.' in df.columns:
                 df = df.drop('S.No.', axis=1)
             
-            # Keep only required columns
-            required_columns = ['Name', 'CMPRs.']
-            available_columns = [col for col in required_columns if col in df.columns]
-            
-            if available_columns:
-                df = df[available_columns]
-            
             # Clean data - remove invalid entries and duplicates
             df = df.dropna(subset=['Name'])
             df = df[df['Name'].str.strip() != '']
@@ -249,54 +411,377 @@ class WebScraper:
             logger.error(f"Error extracting table data: {e}")
             return None
     
+    def _get_page_count(self, soup: BeautifulSoup) -> Optional[int]:
+        """Read the total number of pages from the pagination links"""
+        try:
+            pagination = soup.find('div', class_='pagination')
+            if not pagination or not isinstance(pagination, Tag):
+                return None
+            
+            page_numbers = []
+            for element in pagination.find_all(['a', 'span']):
+                text = element.get_text(strip=True)
+                if text.isdigit():
+                    page_numbers.append(int(text))
+            
+            return max(page_numbers) if page_numbers else None
+        except Exception as e:
+            logger.warning(f"Error reading page count: {e}")
+            return None
+    
+    @staticmethod
+    def _lxml_text(element: lxml.html.HtmlElement) -> str:
+        """Concatenate stripped text nodes, matching BeautifulSoup's get_text(strip=True)"""
+        return ''.join(text.strip() for text in element.itertext())
+    
+    @traced("extract_table")
+    def _extract_table_data_lxml(self, root: lxml.html.HtmlElement) -> Optional[pd.DataFrame]:
+        """Extract every column of the first table from an lxml tree"""
+        table = root.find('.//table')
+        if table is None:
+            return None
+        
+        header_row = table.find('.//thead')
+        if header_row is None:
+            header_row = table.find('.//tr')
+            if header_row is None:
+                return None
+        
+        headers = [text for text in (self._lxml_text(cell) for cell in header_row.xpath('.//th | .//td')) if text]
+        if not headers:
+            return None
+        
+        # Anything unusual goes through the full BeautifulSoup path instead
+        if (not all(col in headers for col in self.REQUIRED_COLUMNS) or len(headers) < 2 or
+                len(set(headers)) != len(headers)):
+            raise ValueError("table does not have the expected columns")
+        
+        column_names = [col for col in headers if col != 'S.No.']
+        column_indices = [headers.index(col) for col in column_names]
+        name_position = column_names.index('Name')
+        columns: List[List[str]] = [[] for _ in column_names]
+        
+        tbody = table.find('.//tbody')
+        if tbody is not None:
+            row_elements = tbody.iter('tr')
+        else:
+            row_elements = table.findall('.//tr')[1:]
+        
+        seen_names: Set[str] = set()
+        for tr in row_elements:
+            cells = tr.xpath('.//td | .//th')
+            if len(cells) != len(headers):
+                continue
+            
+            # Validate row data - filter out header rows and invalid data
+            first = self._lxml_text(cells[0])
+            second = self._lxml_text(cells[1])
+            if (not first or first in ('Name', 'S.No.') or
+                    second in ('......', 'CMPRs.', 'CMP Rs.')):
+                continue
+            
+            values = [
+                first if index == 0 else second if index == 1 else self._lxml_text(cells[index])
+                for index in column_indices
+            ]
+            
+            # Clean data - remove invalid entries and duplicates
+            name = values[name_position]
+            if not name.strip() or name.strip() in ('S.No.', 'Name') or name in seen_names:
+                continue
+            seen_names.add(name)
+            
+            for column, value in zip(columns, values):
+                column.append(value)
+        
+        if not columns[name_position]:
+            return None
+        
+        return pd.DataFrame(dict(zip(column_names, columns)))
+    
+    def _parse_page_lxml(self, content: bytes) -> ParsedPage:
+        """Parse a page with lxml, reading only the first table and the pagination links"""
+        root = lxml.html.document_fromstring(content, parser=self._lxml_parser)
+        
+        has_next = False
+        page_count = None
+        paginations = root.xpath('//div[contains(concat(" ", normalize-space(@class), " "), " pagination ")]')
+        if paginations:
+            link_texts = [self._lxml_text(link) for link in paginations[0].iter('a')]
+            has_next = any(text.lower().startswith('next') for text in link_texts)
+            page_numbers = [
+                int(text) for text in (self._lxml_text(el) for el in paginations[0].iter('a', 'span'))
+                if text.isdigit()
+            ]
+            page_count = max(page_numbers) if page_numbers else None
+        
+        return ParsedPage(self._extract_table_data_lxml(root), has_next, page_count)
+    
+    @traced("parse")
+    def _parse_page(self, content: bytes) -> ParsedPage:
+        """Parse a fetched page, falling back to BeautifulSoup when the fast path can't handle it"""
+        if self.parser == "lxml":
+            started = time.perf_counter()
+            try:
+                parsed = self._parse_page_lxml(content)
+                PARSE_SECONDS.observe(time.perf_counter() - started, parser="lxml")
+                return parsed
+            except Exception as e:
+                PARSE_FALLBACKS.inc()
+                logger.debug(f"lxml parse failed, falling back to html.parser: {e}")
+        
+        with PARSE_SECONDS.time(parser="html.parser"):
+            soup = BeautifulSoup(content, 'html.parser')
+            return ParsedPage(self._extract_table_data(soup), self._has_next_button(soup), self._get_page_count(soup))
+    
+    def _store_page(self, page_url: str, response_headers: Mapping[str, str], parsed: ParsedPage) -> None:
+        """Cache a parsed page along with the validators the server sent for it"""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if etag or last_modified or self.page_ttl > 0 or parsed.fingerprint:
+            self.page_cache.set(page_url, parsed, ttl=self.page_ttl, etag=etag, last_modified=last_modified)
+    
+    @classmethod
+    def _page_fingerprint(cls, content: bytes) -> Tuple[Optional[str], Optional[int]]:
+        """Hash of a page's table rows and result count, plus the count, read without parsing the page"""
+        table = cls.TABLE_PATTERN.search(content)
+        if table is None:
+            return None, None
+        count = cls.RESULT_COUNT_PATTERN.search(content)
+        digest = hashlib.blake2b(cls.WHITESPACE_PATTERN.sub(b' ', table.group(0)), digest_size=16)
+        digest.update(count.group(0) if count else b'')
+        return digest.hexdigest(), int(count.group(1).replace(b',', b'')) if count else None
+    
+    def _reuse_unchanged_page(self, page_url: str, entry: Optional[CacheEntry], fingerprint: Optional[str],
+                              response_headers: Mapping[str, str]) -> Optional[ParsedPage]:
+        """The cached page when a fresh download has the same fingerprint, so it needn't be parsed again"""
+        if entry is None or fingerprint is None or entry.value.fingerprint != fingerprint:
+            return None
+        PAGE_CACHE.inc(result="unchanged")
+        self._store_page(page_url, response_headers, entry.value)
+        return entry.value
+    
+    def _unchanged_screen(self, url: str, first: ParsedPage) -> Optional[pd.DataFrame]:
+        """The last scrape's table when page 1 and the result count still match it"""
+        state = self._scrapes.get(url)
+        if state is None or first.fingerprint is None or first.result_count is None:
+            return None
+        if first.fingerprint != state.fingerprints[0] or first.result_count != state.result_count:
+            return None
+        if state.quiet_runs >= self.verify_every:
+            return None
+        
+        state.quiet_runs += 1
+        SCRAPE_SHORT_CIRCUITS.inc(strategy=screen_label(url))
+        logger.info(f"Page 1 and result count unchanged, reusing {len(state.data)} records for {url}")
+        return state.data
+    
+    @staticmethod
+    def _walk_complete(pages: List[ParsedPage]) -> bool:
+        """Whether a walk reached the screen's last page rather than stopping at a failed one"""
+        first = pages[0]
+        if first.result_count is not None and sum(len(parsed.data) for parsed in pages) == first.result_count:
+            return True
+        return not pages[-1].has_next and len(pages) >= (first.page_count or 1)
+    
+    def forget_scrapes(self, url: Optional[str] = None) -> None:
+        """Drop the remembered fingerprints of one screen, or of every screen"""
+        if url is None:
+            self._scrapes.clear()
+        else:
+            self._scrapes.pop(url, None)
+    
+    def _combine_pages(self, url: str, pages: List[ParsedPage]) -> pd.DataFrame:
+        """Concatenate a screen's pages, handing back the previous table itself if no page changed"""
+        complete = self._walk_complete(pages)
+        fingerprints = tuple(parsed.fingerprint for parsed in pages)
+        state = self._scrapes.get(url)
+        if complete and state is not None and None not in fingerprints and fingerprints == state.fingerprints:
+            state.quiet_runs = 0
+            return state.data
+        
+        with span("concat"):
+            final_df = pd.concat([parsed.data for parsed in pages], ignore_index=True)
+        if complete:
+            self._scrapes[url] = ScrapeState(fingerprints, pages[0].result_count, final_df)
+        else:
+            # A truncated table must never be handed back by the page 1 check
+            logger.warning(f"Walk of {url} stopped after {len(pages)} pages, not remembering it")
+            self.forget_scrapes(url)
+        return final_df
+    
+    @staticmethod
+    def _page_url(url: str, page: int) -> str:
+        """Build the URL for a given page of a screen"""
+        return f"{url}?page={page}" if '?' not in url else f"{url}&page={page}"
+
+
+class WebScraper(BaseScraper):
+    """Robust web scraper with retry logic and error handling"""
+    
+    def __init__(self, max_retries: int = 3, delay: float = 0.5, max_concurrent_per_host: int = 4,
+                 max_requests_per_second: float = 8.0, parser: str = "lxml",
+                 page_cache: Optional[TTLCache] = None, page_ttl: float = 0.0,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        super().__init__(max_retries, delay, max_concurrent_per_host, max_requests_per_second, parser,
+                         page_cache, page_ttl, rate_limiter)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+    
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Get the semaphore capping concurrent requests to the host of a URL"""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_concurrent_per_host)
+                self._host_slots[host] = slot
+            return slot
+    
+    def _wait_for_rate_budget(self, url: str) -> None:
+        """Space out request starts to the same host to stay within the rate budget"""
+        wait = self._reserve_request_slot(url)
+        if wait > 0:
+            with span("rate_wait"):
+                time.sleep(wait)
+    
+    @traced("fetch_page")
+    def _fetch_page(self, page_url: str) -> Optional[ParsedPage]:
+        """Fetch and parse a single page, revalidating cached copies and retrying transient failures"""
+        entry = self.page_cache.get_entry(page_url)
+        if entry is not None and entry.is_fresh:
+            PAGE_CACHE.inc(result="hit")
+            return entry.value
+        headers = entry.conditional_headers() if entry is not None else {}
+        
+        for attempt in range(self.max_retries):
+            status = None
+            started = time.monotonic()
+            try:
+                self._wait_for_rate_budget(page_url)
+                with self._host_slot(page_url), span("http"):
+                    started = time.monotonic()
+                    response = self.session.get(page_url, timeout=15, headers=headers)
+                status = response.status_code
+                self._record_response(page_url, time.monotonic() - started, status,
+                                      response.headers.get('Retry-After'), len(response.content))
+                if status == 304 and entry is not None:
+                    PAGE_CACHE.inc(result="revalidated")
+                    self.page_cache.touch(page_url, self.page_ttl)
+                    return entry.value
+                response.raise_for_status()
+                fingerprint, result_count = self._page_fingerprint(response.content)
+                unchanged = self._reuse_unchanged_page(page_url, entry, fingerprint, response.headers)
+                if unchanged is not None:
+                    return unchanged
+                parsed = self._parse_page(response.content)
+                parsed.fingerprint, parsed.result_count = fingerprint, result_count
+                self._store_page(page_url, response.headers, parsed)
+                PAGE_CACHE.inc(result="miss")
+                return parsed
+            except Exception as e:
+                if status is None:
+                    self._record_response(page_url, time.monotonic() - started)
+                logger.warning(f"Attempt {attempt + 1} failed for {page_url}: {e}")
+                wait = self._retry_wait(attempt, status)
+                if wait is None:
+                    break
+                if attempt < self.max_retries - 1:
+                    self._record_retry(page_url, status)
+                if attempt < self.max_retries - 1 and wait > 0:
+                    time.sleep(wait)
+        
+        logger.error(f"Failed to fetch {page_url} after {self.max_retries} attempts")
+        return None
+    
+    def _fetch_remaining_pages(self, url: str, page_count: int) -> List[ParsedPage]:
+        """Fetch pages 2..page_count concurrently and return them in page order"""
+        pages = list(range(2, page_count + 1))
+        page_data: Dict[int, Optional[ParsedPage]] = {}
+        
+        def fetch(page: int) -> Optional[ParsedPage]:
+            return self._fetch_page(self._page_url(url, page))
+        
+        workers = min(self.max_concurrent_per_host, len(pages))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-fetch") as executor:
+            futures = {executor.submit(in_context(fetch), page): page for page in pages}
+            for future in as_completed(futures):
+                page = futures[future]
+                try:
+                    page_data[page] = future.result()
+                except Exception as e:
+                    logger.warning(f"Error fetching page {page} of {url}: {e}")
+                    page_data[page] = None
+        
+        # Stop at the first missing page, as the serial walk would
+        ordered = []
+        for page in pages:
+            parsed = page_data.get(page)
+            if parsed is None or parsed.data is None or parsed.data.empty:
+                logger.info(f"No data found on page {page}")
+                break
+            ordered.append(parsed)
+            logger.info(f"Scraped page {page}: {len(parsed.data)} records")
+        return ordered
+    
+    @traced("scrape", lambda self, url, *args, **kwargs: {"strategy": screen_label(url)})
     def scrape_strategy_data(self, url: str) -> pd.DataFrame:
         """Scrape stock data from a strategy URL with pagination support"""
         logger.info(f"Starting to scrape: {url}")
         
-        all_data = []
+        all_pages: List[ParsedPage] = []
         page = 1
         
         while True:
             # Build page URL
-            page_url = f"{url}?page={page}" if '?' not in url else f"{url}&page={page}"
+            page_url = self._page_url(url, page)
             
             # Attempt to fetch page with retries
-            soup = None
-            for attempt in range(self.max_retries):
-                try:
-                    response = self.session.get(page_url, timeout=15)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    break
-                except Exception as e:
-                    logger.warning(f"Attempt {attempt + 1} failed for {page_url}: {e}")
-                    if attempt < self.max_retries - 1:
-                        time.sleep(self.delay * (2 ** attempt))  # Exponential backoff
-            
-            if not soup:
-                logger.error(f"Failed to fetch {page_url} after {self.max_retries} attempts")
+            parsed = self._fetch_page(page_url)
+            if not parsed:
                 break
             
             # Extract data from current page
-            page_df = self._extract_table_data(soup)
+            page_df = parsed.data
             if page_df is None or page_df.empty:
                 logger.info(f"No data found on page {page}")
                 break
             
-            all_data.append(page_df)
+            # A quiet screen is answered from its first page
+            if page == 1:
+                unchanged = self._unchanged_screen(url, parsed)
+                if unchanged is not None:
+                    return unchanged
+            
+            all_pages.append(parsed)
             logger.info(f"Scraped page {page}: {len(page_df)} records")
             
             # Check for next page
-            if not self._has_next_button(soup):
+            if not parsed.has_next:
                 logger.info(f"No more pages found. Stopping at page {page}")
                 break
             
+            # Fetch the rest in parallel when the first page tells us how many there are
+            if page == 1:
+                page_count = parsed.page_count
+                if page_count and page_count > 1:
+                    logger.info(f"Fetching remaining {page_count - 1} pages concurrently")
+                    fetched = self._fetch_remaining_pages(url, page_count)
+                    all_pages.extend(fetched)
+                    # A windowed paginator shows fewer numbers than there are pages,
+                    # so follow Next on from the last numbered page
+                    if len(fetched) < page_count - 1 or not all_pages[-1].has_next:
+                        break
+                    page = page_count
+            
+            # The shared rate limiter spaces requests, so no fixed pause between pages
             page += 1
-            time.sleep(self.delay)  # Be respectful to the server
         
         # Combine all pages
-        if all_data:
-            final_df = pd.concat(all_data, ignore_index=True)
+        if all_pages:
+            final_df = self._combine_pages(url, all_pages)
             logger.info(f"Successfully scraped {len(final_df)} total records from {url}")
             return final_df
         
@@ -304,19 +789,729 @@ class WebScraper:
         return pd.DataFrame()
 
 
+class AsyncWebScraper(BaseScraper):
+    """Non-blocking scraper built on a pooled, keep-alive httpx.AsyncClient"""
+    
+    def __init__(self, max_retries: int = 3, delay: float = 0.5, max_concurrent_per_host: int = 4,
+                 max_requests_per_second: float = 8.0, max_connections: int = 20,
+                 keepalive_expiry: float = 30.0, timeout: float = 15.0, parser: str = "lxml",
+                 page_cache: Optional[TTLCache] = None, page_ttl: float = 0.0,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        super().__init__(max_retries, delay, max_concurrent_per_host, max_requests_per_second, parser,
+                         page_cache, page_ttl, rate_limiter)
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        # asyncio primitives belong to one event loop, so host slots are kept per loop
+        self._host_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+    
+    @asynccontextmanager
+    async def client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """Open a pooled client that can be shared by every scrape in a scan"""
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        async with httpx.AsyncClient(headers=self.headers, limits=limits,
+                                     timeout=httpx.Timeout(self.timeout),
+                                     follow_redirects=True) as client:
+            yield client
+    
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        """Get the semaphore capping concurrent requests to the host of a URL"""
+        loop = asyncio.get_running_loop()
+        slots = self._host_slots.setdefault(loop, {})
+        host = urlparse(url).netloc
+        if host not in slots:
+            slots[host] = asyncio.Semaphore(self.max_concurrent_per_host)
+        return slots[host]
+    
+    @traced("fetch_page")
+    async def _fetch_page(self, client: httpx.AsyncClient, page_url: str) -> Optional[ParsedPage]:
+        """Fetch and parse a single page, revalidating cached copies without blocking the event loop"""
+        entry = self.page_cache.get_entry(page_url)
+        if entry is not None and entry.is_fresh:
+            PAGE_CACHE.inc(result="hit")
+            return entry.value
+        headers = entry.conditional_headers() if entry is not None else {}
+        
+        for attempt in range(self.max_retries):
+            status = None
+            started = time.monotonic()
+            try:
+                wait = self._reserve_request_slot(page_url)
+                if wait > 0:
+                    with span("rate_wait"):
+                        await asyncio.sleep(wait)
+                async with self._host_slot(page_url):
+                    with span("http"):
+                        started = time.monotonic()
+                        response = await client.get(page_url, headers=headers)
+                status = response.status_code
+                self._record_response(page_url, time.monotonic() - started, status,
+                                      response.headers.get('Retry-After'), len(response.content))
+                if status == 304 and entry is not None:
+                    PAGE_CACHE.inc(result="revalidated")
+                    self.page_cache.touch(page_url, self.page_ttl)
+                    return entry.value
+                response.raise_for_status()
+                fingerprint, result_count = self._page_fingerprint(response.content)
+                unchanged = self._reuse_unchanged_page(page_url, entry, fingerprint, response.headers)
+                if unchanged is not None:
+                    return unchanged
+                parsed = await asyncio.to_thread(self._parse_page, response.content)
+                parsed.fingerprint, parsed.result_count = fingerprint, result_count
+                self._store_page(page_url, response.headers, parsed)
+                PAGE_CACHE.inc(result="miss")
+                return parsed
+            except Exception as e:
+                if status is None:
+                    self._record_response(page_url, time.monotonic() - started)
+                logger.warning(f"Attempt {attempt + 1} failed for {page_url}: {e}")
+                wait = self._retry_wait(attempt, status)
+                if wait is None:
+                    break
+                if attempt < self.max_retries - 1:
+                    self._record_retry(page_url, status)
+                if attempt < self.max_retries - 1 and wait > 0:
+                    await asyncio.sleep(wait)
+        
+        logger.error(f"Failed to fetch {page_url} after {self.max_retries} attempts")
+        return None
+    
+    async def _fetch_page_number(self, client: httpx.AsyncClient, url: str, page: int) -> Optional[ParsedPage]:
+        """Fetch one numbered page of a screen"""
+        return await self._fetch_page(client, self._page_url(url, page))
+    
+    @traced("scrape", lambda self, url, *args, **kwargs: {"strategy": screen_label(url)})
+    async def scrape_strategy_data(self, url: str, client: Optional[httpx.AsyncClient] = None) -> pd.DataFrame:
+        """Scrape stock data from a strategy URL with pagination support"""
+        if client is None:
+            async with self.client() as own_client:
+                return await self.scrape_strategy_data(url, own_client)
+        
+        logger.info(f"Starting to scrape: {url}")
+        
+        all_pages: List[ParsedPage] = []
+        page = 1
+        
+        while True:
+            parsed = await self._fetch_page(client, self._page_url(url, page))
+            if not parsed:
+                break
+            
+            page_df = parsed.data
+            if page_df is None or page_df.empty:
+                logger.info(f"No data found on page {page}")
+                break
+            
+            # A quiet screen is answered from its first page
+            if page == 1:
+                unchanged = self._unchanged_screen(url, parsed)
+                if unchanged is not None:
+                    return unchanged
+            
+            all_pages.append(parsed)
+            logger.info(f"Scraped page {page}: {len(page_df)} records")
+            
+            if not parsed.has_next:
+                logger.info(f"No more pages found. Stopping at page {page}")
+                break
+            
+            # Fetch the rest in parallel when the first page tells us how many there are
+            if page == 1:
+                page_count = parsed.page_count
+                if page_count and page_count > 1:
+                    logger.info(f"Fetching remaining {page_count - 1} pages concurrently")
+                    pages = range(2, page_count + 1)
+                    results = await asyncio.gather(
+                        *(self._fetch_page_number(client, url, p) for p in pages),
+                        return_exceptions=True
+                    )
+                    # Stop at the first missing page, as the serial walk would
+                    for p, page_parsed in zip(pages, results):
+                        if (isinstance(page_parsed, BaseException) or page_parsed is None
+                                or page_parsed.data is None or page_parsed.data.empty):
+                            logger.info(f"No data found on page {p}")
+                            break
+                        all_pages.append(page_parsed)
+                        logger.info(f"Scraped page {p}: {len(page_parsed.data)} records")
+                    # A windowed paginator shows fewer numbers than there are pages,
+                    # so follow Next on from the last numbered page
+                    if len(all_pages) < page_count or not all_pages[-1].has_next:
+                        break
+                    page = page_count
+            
+            page += 1
+        
+        if all_pages:
+            final_df = self._combine_pages(url, all_pages)
+            logger.info(f"Successfully scraped {len(final_df)} total records from {url}")
+            return final_df
+        
+        logger.warning(f"No data scraped from {url}")
+        return pd.DataFrame()
+
+
+class StrategyIndex:
+    """Inverted index from normalized stock name to a bitmask of the strategies listing it"""
+    
+    def __init__(self, strategy_names: List[str], keys: List[str], masks: np.ndarray,
+                 records: List[Dict[str, str]]):
+        self.strategy_names = strategy_names
+        self.keys = keys
+        self.masks = masks
+        self.records = records
+        self.counts = self._popcount(masks)
+        self.positions = {key: position for position, key in enumerate(keys)}
+        
+        # Precomputed orderings let threshold queries slice instead of sort
+        names = [record['Name'] for record in records]
+        self.count_order = np.array(
+            sorted(range(len(keys)), key=lambda i: (-self.counts[i], names[i])), dtype=np.intp
+        )
+        self.name_order = np.array(sorted(range(len(keys)), key=lambda i: names[i]), dtype=np.intp)
+        self._sorted_counts = self.counts[self.count_order]
+        self._name_rank = np.empty(len(keys), dtype=np.float64)
+        self._name_rank[self.name_order] = np.arange(len(keys))
+        
+        # Screener values are parsed to floats once per index so queries never touch strings
+        self.numeric = self._parse_numeric_columns(records)
+        self._scorer: Optional[ConfluenceScorer] = None
+        self._intersections: Optional[Dict[int, np.ndarray]] = None
+        self._cooccurrence: Optional[np.ndarray] = None
+    
+    @staticmethod
+    def parse_numbers(values: List[object]) -> np.ndarray:
+        """Parse Indian-formatted numbers like '1,84,196.86' into floats, with blanks as NaN"""
+        cleaned = pd.Series(values, dtype=object).astype(str).str.replace(',', '', regex=False).str.strip()
+        return pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=np.float64)
+    
+    @classmethod
+    def _parse_numeric_columns(cls, records: List[Dict[str, str]]) -> Dict[str, np.ndarray]:
+        """Typed arrays, aligned with positions, for every column that is mostly numbers"""
+        columns = [col for col in dict.fromkeys(col for record in records for col in record) if col != 'Name']
+        numeric = {}
+        for column in columns:
+            raw = [record.get(column) for record in records]
+            values = cls.parse_numbers(raw)
+            present = sum(1 for value in raw if pd.notna(value) and str(value).strip() not in ('', '-'))
+            if present and np.count_nonzero(~np.isnan(values)) * 2 >= present:
+                numeric[column] = values
+        return numeric
+    
+    @staticmethod
+    def _popcount(masks: np.ndarray) -> np.ndarray:
+        """Count the set bits of every mask"""
+        counts = np.zeros(len(masks), dtype=np.int64)
+        remaining = masks.copy()
+        while remaining.any():
+            counts += remaining & 1
+            remaining >>= 1
+        return counts
+    
+    @classmethod
+    def build(cls, all_data: Dict[str, pd.DataFrame]) -> 'StrategyIndex':
+        """Build the index from per-strategy tables, keeping each stock's first-seen row"""
+        strategy_names = list(all_data.keys())
+        positions: Dict[str, int] = {}
+        keys: List[str] = []
+        masks: List[int] = []
+        records: List[Dict[str, str]] = []
+        
+        for bit, (strategy_name, df) in enumerate(all_data.items()):
+            if 'Name' not in df.columns:
+                continue
+            columns = list(df.columns)
+            for values in df.itertuples(index=False, name=None):
+                record = dict(zip(columns, values))
+                key = str(record['Name']).strip()
+                position = positions.get(key)
+                if position is None:
+                    positions[key] = len(keys)
+                    keys.append(key)
+                    masks.append(1 << bit)
+                    records.append(record)
+                else:
+                    masks[position] |= 1 << bit
+                    # Screens show different columns; fill in the ones the first row lacked
+                    merged = records[position]
+                    for column, value in record.items():
+                        if pd.notna(value) and pd.isna(merged.get(column)):
+                            merged[column] = value
+        
+        return cls(strategy_names, keys, np.array(masks, dtype=np.int64), records)
+    
+    def mask_for(self, strategy_names: List[str]) -> int:
+        """Bitmask covering the given strategies"""
+        mask = 0
+        for strategy_name in strategy_names:
+            if strategy_name in self.strategy_names:
+                mask |= 1 << self.strategy_names.index(strategy_name)
+        return mask
+    
+    def strategies_for(self, mask: int) -> List[str]:
+        """Strategy names whose bits are set in a mask, in index order"""
+        return [name for bit, name in enumerate(self.strategy_names) if mask & (1 << bit)]
+    
+    def at_least(self, min_strategies: int) -> np.ndarray:
+        """Positions of stocks in at least min_strategies strategies, by count desc then name"""
+        # count_order is sorted by descending count, so matches form a prefix
+        matches = int(np.searchsorted(-self._sorted_counts, -min_strategies, side='right'))
+        return self.count_order[:matches]
+    
+    def containing_all(self, mask: int) -> np.ndarray:
+        """Positions of stocks listed by every strategy in the mask, by name"""
+        intersection = self.intersections.get(mask)
+        if intersection is not None:
+            return intersection
+        ordered_masks = self.masks[self.name_order]
+        return self.name_order[(ordered_masks & mask) == mask]
+    
+    @property
+    def intersections(self) -> Dict[int, np.ndarray]:
+        """Positions, by name, of the stocks common to each non-empty strategy subset, keyed by mask
+
+        Seven strategies make only 127 subsets, so the whole lattice is built on first use.
+        """
+        if self._intersections is None:
+            ordered_masks = self.masks[self.name_order]
+            self._intersections = {
+                mask: self.name_order[(ordered_masks & mask) == mask]
+                for mask in range(1, 1 << len(self.strategy_names))
+            }
+        return self._intersections
+    
+    @property
+    def cooccurrence(self) -> np.ndarray:
+        """Stocks shared by each pair of strategies, in index order; the diagonal is each strategy's size"""
+        if self._cooccurrence is None:
+            bits = np.arange(len(self.strategy_names), dtype=np.int64)
+            membership = (self.masks[:, None] >> bits) & 1
+            self._cooccurrence = membership.T @ membership
+        return self._cooccurrence
+    
+    def canonical_masks(self, strategy_order: List[str]) -> np.ndarray:
+        """Masks re-keyed to a fixed strategy order, so indexes built from different scans compare"""
+        canonical = np.zeros(len(self.masks), dtype=np.int64)
+        for bit, strategy_name in enumerate(self.strategy_names):
+            if strategy_name in strategy_order:
+                target = 1 << strategy_order.index(strategy_name)
+                canonical |= np.where(self.masks & (1 << bit), target, 0)
+        return canonical
+    
+    @property
+    def scorer(self) -> ConfluenceScorer:
+        """Weighted confluence scorer over this index, built on first use"""
+        if self._scorer is None:
+            self._scorer = ConfluenceScorer(self.strategy_names, self.masks, self.numeric, self._name_rank)
+        return self._scorer
+    
+    def column_values(self, column: str) -> np.ndarray:
+        """Typed values of a column for filtering and sorting, aligned with positions"""
+        if column == 'Strategies_Count':
+            return self.counts.astype(np.float64)
+        if column == 'Name':
+            return self._name_rank
+        if column not in self.numeric:
+            raise ValueError(f"Unknown numeric column: {column}")
+        return self.numeric[column]
+    
+    def select(self, positions: np.ndarray, sort: Optional[str] = None,
+               filters: Optional[List[Tuple[str, Optional[float], Optional[float]]]] = None) -> np.ndarray:
+        """Filter positions by (column, min, max) ranges and order them by a column, '-' prefix for descending
+
+        Stocks missing a filtered value are dropped; missing sort values go last.
+        Ties keep the incoming order.
+        """
+        for column, low, high in filters or []:
+            values = self.column_values(column)[positions]
+            keep = np.ones(len(positions), dtype=bool)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            positions = positions[keep]
+        
+        if sort:
+            descending = sort.startswith('-')
+            values = self.column_values(sort.lstrip('-'))[positions]
+            positions = positions[np.argsort(-values if descending else values, kind='stable')]
+        return positions
+    
+    def to_stock_data(self, positions: np.ndarray, short_name: Callable[[str], str],
+                      strategy_names: Optional[List[str]] = None) -> List[StockData]:
+        """Turn positions into StockData, using each stock's own strategies by default"""
+        result = []
+        for position in positions:
+            names = strategy_names or self.strategies_for(int(self.masks[position]))
+            result.append(StockData.from_record(self.records[position], [short_name(s) for s in names]))
+        return result
+
+
+@dataclass(frozen=True)
+class ScanSnapshot:
+    """Immutable result of one scan that answers any threshold or strategy subset from memory"""
+    version: int
+    created_at: pd.Timestamp
+    strategy_data: Mapping[str, pd.DataFrame]
+    index: StrategyIndex
+    short_names: Mapping[str, str]
+    # When each strategy's table was fetched; a partial refresh keeps the others' times
+    fetched_at: Mapping[str, pd.Timestamp] = field(default_factory=dict)
+    _records: Dict[int, List[Dict[str, Union[str, int]]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _subset_records: Dict[int, List[Dict[str, Union[str, int]]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _stock_records: Dict[int, Dict[str, Union[str, int]]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def strategy_count(self) -> int:
+        """Number of strategies that returned data in this scan"""
+        return len(self.strategy_data)
+    
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since this snapshot's scan completed"""
+        return (pd.Timestamp.now() - self.created_at).total_seconds()
+    
+    def table_ages(self) -> Dict[str, float]:
+        """Seconds since each strategy's table was fetched"""
+        now = pd.Timestamp.now()
+        return {name: (now - self.fetched_at.get(name, self.created_at)).total_seconds()
+                for name in self.strategy_data}
+    
+    @property
+    def data_age_seconds(self) -> float:
+        """Seconds since the oldest strategy table in this snapshot was fetched"""
+        return max(self.table_ages().values(), default=self.age_seconds)
+    
+    def stale_strategies(self, max_age: float) -> List[str]:
+        """Strategies whose tables are older than max_age seconds, oldest first"""
+        ages = self.table_ages()
+        return sorted((name for name, age in ages.items() if age > max_age), key=ages.get, reverse=True)
+    
+    def _short_name(self, strategy_name: str) -> str:
+        return self.short_names.get(strategy_name, strategy_name)
+    
+    def resolve_strategies(self, names: List[str]) -> List[str]:
+        """Full strategy names for full or short names, in index order; unknown names raise ValueError"""
+        full_names = {short: name for name, short in self.short_names.items()}
+        resolved = set()
+        for name in names:
+            full_name = full_names.get(name, name)
+            if full_name not in self.short_names:
+                raise ValueError(f"Unknown strategy: {name}")
+            resolved.add(full_name)
+        return [name for name in self.short_names if name in resolved]
+    
+    def stocks_in_x_strategies(self, min_strategies: int) -> List[StockData]:
+        """Stocks in at least min_strategies strategies, by count desc then name"""
+        if min_strategies < 1:
+            return []
+        return self.index.to_stock_data(self.index.at_least(min_strategies), self._short_name)
+    
+    def common_stocks(self, selected_strategies: List[str]) -> List[StockData]:
+        """Stocks common to all selected strategies"""
+        available = [s for s in selected_strategies if s in self.strategy_data]
+        
+        if len(selected_strategies) == 1 and available:
+            # Single strategy - return all its rows in screen order
+            short_name = self._short_name(available[0])
+            df = self.strategy_data[available[0]]
+            return [StockData.from_record(row, [short_name]) for row in df.to_dict('records')]
+        
+        if len(available) < 2:
+            return []
+        
+        positions = self.index.containing_all(self.index.mask_for(available))
+        return self.index.to_stock_data(positions, self._short_name, available)
+    
+    def diff(self, older: 'ScanSnapshot', levels: range = range(1, 8)) -> Dict[str, object]:
+        """Stocks that entered or left each confluence level, and per-stock strategy changes, since older"""
+        strategy_order = list(self.short_names.keys())
+        new_masks = self.index.canonical_masks(strategy_order)
+        old_masks = older.index.canonical_masks(strategy_order)
+        
+        # Align both snapshots on the union of stock keys; absent stocks have mask 0
+        keys = list(dict.fromkeys(self.index.keys + older.index.keys))
+        new_aligned = np.array([new_masks[self.index.positions[k]] if k in self.index.positions else 0 for k in keys],
+                               dtype=np.int64)
+        old_aligned = np.array([old_masks[older.index.positions[k]] if k in older.index.positions else 0 for k in keys],
+                               dtype=np.int64)
+        names = [
+            (self.index.records[self.index.positions[k]] if k in self.index.positions
+             else older.index.records[older.index.positions[k]])['Name']
+            for k in keys
+        ]
+        
+        new_counts = StrategyIndex._popcount(new_aligned)
+        old_counts = StrategyIndex._popcount(old_aligned)
+        level_changes = {}
+        for level in levels:
+            entered = np.flatnonzero((new_counts >= level) & (old_counts < level))
+            left = np.flatnonzero((new_counts < level) & (old_counts >= level))
+            level_changes[str(level)] = {
+                'added': sorted(names[i] for i in entered),
+                'removed': sorted(names[i] for i in left)
+            }
+        
+        def short_names_for(mask: int) -> List[str]:
+            return [self._short_name(name) for bit, name in enumerate(strategy_order) if mask & (1 << bit)]
+        
+        strategy_changes = []
+        for i in np.flatnonzero(new_aligned != old_aligned):
+            new_mask, old_mask = int(new_aligned[i]), int(old_aligned[i])
+            strategy_changes.append({
+                'Name': names[i],
+                'added': short_names_for(new_mask & ~old_mask),
+                'removed': short_names_for(old_mask & ~new_mask),
+                'Strategies': short_names_for(new_mask)
+            })
+        strategy_changes.sort(key=lambda change: change['Name'])
+        
+        return {
+            'from_version': older.version,
+            'to_version': self.version,
+            'levels': level_changes,
+            'strategy_changes': strategy_changes
+        }
+    
+    def query(self, min_strategies: int, sort: Optional[str] = None,
+              filters: Optional[List[Tuple[str, Optional[float], Optional[float]]]] = None,
+              limit: Optional[int] = None, offset: int = 0) -> Tuple[int, List[Dict[str, Union[str, int]]]]:
+        """Total matches and one page of API records for a threshold, filtered and sorted on typed columns"""
+        if min_strategies < 1:
+            return 0, []
+        positions = self.index.select(self.index.at_least(min_strategies), sort, filters)
+        page = positions[offset:] if limit is None else positions[offset:offset + limit]
+        return len(positions), [stock.to_dict() for stock in self.index.to_stock_data(page, self._short_name)]
+    
+    def positions(self, min_strategies: Optional[int] = None, strategy_names: Optional[List[str]] = None,
+                  sort: Optional[str] = None,
+                  filters: Optional[List[Tuple[str, Optional[float], Optional[float]]]] = None) -> np.ndarray:
+        """Index positions in a threshold and/or common to a strategy subset, filtered and sorted
+
+        Unsorted results come by count then name for a threshold alone, by name for a subset.
+        """
+        if strategy_names:
+            # A strategy with no data this scan has no stocks in common with anything
+            if any(name not in self.index.strategy_names for name in strategy_names):
+                return np.empty(0, dtype=np.intp)
+            positions = self.index.containing_all(self.index.mask_for(strategy_names))
+            if min_strategies:
+                positions = positions[self.index.counts[positions] >= min_strategies]
+        elif min_strategies and min_strategies >= 1:
+            positions = self.index.at_least(min_strategies)
+        else:
+            raise ValueError("A query needs min_strategies or strategies")
+        return self.index.select(positions, sort, filters)
+    
+    def stock_record(self, position: int) -> Dict[str, Union[str, int]]:
+        """API record of one stock with all of its strategies, built once per snapshot"""
+        record = self._stock_records.get(position)
+        if record is None:
+            record = self.index.to_stock_data([position], self._short_name)[0].to_dict()
+            self._stock_records[position] = record
+        return record
+    
+    def rank(self, strategy_weights: Optional[Mapping[str, float]] = None,
+             column_weights: Optional[Mapping[str, float]] = None, limit: int = 50,
+             min_strategies: int = 1) -> Tuple[int, List[Dict[str, Union[str, int, float]]]]:
+        """Eligible stock count and the top stocks by weighted confluence score
+
+        Strategy weights may use full or short names; unlisted strategies weigh 1.
+        Column weights apply to min-max normalized numeric columns.
+        """
+        full_names = {short: name for name, short in self.short_names.items()}
+        weights = {full_names.get(name, name): weight for name, weight in (strategy_weights or {}).items()}
+        
+        scorer = self.index.scorer
+        # Strategies that returned no data this scan have nothing to weight
+        weights = {name: weight for name, weight in weights.items()
+                   if name in scorer.strategy_names or name not in self.short_names}
+        scores = scorer.score(weights, column_weights)
+        positions = scorer.top_k(scores, limit, min_strategies)
+        
+        records = []
+        for position, stock in zip(positions, self.index.to_stock_data(positions, self._short_name)):
+            records.append({**stock.to_dict(), 'Score': round(float(scores[position]), 4)})
+        return scorer.eligible_count(min_strategies), records
+    
+    def subset_sizes(self) -> List[Dict[str, object]]:
+        """Number of stocks common to every strategy subset, largest subsets first"""
+        sizes = []
+        for mask, positions in self.index.intersections.items():
+            strategies = [self._short_name(name) for name in self.index.strategies_for(mask)]
+            sizes.append({'strategies': strategies, 'size': len(strategies), 'count': len(positions)})
+        sizes.sort(key=lambda subset: (-subset['size'], -subset['count'], subset['strategies']))
+        return sizes
+    
+    def subset_records(self, strategy_names: List[str]) -> List[Dict[str, Union[str, int]]]:
+        """API records of the stocks common to some strategies, built once per subset per snapshot"""
+        # A strategy with no data this scan has no stocks in common with anything
+        if not strategy_names or any(name not in self.index.strategy_names for name in strategy_names):
+            return []
+        mask = self.index.mask_for(strategy_names)
+        records = self._subset_records.get(mask)
+        if records is None:
+            records = [stock.to_dict() for stock in self.common_stocks(self.index.strategies_for(mask))]
+            self._subset_records[mask] = records
+        return records
+    
+    def cooccurrence(self) -> Dict[str, object]:
+        """Pairwise shared-stock counts between strategies, labelled by short name"""
+        return {
+            'strategies': [self._short_name(name) for name in self.index.strategy_names],
+            'matrix': self.index.cooccurrence.tolist()
+        }
+    
+    def records(self, min_strategies: int) -> List[Dict[str, Union[str, int]]]:
+        """API records for a threshold, built once per snapshot"""
+        records = self._records.get(min_strategies)
+        if records is None:
+            records = [stock.to_dict() for stock in self.stocks_in_x_strategies(min_strategies)]
+            self._records[min_strategies] = records
+        return records
+
+
 class StockAnalyzer:
     """Handles stock analysis operations"""
     
-    def __init__(self, strategy_manager: StrategyManager):
+    def __init__(self, strategy_manager: StrategyManager, max_workers: int = 7,
+                 max_concurrent_per_host: int = 4, scraper_backend: str = "sync",
+                 strategy_ttl: float = 3 * 3600, max_cached_pages: int = 512):
+        if scraper_backend not in ("sync", "async"):
+            raise ValueError(f"Unknown scraper backend: {scraper_backend}")
+        
         self.strategy_manager = strategy_manager
-        self.scraper = WebScraper()
-        self._cache: Dict[str, pd.DataFrame] = {}
+        self.max_workers = max(1, max_workers)
+        self.scraper_backend = scraper_backend
+        # Both scrapers share one page cache so either can revalidate the other's pages,
+        # and one rate limiter so every scrape in the process draws on the same host budget
+        self.page_cache = TTLCache(max_entries=max_cached_pages, default_ttl=0.0)
+        self.rate_limiter = AdaptiveRateLimiter()
+        self.scraper = WebScraper(max_concurrent_per_host=max_concurrent_per_host, page_cache=self.page_cache,
+                                  rate_limiter=self.rate_limiter)
+        self.async_scraper = AsyncWebScraper(max_concurrent_per_host=max_concurrent_per_host,
+                                             page_cache=self.page_cache, rate_limiter=self.rate_limiter)
+        self._cache = TTLCache(max_entries=4 * len(strategy_manager.strategies), default_ttl=strategy_ttl)
+        # Each index is kept with its tables so their ids can't be reused while cached
+        self._index_cache: Dict[Tuple[Tuple[str, int], ...], Tuple[StrategyIndex, List[pd.DataFrame]]] = {}
+        self._snapshot_version = 0
+        self._snapshot_lock = threading.Lock()
+        # The async backend scrapes on one long-lived loop with one pooled client
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_stack = AsyncExitStack()
+    
+    def _scraper_loop(self) -> asyncio.AbstractEventLoop:
+        """The event loop the async backend scrapes on, started on its own thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="scraper-loop", daemon=True).start()
+            return self._loop
+    
+    def _run_async(self, coro):
+        """Run a coroutine on the scraper loop and wait for its result
+        
+        Unlike asyncio.run, this works from a thread that is already running an
+        event loop, and the loop (with its pooled client) outlives each scan.
+        The coroutine runs in a copy of the caller's context, so it joins any trace.
+        """
+        loop = self._scraper_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("Blocking on the scraper loop from inside it would deadlock, await the async method")
+        
+        done: Future = Future()
+        
+        def settle(task: asyncio.Task) -> None:
+            if task.cancelled():
+                done.cancel()
+            elif task.exception() is not None:
+                done.set_exception(task.exception())
+            else:
+                done.set_result(task.result())
+        
+        def start() -> None:
+            loop.create_task(coro).add_done_callback(settle)
+        
+        loop.call_soon_threadsafe(contextvars.copy_context().run, start)
+        return done.result()
+    
+    async def _pooled_client(self) -> httpx.AsyncClient:
+        """The client shared by every scan on the scraper loop, opened on first use"""
+        if self._client is None:
+            self._client = await self._client_stack.enter_async_context(self.async_scraper.client())
+        return self._client
+    
+    def get_index(self, all_data: Dict[str, pd.DataFrame]) -> StrategyIndex:
+        """Get the strategy index for a set of tables, reusing it while the tables are unchanged"""
+        key = tuple((strategy_name, id(df)) for strategy_name, df in all_data.items())
+        cached = self._index_cache.get(key)
+        if cached is not None:
+            return cached[0]
+        
+        if len(self._index_cache) >= 16:
+            self._index_cache.clear()
+        with span("build_index"):
+            index = StrategyIndex.build(all_data)
+        self._index_cache[key] = (index, list(all_data.values()))
+        return index
+    
+    def invalidate(self, strategy_name: Optional[str] = None) -> None:
+        """Drop cached tables, pages and page fingerprints for one strategy, or for every strategy"""
+        if strategy_name is None:
+            self._cache.clear()
+            self.page_cache.clear()
+            self.scraper.forget_scrapes()
+            self.async_scraper.forget_scrapes()
+            return
+        
+        self._cache.invalidate(strategy_name)
+        strategy = self.strategy_manager.get_strategy(strategy_name)
+        if strategy:
+            self.page_cache.invalidate_where(lambda page_url: str(page_url).startswith(strategy.url))
+            self.scraper.forget_scrapes(strategy.url)
+            self.async_scraper.forget_scrapes(strategy.url)
+    
+    def _cached_table(self, strategy_name: str, use_cache: bool) -> Optional[pd.DataFrame]:
+        """A strategy's cached table, counting the lookup"""
+        if not use_cache:
+            STRATEGY_CACHE.inc(result="bypass")
+            return None
+        cached = self._cache.get(strategy_name)
+        STRATEGY_CACHE.inc(result="hit" if cached is not None else "miss")
+        return cached
+    
+    def _store_table(self, strategy_name: str, url: str, df: pd.DataFrame) -> None:
+        """Cache a freshly scraped table"""
+        STRATEGY_ROWS.set(len(df), strategy=screen_label(url))
+        if not df.empty:
+            self._cache.set(strategy_name, df)
     
     def get_strategy_stocks(self, strategy_name: str, use_cache: bool = True) -> pd.DataFrame:
         """Get stocks for a specific strategy"""
-        if use_cache and strategy_name in self._cache:
+        if self.scraper_backend == "async":
+            return self._run_async(self._get_strategy_stocks_pooled(strategy_name, use_cache))
+        
+        cached = self._cached_table(strategy_name, use_cache)
+        if cached is not None:
             logger.info(f"Using cached data for {strategy_name}")
-            return self._cache[strategy_name]
+            return cached
         
         strategy = self.strategy_manager.get_strategy(strategy_name)
         if not strategy:
@@ -324,27 +1519,136 @@ class StockAnalyzer:
             return pd.DataFrame()
         
         try:
-            df = self.scraper.scrape_strategy_data(strategy.url)
-            if not df.empty:
-                self._cache[strategy_name] = df
+            with STRATEGY_SCRAPE_SECONDS.time(strategy=screen_label(strategy.url)):
+                df = self.scraper.scrape_strategy_data(strategy.url)
+            self._store_table(strategy_name, strategy.url, df)
             return df
         except Exception as e:
             logger.error(f"Error fetching {strategy_name}: {e}")
             return pd.DataFrame()
     
-    def get_all_strategies_data(self) -> Dict[str, pd.DataFrame]:
-        """Fetch data for all strategies"""
+    async def get_strategy_stocks_async(self, strategy_name: str, use_cache: bool = True,
+                                        client: Optional[httpx.AsyncClient] = None) -> pd.DataFrame:
+        """Get stocks for a specific strategy without blocking the event loop"""
+        cached = self._cached_table(strategy_name, use_cache)
+        if cached is not None:
+            logger.info(f"Using cached data for {strategy_name}")
+            return cached
+        
+        strategy = self.strategy_manager.get_strategy(strategy_name)
+        if not strategy:
+            logger.error(f"Unknown strategy: {strategy_name}")
+            return pd.DataFrame()
+        
+        try:
+            with STRATEGY_SCRAPE_SECONDS.time(strategy=screen_label(strategy.url)):
+                df = await self.async_scraper.scrape_strategy_data(strategy.url, client)
+            self._store_table(strategy_name, strategy.url, df)
+            return df
+        except Exception as e:
+            logger.error(f"Error fetching {strategy_name}: {e}")
+            return pd.DataFrame()
+    
+    async def _get_strategy_stocks_pooled(self, strategy_name: str, use_cache: bool) -> pd.DataFrame:
+        return await self.get_strategy_stocks_async(strategy_name, use_cache, await self._pooled_client())
+    
+    async def get_all_strategies_data_async(self, use_cache: bool = True,
+                                            progress: Optional[ProgressCallback] = None,
+                                            strategy_names: Optional[List[str]] = None,
+                                            client: Optional[httpx.AsyncClient] = None) -> Dict[str, pd.DataFrame]:
+        """Fetch data for all strategies, or the given ones, concurrently over one pooled async client
+        
+        Without a client, one is opened for this call and closed afterwards.
+        """
+        if client is None:
+            async with self.async_scraper.client() as client:
+                return await self.get_all_strategies_data_async(use_cache, progress, strategy_names, client)
+        
         logger.info("Fetching data for all strategies")
         
+        if strategy_names is None:
+            strategy_names = list(self.strategy_manager.get_all_strategies().keys())
+        
+        async def fetch(strategy_name: str, client: httpx.AsyncClient) -> pd.DataFrame:
+            df = await self.get_strategy_stocks_async(strategy_name, use_cache, client)
+            self._report_progress(progress, strategy_name, df)
+            return df
+        
+        results = await asyncio.gather(
+            *(fetch(name, client) for name in strategy_names),
+            return_exceptions=True
+        )
+        
         all_data = {}
-        for strategy_name in self.strategy_manager.get_all_strategies().keys():
-            df = self.get_strategy_stocks(strategy_name)
-            if not df.empty:
+        for strategy_name, df in zip(strategy_names, results):
+            if isinstance(df, BaseException):
+                logger.error(f"Error fetching {strategy_name}: {df}")
+            elif not df.empty:
                 all_data[strategy_name] = df
         
         logger.info(f"Successfully fetched data for {len(all_data)} strategies")
         return all_data
     
+    async def _get_all_strategies_data_pooled(self, use_cache: bool, progress: Optional[ProgressCallback],
+                                              strategy_names: Optional[List[str]]) -> Dict[str, pd.DataFrame]:
+        return await self.get_all_strategies_data_async(use_cache, progress, strategy_names,
+                                                        await self._pooled_client())
+    
+    @staticmethod
+    def _report_progress(progress: Optional[ProgressCallback], strategy_name: str,
+                         df: Optional[pd.DataFrame]) -> None:
+        """Tell a progress callback that a strategy finished, without letting it break the scan"""
+        if progress is None:
+            return
+        try:
+            progress(strategy_name, 0 if df is None else len(df))
+        except Exception as e:
+            logger.warning(f"Progress callback failed for {strategy_name}: {e}")
+    
+    @traced("fetch_all")
+    def get_all_strategies_data(self, concurrent: bool = True, use_cache: bool = True,
+                                progress: Optional[ProgressCallback] = None,
+                                strategy_names: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Fetch data for all strategies, or the given ones, scraping them in parallel when concurrent"""
+        if self.scraper_backend == "async":
+            return self._run_async(self._get_all_strategies_data_pooled(use_cache, progress, strategy_names))
+        
+        logger.info("Fetching data for all strategies")
+        
+        if strategy_names is None:
+            strategy_names = list(self.strategy_manager.get_all_strategies().keys())
+        fetched: Dict[str, pd.DataFrame] = {}
+        
+        if concurrent and self.max_workers > 1 and len(strategy_names) > 1:
+            workers = min(self.max_workers, len(strategy_names))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="strategy-fetch") as executor:
+                futures = {
+                    executor.submit(in_context(self.get_strategy_stocks), strategy_name, use_cache): strategy_name
+                    for strategy_name in strategy_names
+                }
+                for future in as_completed(futures):
+                    strategy_name = futures[future]
+                    try:
+                        fetched[strategy_name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error fetching {strategy_name}: {e}")
+                    self._report_progress(progress, strategy_name, fetched.get(strategy_name))
+        else:
+            for strategy_name in strategy_names:
+                fetched[strategy_name] = self.get_strategy_stocks(strategy_name, use_cache)
+                self._report_progress(progress, strategy_name, fetched[strategy_name])
+        
+        # Keep strategy order stable regardless of completion order
+        all_data = {}
+        for strategy_name in strategy_names:
+            df = fetched.get(strategy_name)
+            if df is not None and not df.empty:
+                all_data[strategy_name] = df
+        
+        logger.info(f"Successfully fetched data for {len(all_data)} strategies")
+        return all_data
+    
+    @traced("find_common_stocks")
     def find_common_stocks_in_selected_strategies(self, selected_strategies: List[str]) -> List[StockData]:
         """Find stocks common to all selected strategies"""
         if not selected_strategies:
@@ -371,37 +1675,11 @@ class StockAnalyzer:
             return []
         
         # Find intersection of stock names
+        index = self.get_index(strategy_data)
         strategy_names = list(strategy_data.keys())
-        common_stocks = set(strategy_data[strategy_names[0]]['Name'].str.strip())
-        
-        for strategy_name in strategy_names[1:]:
-            strategy_stocks = set(strategy_data[strategy_name]['Name'].str.strip())
-            common_stocks = common_stocks.intersection(strategy_stocks)
+        positions = index.containing_all(index.mask_for(strategy_names))
+        result = index.to_stock_data(positions, self.strategy_manager.get_short_name, strategy_names)
         
-        # Build result
-        result = []
-        short_names = [self.strategy_manager.get_short_name(s) for s in strategy_names]
-        
-        for stock_name in common_stocks:
-            # Get stock data from first available strategy
-            stock_data = None
-            for strategy_name in strategy_names:
-                df = strategy_data[strategy_name]
-                matching_rows = df[df['Name'].str.strip() == stock_name.strip()]
-                if not matching_rows.empty:
-                    stock_data = matching_rows.iloc[0]
-                    break
-            
-            if stock_data is not None:
-                result.append(StockData(
-                    name=stock_data['Name'],
-                    cmp=stock_data.get('CMPRs.', '-'),
-                    strategies=short_names,
-                    strategy_count=len(strategy_names)
-                ))
-        
-        # Sort by name
-        result.sort(key=lambda x: x.name)
         logger.info(f"Found {len(result)} common stocks")
         return result
     
@@ -417,16 +1695,12 @@ class StockAnalyzer:
         short_name = self.strategy_manager.get_short_name(strategy_name)
         
         for _, row in df.iterrows():
-            result.append(StockData(
-                name=row['Name'],
-                cmp=row.get('CMPRs.', '-'),
-                strategies=[short_name],
-                strategy_count=1
-            ))
+            result.append(StockData.from_record(row.to_dict(), [short_name]))
         
         logger.info(f"Found {len(result)} stocks in {strategy_name}")
         return result
     
+    @traced("find_stocks_in_x_strategies")
     def find_stocks_in_x_strategies(self, min_strategies: int = 2) -> List[StockData]:
         """Find stocks that appear in at least X strategies"""
         logger.info(f"Finding stocks that appear in at least {min_strategies} strategies")
@@ -442,47 +1716,114 @@ class StockAnalyzer:
             logger.warning(f"Only {len(all_data)} strategies available, need at least {min_strategies}")
             return []
         
-        # Build stock to strategies mapping
-        stock_strategies: Dict[str, List[str]] = {}
-        
-        for strategy_name, df in all_data.items():
-            if 'Name' in df.columns:
-                for stock_name in df['Name'].str.strip():
-                    if stock_name not in stock_strategies:
-                        stock_strategies[stock_name] = []
-                    stock_strategies[stock_name].append(strategy_name)
-        
-        # Find qualifying stocks
-        result = []
-        for stock_name, strategies in stock_strategies.items():
-            if len(strategies) >= min_strategies:
-                # Get stock data from first strategy
-                stock_data = None
-                for strategy_name in strategies:
-                    df = all_data[strategy_name]
-                    matching_rows = df[df['Name'].str.strip() == stock_name.strip()]
-                    if not matching_rows.empty:
-                        stock_data = matching_rows.iloc[0]
-                        break
-                
-                if stock_data is not None:
-                    short_names = [self.strategy_manager.get_short_name(s) for s in strategies]
-                    result.append(StockData(
-                        name=stock_data['Name'],
-                        cmp=stock_data.get('CMPRs.', '-'),
-                        strategies=short_names,
-                        strategy_count=len(strategies)
-                    ))
-        
-        # Sort by strategy count (descending) then by name
-        result.sort(key=lambda x: (-x.strategy_count, x.name))
+        # Stocks come back sorted by strategy count (descending) then by name
+        index = self.get_index(all_data)
+        result = index.to_stock_data(index.at_least(min_strategies), self.strategy_manager.get_short_name)
         logger.info(f"Found {len(result)} stocks in {min_strategies}+ strategies")
         return result
 
+    
+    @traced("scan")
+    def scan(self, refresh: bool = False, progress: Optional[ProgressCallback] = None,
+             base: Optional[ScanSnapshot] = None) -> ScanSnapshot:
+        """Fetch every strategy once and freeze the result into an immutable snapshot
+
+        With refresh, cached tables are bypassed and every page is revalidated upstream.
+        A strategy whose scrape comes back empty keeps its table from base.
+        """
+        with SCAN_SECONDS.time(refresh=str(refresh).lower()):
+            fetched = self.get_all_strategies_data(use_cache=not refresh, progress=progress)
+        now = pd.Timestamp.now()
+        all_data, fetched_at = self._with_previous_tables(fetched, base, now)
+        
+        with self._snapshot_lock:
+            self._snapshot_version += 1
+            version = self._snapshot_version
+        
+        return self._build_snapshot(all_data, version, now, fetched_at)
+    
+    @traced("refresh_strategies")
+    def refresh_strategies(self, strategy_names: List[str], base: Optional[ScanSnapshot] = None,
+                           progress: Optional[ProgressCallback] = None) -> ScanSnapshot:
+        """Re-scrape some strategies and build a new snapshot, keeping base's tables for the rest
+
+        A strategy whose scrape comes back empty keeps its table from base.
+        """
+        fetched = self.get_all_strategies_data(use_cache=False, progress=progress, strategy_names=strategy_names)
+        now = pd.Timestamp.now()
+        all_data, fetched_at = self._with_previous_tables(fetched, base, now)
+        
+        with self._snapshot_lock:
+            self._snapshot_version += 1
+            version = self._snapshot_version
+        
+        return self._build_snapshot(all_data, version, now, fetched_at)
+    
+    def _with_previous_tables(self, fetched: Dict[str, pd.DataFrame], base: Optional[ScanSnapshot],
+                              now: pd.Timestamp) -> Tuple[Dict[str, pd.DataFrame], Dict[str, pd.Timestamp]]:
+        """Fetched tables in strategy order, with base's table standing in for any that are missing
+
+        Returns the tables and when each was fetched, base's time for the ones kept.
+        """
+        if base is not None and len(fetched) < len(base.strategy_data):
+            missing = [name for name in base.strategy_data if name not in fetched]
+            logger.warning(f"Keeping previous tables for {len(missing)} strategies that returned no data: {missing}")
+        
+        previous = dict(base.strategy_data) if base is not None else {}
+        all_data = {}
+        fetched_at = {}
+        for strategy_name in self.strategy_manager.get_all_strategies():
+            if strategy_name in fetched:
+                all_data[strategy_name] = fetched[strategy_name]
+                fetched_at[strategy_name] = now
+            elif strategy_name in previous:
+                all_data[strategy_name] = previous[strategy_name]
+                fetched_at[strategy_name] = base.fetched_at.get(strategy_name, base.created_at)
+        return all_data, fetched_at
+    
+    def upstream_requests(self, strategy_name: str) -> int:
+        """Page requests sent for a strategy so far, successful or not"""
+        strategy = self.strategy_manager.get_strategy(strategy_name)
+        return PAGE_FETCH_SECONDS.count(strategy=screen_label(strategy.url)) if strategy else 0
+    
+    def restore(self, strategy_data: Dict[str, pd.DataFrame], version: int, created_at: pd.Timestamp,
+                records: Optional[Dict[int, List[Dict[str, Union[str, int]]]]] = None,
+                fetched_at: Optional[Dict[str, pd.Timestamp]] = None) -> ScanSnapshot:
+        """Rebuild a snapshot from stored tables and seed the strategy cache with them"""
+        now = pd.Timestamp.now()
+        for strategy_name, df in strategy_data.items():
+            if not df.empty:
+                age = (now - (fetched_at or {}).get(strategy_name, created_at)).total_seconds()
+                self._cache.set(strategy_name, df, ttl=max(0.0, self._cache.default_ttl - age))
+        
+        # Versions keep increasing across restarts
+        with self._snapshot_lock:
+            self._snapshot_version = max(self._snapshot_version, version)
+        
+        snapshot = self._build_snapshot(strategy_data, version, created_at, fetched_at)
+        snapshot._records.update(records or {})
+        return snapshot
+    
+    @traced("build_snapshot")
+    def _build_snapshot(self, all_data: Dict[str, pd.DataFrame], version: int, created_at: pd.Timestamp,
+                        fetched_at: Optional[Dict[str, pd.Timestamp]] = None) -> ScanSnapshot:
+        """Freeze strategy tables into a snapshot; tables without a fetch time count as fetched at created_at"""
+        short_names = {name: config.short_name for name, config in self.strategy_manager.get_all_strategies().items()}
+        snapshot = ScanSnapshot(
+            version=version,
+            created_at=created_at,
+            strategy_data=MappingProxyType(dict(all_data)),
+            index=self.get_index(all_data),
+            short_names=MappingProxyType(short_names),
+            fetched_at=MappingProxyType({name: (fetched_at or {}).get(name, created_at) for name in all_data})
+        )
+        logger.info(f"Built snapshot v{version}: {len(snapshot.index.keys)} stocks across {snapshot.strategy_count} strategies")
+        return snapshot
+
 
 # Global instances
 strategy_manager = StrategyManager()
-analyzer = StockAnalyzer(strategy_manager)
+analyzer = StockAnalyzer(strategy_manager, scraper_backend=os.environ.get("SCRAPER_BACKEND", "sync"))
 
 
 # Public API Functions
@@ -526,6 +1867,41 @@ def get_all_strategies() -> Dict[str, pd.DataFrame]:
     return analyzer.get_all_strategies_data()
 
 
+def scan_strategies(refresh: bool = False, progress: Optional[ProgressCallback] = None,
+                    base: Optional[ScanSnapshot] = None) -> ScanSnapshot:
+    """Scan all strategies once and return an immutable snapshot, reusing base's tables for failed ones"""
+    return analyzer.scan(refresh, progress, base)
+
+
+def refresh_strategies(strategy_names: List[str], base: Optional[ScanSnapshot] = None,
+                       progress: Optional[ProgressCallback] = None) -> ScanSnapshot:
+    """Re-scrape some strategies and return a snapshot that reuses base's tables for the others"""
+    return analyzer.refresh_strategies(strategy_names, base, progress)
+
+
+def upstream_requests(strategy_name: str) -> int:
+    """Page requests sent upstream for a strategy since the process started"""
+    return analyzer.upstream_requests(strategy_name)
+
+
+def profile_scan(refresh: bool = False, interval: float = 0.005, progress: Optional[ProgressCallback] = None,
+                 base: Optional[ScanSnapshot] = None) -> Tuple[ScanSnapshot, Profile]:
+    """Scan all strategies under the sampling profiler, returning the snapshot and its profile"""
+    return profile(analyzer.scan, refresh, progress, base, interval=interval)
+
+
+def restore_snapshot(strategy_data: Dict[str, pd.DataFrame], version: int, created_at: pd.Timestamp,
+                     records: Optional[Dict[int, List[Dict[str, Union[str, int]]]]] = None,
+                     fetched_at: Optional[Dict[str, pd.Timestamp]] = None) -> ScanSnapshot:
+    """Rebuild a snapshot from stored tables, e.g. after a restart"""
+    return analyzer.restore(strategy_data, version, created_at, records, fetched_at)
+
+
+def invalidate_cache(strategy_name: Optional[str] = None) -> None:
+    """Drop cached strategy tables and pages so the next scan re-downloads them"""
+    analyzer.invalidate(strategy_name)
+
+
 def find_common_stocks_in_selected_strategies(selected_strategies: List[str]) -> pd.DataFrame:
     """Find stocks common to selected strategies (for backward compatibility)"""
     stocks = analyzer.find_common_stocks_in_selected_strategies(selected_strategies)
@@ -547,6 +1923,27 @@ def find_stocks_in_x_strategies(min_strategies: int = 2) -> pd.DataFrame:
 
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Screen strategy scraper")
+    parser.add_argument("--profile", action="store_true",
+                        help="run one full scan under the sampling profiler and write folded stacks")
+    parser.add_argument("--refresh", action="store_true", help="with --profile, revalidate every page")
+    parser.add_argument("--interval", type=float, default=0.005, help="profiler sampling interval in seconds")
+    parser.add_argument("--output", default="scan.folded", help="where to write the folded stacks")
+    args = parser.parse_args()
+    
+    if args.profile:
+        snapshot, scan_profile = profile_scan(args.refresh, args.interval)
+        with open(args.output, "w") as f:
+            f.write(scan_profile.folded)
+        print(f"Scanned {len(snapshot.index.keys)} stocks in {scan_profile.duration:.2f}s, "
+              f"{scan_profile.samples} samples -> {args.output}")
+        print(f"{'stage':<30}{'count':>7}{'total s':>10}{'self s':>10}{'max s':>10}")
+        for stage in scan_profile.stages:
+            print(f"{stage['stage']:<30}{stage['count']:>7}{stage['total']:>10.3f}{stage['self']:>10.3f}{stage['max']:>10.3f}")
+        sys.exit(0)
+    
     # Test the system
     logger.info("Testing Finance Agent")
     
@@ -0,0 +1,134 @@
+import email.utils
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Statuses that mean the host wants us to slow down, not that the request was bad
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header given as delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+@dataclass
+class HostState:
+    """Token bucket and health of one host"""
+    rate: float
+    tokens: float
+    updated_at: float = field(default_factory=time.monotonic)
+    blocked_until: float = 0.0
+    latency: Optional[float] = None
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe per-host token bucket whose rate follows how the host is coping
+
+    Rates move AIMD-style: fast successful responses raise a host's rate
+    additively, while slow responses and server errors cut it multiplicatively.
+    A 429 or 503 halves the rate and pauses the host until its Retry-After.
+    Waits are handed out as reservations, so one limiter can pace any mix of
+    threads and event loops sharing a host.
+    """
+
+    def __init__(self, initial_rate: float = 8.0, min_rate: float = 0.5, max_rate: float = 32.0,
+                 burst: float = 4.0, increase: float = 0.25, latency_target: float = 2.0,
+                 throttle_cooldown: float = 5.0, max_retry_after: float = 120.0):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, initial_rate)
+        self.burst = max(1.0, burst)
+        self.increase = increase
+        self.latency_target = latency_target
+        self.throttle_cooldown = throttle_cooldown
+        self.max_retry_after = max_retry_after
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.initial_rate > 0
+
+    def _state(self, host: str, now: float) -> HostState:
+        """Get a host's bucket, refilled up to now (call with the lock held)"""
+        state = self._hosts.get(host)
+        if state is None:
+            state = HostState(rate=self.initial_rate, tokens=self.burst, updated_at=now)
+            self._hosts[host] = state
+        state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * state.rate)
+        state.updated_at = now
+        return state
+
+    def reserve(self, url: str) -> float:
+        """Take a token for the URL's host and return how long to wait before sending"""
+        if not self.enabled:
+            return 0.0
+
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+            # Tokens go negative as requests queue up; the debt is paid off at the current rate
+            state.tokens -= 1
+            debt = -state.tokens / state.rate if state.tokens < 0 else 0.0
+            return max(0.0, state.blocked_until - now) + debt
+
+    def record(self, url: str, latency: float, status: Optional[int] = None,
+               retry_after: Optional[str] = None) -> None:
+        """Adjust a host's rate from one response, or from a failed request when status is None"""
+        if not self.enabled:
+            return
+
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+            state.latency = latency if state.latency is None else 0.7 * state.latency + 0.3 * latency
+
+            if status in THROTTLE_STATUSES:
+                pause = parse_retry_after(retry_after)
+                pause = self.throttle_cooldown if pause is None else min(pause, self.max_retry_after)
+                # Requests already in flight when the host pushed back count as one event
+                if state.blocked_until <= now:
+                    state.rate = max(self.min_rate, state.rate * 0.5)
+                state.blocked_until = max(state.blocked_until, now + pause)
+                state.tokens = min(state.tokens, 0.0)
+            elif status is None or status >= 500:
+                state.rate = max(self.min_rate, state.rate * 0.75)
+            elif status < 400:
+                if state.latency > self.latency_target:
+                    state.rate = max(self.min_rate, state.rate * 0.9)
+                else:
+                    state.rate = min(self.max_rate, state.rate + self.increase)
+            # Other 4xx responses say nothing about load
+
+    def rate(self, url: str) -> float:
+        """Current request rate allowed for the URL's host"""
+        with self._lock:
+            state = self._hosts.get(urlparse(url).netloc)
+            return state.rate if state is not None else self.initial_rate
+
+    def stats(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Rate, smoothed latency and remaining pause for every host seen so far"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                host: {
+                    "rate": state.rate,
+                    "latency": state.latency,
+                    "blocked_for": max(0.0, state.blocked_until - now)
+                }
+                for host, state in self._hosts.items()
+            }
@@ -0,0 +1,149 @@
+import gzip
+import json
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+from cache import TTLCache
+from metrics import REGISTRY
+
+try:
+    import orjson
+except ImportError:  # fall back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # serve gzip only
+    brotli = None
+
+RESPONSE_CACHE = REGISTRY.counter(
+    'screener_response_cache_total', 'Pre-encoded response lookups', ['endpoint', 'result'])
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a payload as compact JSON bytes, with NaN/inf as null"""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_replace_non_finite(payload), separators=(',', ':'), default=str).encode()
+
+
+def _replace_non_finite(value: Any) -> Any:
+    if isinstance(value, float) and (value != value or value in (float('inf'), float('-inf'))):
+        return None
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(item) for item in value]
+    return value
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into encoding -> q-value"""
+    encodings = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+
+# Compression settings for responses encoded ahead of time (served many times)
+# and for one-off query responses, compressed on demand with the fastest settings
+PRECOMPRESS_LEVELS = {'gzip': 6, 'br': 5}
+ON_DEMAND_LEVELS = {'gzip': 1, 'br': 1}
+
+
+def _compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level)
+
+
+class EncodedResponse:
+    """A JSON body encoded once, with compressed variants and an ETag
+
+    With precompress the gzip/brotli variants are built up front; otherwise
+    only the variant a client asks for is built, cheaply, on first use.
+    """
+
+    def __init__(self, payload: Any, etag: str, min_compress_size: int = 512, precompress: bool = True):
+        body = dumps(payload)
+        self.etag = f'"{etag}"'
+        self.variants: Dict[str, bytes] = {'identity': body}
+        self.encodings: Tuple[str, ...] = ()
+        if len(body) >= min_compress_size:
+            self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        self._levels = PRECOMPRESS_LEVELS if precompress else ON_DEMAND_LEVELS
+        if precompress:
+            for encoding in self.encodings:
+                self.variant(encoding)
+
+    def variant(self, encoding: str) -> bytes:
+        """The body in one of the response's encodings, compressing it on first use"""
+        body = self.variants.get(encoding)
+        if body is None:
+            body = _compress(self.variants['identity'], encoding, self._levels[encoding])
+            self.variants[encoding] = body
+        return body
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header already names this body"""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or any(tag.removeprefix('W/') == self.etag for tag in tags)
+
+    def choose_encoding(self, accept_encoding: str) -> str:
+        """Pick the smallest variant the client accepts"""
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+                return encoding
+        return 'identity'
+
+    def render(self, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Build the response for a request, answering 304 when the client's copy is current"""
+        response_headers = {'ETag': self.etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+        response_headers.update(headers or {})
+
+        if self.matches(request.headers.get('if-none-match')):
+            return Response(status_code=304, headers=response_headers)
+
+        encoding = self.choose_encoding(request.headers.get('accept-encoding', ''))
+        if encoding != 'identity':
+            response_headers['Content-Encoding'] = encoding
+        return Response(content=self.variant(encoding), media_type='application/json',
+                        headers=response_headers)
+
+
+class ResponseCache:
+    """Encoded responses memoized by key, e.g. (snapshot version, query)"""
+
+    def __init__(self, max_entries: int = 64):
+        self._entries = TTLCache(max_entries=max_entries, default_ttl=float('inf'))
+
+    def get(self, key: Hashable, build: Callable[[], EncodedResponse], endpoint: str) -> EncodedResponse:
+        """Return the cached encoding for key, building it on first use, counted under endpoint"""
+        encoded = self._entries.get(key)
+        if encoded is None:
+            RESPONSE_CACHE.inc(endpoint=endpoint, result="miss")
+            encoded = build()
+            self._entries.set(key, encoded)
+        else:
+            RESPONSE_CACHE.inc(endpoint=endpoint, result="hit")
+        return encoded
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
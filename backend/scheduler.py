@@ -0,0 +1,250 @@
+import heapq
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+# NSE/BSE trading session; India has no daylight saving, so a fixed offset is exact
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+MARKET_OPEN = dt_time(9, 15)
+MARKET_CLOSE = dt_time(15, 30)
+
+
+def is_market_open(when: float) -> bool:
+    """Whether the cash market is in session at a Unix time (weekends count, holidays don't)"""
+    local = datetime.fromtimestamp(when, IST)
+    return local.weekday() < 5 and MARKET_OPEN <= local.time() < MARKET_CLOSE
+
+
+def next_market_open(when: float) -> float:
+    """Unix time of the next session open after a Unix time"""
+    local = datetime.fromtimestamp(when, IST)
+    candidate = datetime.combine(local.date(), MARKET_OPEN, IST)
+    while candidate.timestamp() <= when or candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate.timestamp()
+
+
+def last_market_close(when: float) -> float:
+    """Unix time of the latest session close at or before a Unix time"""
+    local = datetime.fromtimestamp(when, IST)
+    candidate = datetime.combine(local.date(), MARKET_CLOSE, IST)
+    while candidate.timestamp() > when or candidate.weekday() >= 5:
+        candidate -= timedelta(days=1)
+    return candidate.timestamp()
+
+
+@dataclass
+class StrategySchedule:
+    """Refresh interval and change history of one strategy"""
+    name: str
+    interval: float
+    next_due: float
+    members: Optional[FrozenSet[str]] = None
+    # Smoothed fraction of the screen's stocks that change per second
+    change_rate: Optional[float] = None
+    last_churn: Optional[float] = None
+    last_refreshed: Optional[float] = None
+    # Upstream requests the last refresh took, charged against the budget up front
+    cost: float = 1.0
+    charged: float = 0.0
+    # A failed refresh is not expedited again before its retry
+    retry_at: float = 0.0
+    refreshes: int = 0
+    failures: int = 0
+
+
+class RefreshScheduler:
+    """Priority queue of per-strategy refreshes whose intervals follow how often each screen changes
+
+    Every refresh compares the screen's membership with the previous one and
+    moves the interval towards target_churn / change rate: screens that keep
+    changing are refreshed more often, and screens that never change back off
+    towards max_interval. Outside market hours intervals are stretched by
+    off_hours_factor, but never past the next open. A token bucket over
+    upstream requests caps how much all strategies together may cost per hour.
+    """
+
+    def __init__(self, intervals: Mapping[str, float], min_interval: float = 900.0,
+                 max_interval: float = 86400.0, target_churn: float = 0.02, smoothing: float = 0.5,
+                 max_growth: float = 1.5, off_hours_factor: float = 4.0, requests_per_hour: float = 600.0,
+                 retry_delay: float = 600.0, clock=time.time):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.target_churn = target_churn
+        self.smoothing = smoothing
+        self.max_growth = max(1.0, max_growth)
+        self.off_hours_factor = max(1.0, off_hours_factor)
+        self.requests_per_hour = requests_per_hour
+        self.capacity = max(1.0, requests_per_hour / 6)
+        self.retry_delay = retry_delay
+        self.clock = clock
+
+        now = clock()
+        self.tokens = self.capacity
+        self._refilled_at = now
+        self._states: Dict[str, StrategySchedule] = {}
+        self._heap: List[tuple] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        for name, interval in intervals.items():
+            state = StrategySchedule(name, self._clamp(interval), 0.0)
+            self._states[name] = state
+            self._push(state, self._due_after(state.interval, now))
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _due_after(self, interval: float, now: float) -> float:
+        """When a refresh scheduled now should run, stretched while the market is shut"""
+        if is_market_open(now):
+            return now + interval
+        return min(now + interval * self.off_hours_factor, next_market_open(now))
+
+    def _push(self, state: StrategySchedule, due: float) -> None:
+        # Entries are never removed; ones whose time no longer matches their state are skipped
+        state.next_due = due
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, state.name))
+
+    def _top(self) -> Optional[StrategySchedule]:
+        while self._heap:
+            due, _, name = self._heap[0]
+            state = self._states[name]
+            if state.next_due == due:
+                return state
+            heapq.heappop(self._heap)
+        return None
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self._refilled_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.requests_per_hour / 3600)
+        self._refilled_at = now
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Take every strategy that is due and fits the request budget, most overdue first"""
+        now = self.clock() if now is None else now
+        ready = []
+        with self._lock:
+            self._refill(now)
+            while True:
+                state = self._top()
+                if state is None or state.next_due > now:
+                    break
+                # A refresh costing more than the whole bucket runs once the bucket is full
+                if state.cost > self.tokens and self.tokens < self.capacity:
+                    break
+                heapq.heappop(self._heap)
+                state.next_due = math.inf
+                state.charged = state.cost
+                self.tokens -= state.cost
+                ready.append(state.name)
+        return ready
+
+    def seconds_until_due(self, now: Optional[float] = None) -> float:
+        """How long until due() can return something"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._refill(now)
+            state = self._top()
+            if state is None:
+                return self.max_interval
+            wait = state.next_due - now
+            if state.cost > self.tokens and self.tokens < self.capacity:
+                needed = min(state.cost, self.capacity) - self.tokens
+                wait = max(wait, needed * 3600 / self.requests_per_hour)
+            return max(0.0, wait)
+
+    def record(self, name: str, members: Optional[Iterable[str]], requests: int = 0,
+               now: Optional[float] = None) -> None:
+        """Note a refresh of one strategy and schedule its next one
+
+        members is None when the refresh failed, which retries sooner without
+        adapting the interval. Refreshes nobody asked for (a full scan) count too.
+        """
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self._states.get(name)
+            if state is None:
+                return
+            self._refill(now)
+            # Settle the estimate charged by due() against what the refresh really cost
+            self.tokens -= requests - state.charged
+            state.charged = 0.0
+
+            if members is None:
+                state.failures += 1
+                state.retry_at = now + min(state.interval, self.retry_delay)
+                self._push(state, state.retry_at)
+                return
+
+            members = frozenset(members)
+            if requests:
+                state.cost = float(requests)
+            if state.members is not None and state.last_refreshed is not None:
+                self._adapt(state, members, now - state.last_refreshed)
+            state.members = members
+            state.last_refreshed = now
+            state.refreshes += 1
+            self._push(state, self._due_after(state.interval, now))
+
+    def expedite(self, names: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """Make strategies due now, e.g. when their data is older than the API may serve
+
+        due() still applies the request budget. While the market is shut, a
+        strategy refreshed since the last close has nothing new to pick up and
+        is left alone, as is one waiting to retry a failed refresh.
+        """
+        now = self.clock() if now is None else now
+        closed_since = None if is_market_open(now) else last_market_close(now)
+        expedited = []
+        with self._lock:
+            for name in names:
+                state = self._states.get(name)
+                # Strategies already handed out by due() have next_due = inf
+                if state is None or math.isinf(state.next_due) or state.next_due <= now or now < state.retry_at:
+                    continue
+                if closed_since is not None and state.last_refreshed is not None and \
+                        state.last_refreshed >= closed_since:
+                    continue
+                self._push(state, now)
+                expedited.append(name)
+        return expedited
+
+    def _adapt(self, state: StrategySchedule, members: FrozenSet[str], elapsed: float) -> None:
+        union = len(state.members | members)
+        churn = len(state.members ^ members) / union if union else 0.0
+        rate = churn / max(elapsed, 1.0)
+        state.last_churn = churn
+        state.change_rate = rate if state.change_rate is None else (
+            self.smoothing * rate + (1 - self.smoothing) * state.change_rate)
+
+        ideal = self.target_churn / state.change_rate if state.change_rate > 0 else math.inf
+        # Move gradually, so one quiet or noisy refresh doesn't swing the interval
+        interval = min(state.interval * self.max_growth, max(state.interval / 2, ideal))
+        state.interval = self._clamp(interval)
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, object]:
+        """Per-strategy intervals and churn, plus the remaining request budget"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            self._refill(now)
+            return {
+                "market_open": is_market_open(now),
+                "budget_tokens": round(self.tokens, 2),
+                "requests_per_hour": self.requests_per_hour,
+                "strategies": {
+                    name: {
+                        "interval": round(state.interval, 1),
+                        "due_in": None if math.isinf(state.next_due) else round(max(0.0, state.next_due - now), 1),
+                        "last_churn": state.last_churn,
+                        "changes_per_hour": None if state.change_rate is None else state.change_rate * 3600,
+                        "cost": state.cost,
+                        "refreshes": state.refreshes,
+                        "failures": state.failures
+                    }
+                    for name, state in self._states.items()
+                }
+            }
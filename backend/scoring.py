@@ -0,0 +1,71 @@
+from typing import List, Mapping, Optional
+
+import numpy as np
+
+
+class ConfluenceScorer:
+    """Weighted confluence scores over a stock x strategy membership matrix
+
+    Everything that depends only on the snapshot (the membership matrix and
+    min-max normalized numeric columns) is computed once, so scoring a new set
+    of weights is one matrix-vector product plus a partial selection.
+    """
+
+    def __init__(self, strategy_names: List[str], masks: np.ndarray,
+                 numeric: Mapping[str, np.ndarray], tiebreak: np.ndarray):
+        self.strategy_names = strategy_names
+        bits = np.arange(len(strategy_names), dtype=np.int64)
+        self.membership = ((masks[:, None] >> bits) & 1).astype(np.float64)
+        self.counts = self.membership.sum(axis=1)
+        self.tiebreak = tiebreak
+        self.normalized = {column: self._normalize(values) for column, values in numeric.items()}
+
+    @staticmethod
+    def _normalize(values: np.ndarray) -> np.ndarray:
+        """Scale a column to [0, 1]; missing values score 0"""
+        present = ~np.isnan(values)
+        if not present.any():
+            return np.zeros(len(values))
+        low, high = values[present].min(), values[present].max()
+        span = high - low
+        scaled = (values - low) / span if span > 0 else np.where(present, 1.0, 0.0)
+        return np.nan_to_num(scaled, nan=0.0)
+
+    def weight_vector(self, strategy_weights: Mapping[str, float]) -> np.ndarray:
+        """Per-strategy weights in index order; strategies not mentioned weigh 1"""
+        unknown = set(strategy_weights) - set(self.strategy_names)
+        if unknown:
+            raise ValueError(f"Unknown strategies: {', '.join(sorted(unknown))}")
+        return np.array([strategy_weights.get(name, 1.0) for name in self.strategy_names], dtype=np.float64)
+
+    def score(self, strategy_weights: Mapping[str, float],
+              column_weights: Optional[Mapping[str, float]] = None) -> np.ndarray:
+        """Weighted membership plus weighted normalized numeric columns, for every stock"""
+        scores = self.membership @ self.weight_vector(strategy_weights)
+        for column, weight in (column_weights or {}).items():
+            if column not in self.normalized:
+                raise ValueError(f"Unknown numeric column: {column}")
+            scores += weight * self.normalized[column]
+        return scores
+
+    def top_k(self, scores: np.ndarray, k: int, min_strategies: int = 1) -> np.ndarray:
+        """Positions of the k best scores among eligible stocks, by score desc then tiebreak
+
+        Uses a partial selection for the cutoff and only sorts the stocks at or above it.
+        """
+        eligible = np.flatnonzero(self.counts >= min_strategies)
+        if k <= 0 or not len(eligible):
+            return eligible[:0]
+
+        candidates = eligible
+        if k < len(eligible):
+            eligible_scores = scores[eligible]
+            cutoff = eligible_scores[np.argpartition(-eligible_scores, k - 1)[k - 1]]
+            # Keep every stock tied at the cutoff so the tiebreak, not partition order, decides
+            candidates = eligible[eligible_scores >= cutoff]
+
+        order = np.lexsort((self.tiebreak[candidates], -scores[candidates]))
+        return candidates[order[:k]]
+
+    def eligible_count(self, min_strategies: int = 1) -> int:
+        return int(np.count_nonzero(self.counts >= min_strategies))
@@ -0,0 +1,170 @@
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StoredSnapshot:
+    """A scan snapshot as read back from disk"""
+    version: int
+    created_at: pd.Timestamp
+    strategy_data: Dict[str, pd.DataFrame]
+    records: Dict[int, List[Dict[str, Any]]] = field(default_factory=dict)
+    fetched_at: Dict[str, pd.Timestamp] = field(default_factory=dict)
+
+
+class SnapshotStore:
+    """SQLite store of scan snapshots so a restarted API can serve immediately
+
+    It also lets worker processes share one scraper: the leader saves each
+    snapshot here, and followers poll latest_version() and load new ones.
+    """
+
+    def __init__(self, path: str, keep: int = 5):
+        self.path = path
+        self.keep = max(1, keep)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    version INTEGER PRIMARY KEY,
+                    created_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS strategy_tables (
+                    version INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    strategy TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    fetched_at TEXT,
+                    PRIMARY KEY (version, strategy)
+                );
+                CREATE TABLE IF NOT EXISTS results (
+                    version INTEGER NOT NULL,
+                    min_strategies INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (version, min_strategies)
+                );
+                CREATE TABLE IF NOT EXISTS control (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+            # Stores written before tables carried their own fetch time
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(strategy_tables)")}
+            if "fetched_at" not in columns:
+                conn.execute("ALTER TABLE strategy_tables ADD COLUMN fetched_at TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _encode_table(df: pd.DataFrame) -> str:
+        return json.dumps({"columns": list(df.columns), "data": df.values.tolist()})
+
+    @staticmethod
+    def _decode_table(payload: str) -> pd.DataFrame:
+        table = json.loads(payload)
+        return pd.DataFrame(table["data"], columns=table["columns"])
+
+    def save(self, snapshot, min_strategies_range=range(1, 8)) -> None:
+        """Persist a snapshot's tables and per-threshold results, pruning old versions"""
+        tables = [
+            (snapshot.version, position, strategy_name, self._encode_table(df),
+             snapshot.fetched_at.get(strategy_name, snapshot.created_at).isoformat())
+            for position, (strategy_name, df) in enumerate(snapshot.strategy_data.items())
+        ]
+        results = [
+            (snapshot.version, min_strategies, json.dumps(snapshot.records(min_strategies)))
+            for min_strategies in min_strategies_range
+        ]
+
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO snapshots (version, created_at) VALUES (?, ?)",
+                         (snapshot.version, snapshot.created_at.isoformat()))
+            conn.execute("DELETE FROM strategy_tables WHERE version = ?", (snapshot.version,))
+            conn.execute("DELETE FROM results WHERE version = ?", (snapshot.version,))
+            conn.executemany("INSERT INTO strategy_tables (version, position, strategy, payload, fetched_at) "
+                             "VALUES (?, ?, ?, ?, ?)", tables)
+            conn.executemany("INSERT INTO results VALUES (?, ?, ?)", results)
+
+            stale = "SELECT version FROM snapshots ORDER BY version DESC LIMIT -1 OFFSET ?"
+            for table in ("strategy_tables", "results", "snapshots"):
+                conn.execute(f"DELETE FROM {table} WHERE version IN ({stale})", (self.keep,))
+
+        logger.info(f"Saved snapshot v{snapshot.version} to {self.path}")
+
+    def latest_version(self) -> Optional[int]:
+        """Version of the newest stored snapshot, if any"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(version) FROM snapshots").fetchone()
+        return row[0] if row else None
+
+    def request_refresh(self) -> None:
+        """Ask whichever process is scraping to refresh soon"""
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO control (key, value) VALUES ('refresh_requested', ?)",
+                         (pd.Timestamp.now().isoformat(),))
+
+    def take_refresh_request(self) -> bool:
+        """Consume a pending refresh request, returning whether there was one"""
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM control WHERE key = 'refresh_requested'").rowcount > 0
+
+    def set_leader_loading(self, loading: bool) -> None:
+        """Record whether the leader is running a refresh, for followers to report"""
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO control (key, value) VALUES ('leader_loading', ?)",
+                         ("1" if loading else "0",))
+
+    def leader_loading(self) -> bool:
+        """Whether the leader last said it was running a refresh"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM control WHERE key = 'leader_loading'").fetchone()
+        return row is not None and row[0] == "1"
+
+    def load(self, version: Optional[int] = None) -> Optional[StoredSnapshot]:
+        """Load a stored snapshot, the newest one by default"""
+        with self._connect() as conn:
+            if version is None:
+                row = conn.execute(
+                    "SELECT version, created_at FROM snapshots ORDER BY version DESC LIMIT 1"
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT version, created_at FROM snapshots WHERE version = ?", (version,)
+                ).fetchone()
+            if row is None:
+                return None
+
+            version, created_at = row
+            tables = conn.execute(
+                "SELECT strategy, payload, fetched_at FROM strategy_tables WHERE version = ? ORDER BY position",
+                (version,)
+            ).fetchall()
+            results = conn.execute(
+                "SELECT min_strategies, payload FROM results WHERE version = ?", (version,)
+            ).fetchall()
+
+        return StoredSnapshot(
+            version=version,
+            created_at=pd.Timestamp(created_at),
+            strategy_data={strategy: self._decode_table(payload) for strategy, payload, _ in tables},
+            records={min_strategies: json.loads(payload) for min_strategies, payload in results},
+            fetched_at={strategy: pd.Timestamp(fetched_at) for strategy, _, fetched_at in tables if fetched_at}
+        )
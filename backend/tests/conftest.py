@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+import tempfile
+from collections import deque
+
+import pandas as pd
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [BACKEND_DIR, os.path.join(BACKEND_DIR, "benchmarks")]
+
+# Keep the snapshot store and leader lock of anything importing api out of the tree
+os.environ.setdefault("SNAPSHOT_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="screener-tests-"), "snapshots.db"))
+
+from main import AsyncWebScraper, StockAnalyzer, StrategyManager, WebScraper  # noqa: E402
+from ratelimit import AdaptiveRateLimiter  # noqa: E402
+from responses import ResponseCache  # noqa: E402
+from standin import StandInConfig, StandInServer  # noqa: E402
+
+
+BACKENDS = ["sync", "async"]
+
+
+def screen_url(server: StandInServer, screen_id: int) -> str:
+    return f"{server.base_url}/screens/{screen_id}/test/"
+
+
+def make_scraper(backend: str, **kwargs):
+    """A scraper without retry backoff, and without pacing unless a request rate is given"""
+    cls = WebScraper if backend == "sync" else AsyncWebScraper
+    kwargs.setdefault("max_requests_per_second", 0)
+    return cls(delay=0.0, **kwargs)
+
+
+def scrape(scraper, url: str) -> pd.DataFrame:
+    if isinstance(scraper, AsyncWebScraper):
+        return asyncio.run(scraper.scrape_strategy_data(url))
+    return scraper.scrape_strategy_data(url)
+
+
+@pytest.fixture
+def standin():
+    """Stand-in screener serving 4 pages of 25 rows per screen, without latency"""
+    with StandInServer(StandInConfig(latency=0.0)) as server:
+        yield server
+
+
+def make_analyzer(server: StandInServer, backend: str = "sync") -> StockAnalyzer:
+    """Analyzer whose seven strategies are screens 1-7 of a stand-in, scraped without pacing"""
+    manager = StrategyManager()
+    for screen_id, config in enumerate(manager.strategies.values(), start=1):
+        config.url = screen_url(server, screen_id)
+    analyzer = StockAnalyzer(manager, scraper_backend=backend)
+    limiter = AdaptiveRateLimiter(initial_rate=0)
+    for scraper in (analyzer.scraper, analyzer.async_scraper):
+        scraper.delay = 0.0
+        scraper.rate_limiter = limiter
+    return analyzer
+
+
+@pytest.fixture
+def analyzer(standin):
+    return make_analyzer(standin)
+
+
+@pytest.fixture(scope="session")
+def snapshot():
+    """Snapshot of a full scan of a stand-in of its own, shared by the read-only API tests"""
+    with StandInServer(StandInConfig(latency=0.0)) as server:
+        return make_analyzer(server).scan(refresh=True)
+
+
+@pytest.fixture
+def client(snapshot, monkeypatch):
+    """API client serving the shared snapshot from fresh response caches, without startup scans"""
+    import api
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setitem(api.cache, "snapshot", snapshot)
+    monkeypatch.setattr(api, "encoded_responses", ResponseCache())
+    monkeypatch.setattr(api, "query_responses", ResponseCache(max_entries=256))
+    monkeypatch.setattr(api, "snapshot_history", deque([snapshot], maxlen=api.SNAPSHOT_HISTORY))
+    api.warm_responses(snapshot)
+    return TestClient(api.app)
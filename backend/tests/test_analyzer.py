@@ -0,0 +1,107 @@
+import asyncio
+
+from conftest import make_analyzer
+from tracing import profile
+
+
+def strategy_names(analyzer):
+    return list(analyzer.strategy_manager.get_all_strategies())
+
+
+def test_scan_builds_snapshot_of_every_strategy(analyzer, standin):
+    snapshot = analyzer.scan(refresh=True)
+
+    assert snapshot.strategy_count == 7
+    assert all(len(df) == standin.config.rows_per_screen for df in snapshot.strategy_data.values())
+    # Stocks listed by several screens are one entry in the index
+    assert len(snapshot.index.keys) < 7 * standin.config.rows_per_screen
+    assert snapshot.index.counts.max() > 1
+
+
+def test_failed_strategy_keeps_previous_table(analyzer, standin):
+    first = analyzer.scan(refresh=True)
+    for page in range(1, standin.config.pages + 1):
+        standin.fail(1, page, times=analyzer.scraper.max_retries)
+
+    second = analyzer.scan(refresh=True, base=first)
+
+    name = strategy_names(analyzer)[0]
+    assert second.version > first.version
+    assert second.strategy_count == 7
+    assert second.strategy_data[name] is first.strategy_data[name]
+    assert second.records(2) == first.records(2)
+
+
+def test_refresh_strategies_scrapes_only_the_named_ones(analyzer, standin):
+    first = analyzer.scan(refresh=True)
+    name = strategy_names(analyzer)[2]
+    standin.revise(3)
+    analyzer.scraper.verify_every = 0
+
+    standin.reset_stats()
+    second = analyzer.refresh_strategies([name], first)
+
+    assert standin.stats["requests"] == standin.config.pages
+    assert set(second.strategy_data[name]["Name"]) != set(first.strategy_data[name]["Name"])
+    for other in strategy_names(analyzer):
+        if other != name:
+            assert second.strategy_data[other] is first.strategy_data[other]
+
+
+def test_quiet_refresh_reads_only_first_pages(analyzer, standin):
+    analyzer.scan(refresh=True)
+
+    standin.reset_stats()
+    analyzer.scan(refresh=True)
+    assert standin.stats["requests"] == 7
+
+
+def test_invalidate_forgets_page_fingerprints(analyzer, standin):
+    analyzer.scan(refresh=True)
+    analyzer.invalidate()
+
+    standin.reset_stats()
+    analyzer.scan(refresh=True)
+    assert standin.stats["requests"] == 7 * standin.config.pages
+    assert standin.stats.get("304", 0) == 0
+
+
+def test_invalidate_one_strategy(analyzer, standin):
+    analyzer.scan(refresh=True)
+    analyzer.invalidate(strategy_names(analyzer)[0])
+
+    standin.reset_stats()
+    analyzer.scan(refresh=True)
+    assert standin.stats["requests"] == standin.config.pages + 6
+
+
+def test_async_backend_reuses_its_loop_and_client(standin):
+    analyzer = make_analyzer(standin, backend="async")
+
+    first = analyzer.scan(refresh=True)
+    client = analyzer._client
+    second = analyzer.scan(refresh=True, base=first)
+
+    assert first.strategy_count == second.strategy_count == 7
+    assert client is not None and analyzer._client is client
+    assert not client.is_closed
+
+
+def test_async_backend_scans_from_inside_a_running_loop(standin):
+    analyzer = make_analyzer(standin, backend="async")
+
+    async def scan_from_handler():
+        return analyzer.scan(refresh=True)
+
+    assert asyncio.run(scan_from_handler()).strategy_count == 7
+    assert not analyzer.get_strategy_stocks(strategy_names(analyzer)[0]).empty
+
+
+def test_async_backend_scans_join_the_callers_trace(standin):
+    analyzer = make_analyzer(standin, backend="async")
+
+    _, scan_profile = profile(analyzer.scan, True, interval=0.001)
+
+    stages = {stage["stage"]: stage["count"] for stage in scan_profile.stages}
+    assert stages["scrape"] == 7
+    assert stages["fetch_page"] >= 7 * standin.config.pages
@@ -0,0 +1,51 @@
+def names(body, result):
+    return [body["stocks"][key]["Name"] for key in result["keys"]]
+
+
+def test_batch_answers_thresholds_and_subsets_in_one_round_trip(client, snapshot):
+    body = client.post("/search/batch", json={"queries": [
+        {"min_strategies": 2},
+        {"min_strategies": 3, "limit": 5},
+        {"strategies": ["S1", "S2"]},
+        {"strategies": ["S1", "S2"], "min_strategies": 3, "sort": "-RSI"},
+    ]}).json()
+    threshold, top, subset, narrowed = body["results"]
+
+    assert body["success"] and body["snapshot_version"] == snapshot.version
+    assert names(body, threshold) == [record["Name"] for record in snapshot.records(2)]
+    assert names(body, top) == names(body, threshold)[:len(top["keys"])] and top["total"] == len(snapshot.records(3))
+    common = snapshot.resolve_strategies(["S1", "S2"])
+    assert names(body, subset) == [record["Name"] for record in snapshot.subset_records(common)]
+    assert set(names(body, narrowed)) <= set(names(body, subset))
+    assert all(body["stocks"][key]["Strategies_Count"] >= 3 for key in narrowed["keys"])
+
+
+def test_batch_shares_stock_records_between_queries(client, snapshot):
+    body = client.post("/search/batch", json={"queries": [{"min_strategies": 2}, {"min_strategies": 3}]}).json()
+
+    keys = [key for result in body["results"] for key in result["keys"]]
+    assert len(body["stocks"]) == len(set(keys)) == len(snapshot.records(2))
+
+
+def test_one_bad_query_does_not_fail_the_batch(client):
+    body = client.post("/search/batch", json={"queries": [
+        {"strategies": ["S9"]},
+        {},
+        {"min_strategies": 7},
+    ]}).json()
+    unknown, empty, answered = body["results"]
+
+    assert body["success"]
+    assert not unknown["success"] and "Unknown strategy" in unknown["message"]
+    assert not empty["success"]
+    assert answered["total"] == len(answered["keys"])
+
+
+def test_batch_responses_are_cached_per_query_set(client):
+    request = {"queries": [{"min_strategies": 4}]}
+    first = client.post("/search/batch", json=request)
+    again = client.post("/search/batch", json=request, headers={"If-None-Match": first.headers["etag"]})
+    other = client.post("/search/batch", json={"queries": [{"min_strategies": 5}]})
+
+    assert again.status_code == 304
+    assert other.headers["etag"] != first.headers["etag"]
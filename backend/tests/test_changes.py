@@ -0,0 +1,55 @@
+from collections import deque
+
+import pytest
+
+import api
+
+
+@pytest.fixture
+def revised(snapshot):
+    """A later snapshot in which the first strategy dropped its most widely listed stock"""
+    first = list(snapshot.strategy_data)[0]
+    record = next(record for record in snapshot.records(2)
+                  if snapshot.short_names[first] in record["Strategies"].split(", "))
+    tables = dict(snapshot.strategy_data)
+    tables[first] = tables[first][tables[first]["Name"] != record["Name"]]
+    newer = api.restore_snapshot(tables, snapshot.version + 1, snapshot.created_at)
+    return newer, record
+
+
+def test_diff_reports_level_and_strategy_changes(snapshot, revised):
+    newer, record = revised
+    count = record["Strategies_Count"]
+
+    diff = newer.diff(snapshot)
+
+    assert (diff["from_version"], diff["to_version"]) == (snapshot.version, newer.version)
+    assert diff["levels"][str(count)] == {"added": [], "removed": [record["Name"]]}
+    assert all(not change["added"] and not change["removed"]
+               for level, change in diff["levels"].items() if level != str(count))
+    first_short = newer.short_names[list(newer.strategy_data)[0]]
+    assert diff["strategy_changes"] == [{
+        "Name": record["Name"],
+        "added": [],
+        "removed": [first_short],
+        "Strategies": [name for name in record["Strategies"].split(", ") if name != first_short]
+    }]
+    assert newer.diff(newer)["strategy_changes"] == []
+
+
+def test_changes_endpoint_diffs_against_history(client, snapshot, revised, monkeypatch):
+    newer, record = revised
+    monkeypatch.setitem(api.cache, "snapshot", newer)
+    monkeypatch.setattr(api, "snapshot_history", deque([snapshot, newer], maxlen=api.SNAPSHOT_HISTORY))
+
+    body = client.get("/changes", params={"since": snapshot.version}).json()
+
+    assert body["success"] and not body["full_resync"]
+    assert [change["Name"] for change in body["strategy_changes"]] == [record["Name"]]
+
+
+def test_changes_past_history_ask_for_a_full_resync(client, snapshot):
+    body = client.get("/changes", params={"since": snapshot.version - 1}).json()
+
+    assert not body["success"]
+    assert body["full_resync"]
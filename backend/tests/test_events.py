@@ -0,0 +1,83 @@
+import asyncio
+import json
+import threading
+from collections import deque
+
+import api
+from events import EventBus
+from responses import ResponseCache
+from scheduler import RefreshScheduler
+
+
+def test_events_from_other_threads_reach_every_subscriber():
+    bus = EventBus()
+
+    async def run():
+        queues = [bus.subscribe(), bus.subscribe()]
+        thread = threading.Thread(target=bus.publish, args=("refresh-started", {"total": 7}))
+        thread.start()
+        thread.join()
+        return [await asyncio.wait_for(queue.get(), 1) for queue in queues]
+
+    events = asyncio.run(run())
+
+    assert [event["event"] for event in events] == ["refresh-started"] * 2
+    assert events[0]["id"] == 1 and events[0]["data"]["total"] == 7
+
+
+def test_slow_subscribers_lose_their_oldest_events():
+    bus = EventBus(max_queue=2)
+
+    async def run():
+        queue = bus.subscribe()
+        for rows in range(5):
+            bus.publish("strategy-progress", {"rows": rows})
+        await asyncio.sleep(0)
+        return [queue.get_nowait()["data"]["rows"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(run()) == [3, 4]
+
+
+def test_stream_sends_initial_state_events_and_heartbeats():
+    bus = EventBus(heartbeat_seconds=0.05)
+
+    async def run():
+        stream = bus.stream({"id": 0, "event": "snapshot", "data": {"is_loading": False}})
+        messages = [await stream.__anext__(), await stream.__anext__()]
+        bus.publish("refresh-completed", {"published": True})
+        messages.append(await stream.__anext__())
+        messages.append(await stream.__anext__())
+        await stream.aclose()
+        return messages
+
+    retry, initial, completed, heartbeat = asyncio.run(run())
+
+    assert retry == "retry: 5000\n\n"
+    assert initial.startswith("id: 0\nevent: snapshot\n")
+    assert json.loads(completed.split("data: ", 1)[1])["published"] is True
+    assert heartbeat == ": heartbeat\n\n"
+    assert bus.subscriber_count == 0
+
+
+def test_scan_publishes_refresh_lifecycle(snapshot, monkeypatch):
+    events = []
+
+    def scan_strategies(refresh, progress, base):
+        for name in snapshot.strategy_data:
+            progress(name, len(snapshot.strategy_data[name]))
+        return api.restore_snapshot(dict(snapshot.strategy_data), snapshot.version + 1, snapshot.created_at)
+
+    monkeypatch.setattr(api, "scan_strategies", scan_strategies)
+    monkeypatch.setattr(api.event_bus, "publish", lambda event, data: events.append((event, data)))
+    monkeypatch.setitem(api.cache, "snapshot", snapshot)
+    monkeypatch.setattr(api, "snapshot_history", deque([snapshot], maxlen=api.SNAPSHOT_HISTORY))
+    monkeypatch.setattr(api, "encoded_responses", ResponseCache())
+    monkeypatch.setattr(api.snapshot_store, "save", lambda snapshot: None)
+    monkeypatch.setattr(api, "refresh_scheduler", RefreshScheduler({}))
+
+    api.scan_and_publish(refresh=True)
+
+    assert [event for event, _ in events] == ["refresh-started"] + ["strategy-progress"] * 7 + ["refresh-completed"]
+    assert events[-2][1]["completed"] == events[-2][1]["total"] == 7
+    assert events[-1][1] == {"published": True, **api.snapshot_info(api.cache["snapshot"])}
+    assert api.cache["snapshot"].version == snapshot.version + 1
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+
+import pytest
+
+import export
+from export import stream_export
+
+
+def test_ndjson_lists_every_stock_with_its_flags(client, snapshot):
+    response = client.get("/export", params={"min_strategies": 2})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert f'snapshot-v{snapshot.version}.ndjson' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    records = snapshot.records(2)
+    assert [row["Name"] for row in rows] == [record["Name"] for record in records]
+    for row, record in zip(rows, records):
+        assert row["Strategies_Count"] == record["Strategies_Count"]
+        assert [short for short in snapshot.short_names.values() if row[short]] == record["Strategies"].split(", ")
+        assert row["RSI"] == record["RSI"]
+
+
+def test_csv_matches_ndjson(client):
+    rows = list(csv.DictReader(io.StringIO(client.get("/export", params={"format": "csv"}).text)))
+    lines = [json.loads(line) for line in client.get("/export").text.splitlines()]
+
+    assert len(rows) == len(lines)
+    for row, line in zip(rows, lines):
+        assert row["Name"] == line["Name"]
+        assert int(row["S1"]) == line["S1"]
+        assert row["P/E"] == (line["P/E"] or "")
+
+
+def test_small_chunks_stream_the_same_rows(snapshot):
+    whole = b"".join(stream_export(snapshot, "ndjson"))
+    chunks = list(stream_export(snapshot, "ndjson", chunk_size=7))
+
+    assert len(chunks) == -(-len(snapshot.index.keys) // 7)
+    assert b"".join(chunks) == whole
+
+
+def test_bad_formats_are_reported_before_streaming(client, monkeypatch):
+    assert "Unknown export format" in client.get("/export", params={"format": "xml"}).json()["message"]
+
+    monkeypatch.setattr(export, "pa", None)
+    assert "needs pyarrow" in client.get("/export", params={"format": "arrow"}).json()["message"]
+
+
+def test_arrow_stream_round_trips(snapshot):
+    pa = pytest.importorskip("pyarrow")
+
+    table = pa.ipc.open_stream(b"".join(stream_export(snapshot, "arrow", chunk_size=50))).read_all()
+
+    assert table.num_rows == len(snapshot.index.keys)
+    assert table.schema.field("RSI").type == pa.float64()
+    assert table.column("Name").to_pylist() == [record["Name"] for record in snapshot.records(1)]
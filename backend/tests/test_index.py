@@ -0,0 +1,55 @@
+from collections import Counter
+
+import pandas as pd
+
+from main import StrategyIndex
+
+
+def table(*rows):
+    return pd.DataFrame([{"Name": name, "CMPRs.": cmp} for name, cmp in rows])
+
+
+TABLES = {
+    "A": table(("Infosys", "1,500.5"), ("TCS", "3,900"), ("Wipro", "450")),
+    "B": table(("TCS", "3,900"), ("Wipro", "450"), ("HDFC Bank", "1,650")),
+    "C": table(("Wipro", "450"), ("ITC", "")),
+}
+
+
+def test_index_masks_each_stock_by_its_strategies():
+    index = StrategyIndex.build(TABLES)
+
+    masks = {key: int(index.masks[position]) for key, position in index.positions.items()}
+    assert masks == {"Infosys": 0b001, "TCS": 0b011, "Wipro": 0b111, "HDFC Bank": 0b010, "ITC": 0b100}
+    assert index.strategies_for(masks["TCS"]) == ["A", "B"]
+    assert index.mask_for(["C", "A", "Unknown"]) == 0b101
+
+
+def test_thresholds_are_count_then_name_ordered():
+    index = StrategyIndex.build(TABLES)
+
+    def names(positions):
+        return [index.keys[position] for position in positions]
+
+    assert names(index.at_least(1)) == ["Wipro", "TCS", "HDFC Bank", "ITC", "Infosys"]
+    assert names(index.at_least(2)) == ["Wipro", "TCS"]
+    assert names(index.at_least(3)) == ["Wipro"]
+    assert names(index.at_least(4)) == []
+    assert names(index.containing_all(index.mask_for(["A", "B"]))) == ["TCS", "Wipro"]
+
+
+def test_numbers_are_parsed_once_per_index():
+    index = StrategyIndex.build(TABLES)
+
+    cmp = index.column_values("CMPRs.")
+    assert cmp[index.positions["Infosys"]] == 1500.5
+    assert pd.isna(cmp[index.positions["ITC"]])
+
+
+def test_index_matches_counting_the_tables(snapshot):
+    counts = Counter(name.strip() for df in snapshot.strategy_data.values() for name in set(df["Name"]))
+
+    for min_strategies in range(1, 8):
+        expected = {name for name, count in counts.items() if count >= min_strategies}
+        found = {record["Name"].strip() for record in snapshot.records(min_strategies)}
+        assert found == expected
@@ -0,0 +1,56 @@
+import os
+
+import api
+from leader import LeaderLease
+from store import SnapshotStore
+
+
+def test_only_one_worker_holds_the_lease(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    first, second = LeaderLease(path), LeaderLease(path)
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    assert second.holder() == os.getpid()
+
+    first.release()
+    assert second.try_acquire()
+    assert second.is_leader and not first.is_leader
+    second.release()
+
+
+def test_followers_report_the_leaders_refresh(client, tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path / "snapshots.db"))
+    monkeypatch.setattr(api, "snapshot_store", store)
+    monkeypatch.setitem(api.cache, "is_loading", False)
+    idle = client.get("/status")
+
+    store.set_leader_loading(True)
+    api.sync_loading_from_store()
+    loading = client.get("/status", headers={"If-None-Match": idle.headers["etag"]})
+
+    assert loading.status_code == 200
+    assert loading.json()["is_loading"] and loading.json()["role"] == "follower"
+
+    store.set_leader_loading(False)
+    api.sync_loading_from_store()
+    assert not client.get("/status").json()["is_loading"]
+
+
+def test_leader_shares_its_loading_state(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path / "snapshots.db"))
+    seen = []
+
+    def scan_and_publish(refresh):
+        seen.append(store.leader_loading())
+        raise RuntimeError("upstream is down")
+
+    monkeypatch.setattr(api, "snapshot_store", store)
+    monkeypatch.setattr(api, "scan_and_publish", scan_and_publish)
+    monkeypatch.setitem(api.cache, "is_loading", False)
+
+    api.background_fetch()
+
+    assert seen == [True]
+    assert not store.leader_loading()
+    assert not api.cache["is_loading"]
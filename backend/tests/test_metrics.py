@@ -0,0 +1,45 @@
+from metrics import Registry
+from responses import RESPONSE_CACHE
+
+import api
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("test_requests_total", "Requests", ["status"])
+    latency = registry.histogram("test_latency_seconds", "Latency", buckets=[0.1, 1.0])
+    requests.inc(status="200")
+    requests.inc(2, status="500")
+    latency.observe(0.5)
+
+    text = registry.render()
+
+    assert '# TYPE test_requests_total counter' in text
+    assert 'test_requests_total{status="500"} 2' in text
+    assert 'test_latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'test_latency_seconds_bucket{le="+Inf"} 1' in text
+    assert latency.count() == 1
+    # Registering the same name again hands back the existing metric
+    assert registry.counter("test_requests_total", "Requests", ["status"]) is requests
+
+
+def test_response_cache_counts_per_endpoint(client):
+    before = {result: RESPONSE_CACHE.value(endpoint="/cooccurrence", result=result) for result in ("hit", "miss")}
+
+    client.get("/cooccurrence")
+    client.get("/cooccurrence")
+
+    assert RESPONSE_CACHE.value(endpoint="/cooccurrence", result="miss") == before["miss"] + 1
+    assert RESPONSE_CACHE.value(endpoint="/cooccurrence", result="hit") == before["hit"] + 1
+
+
+def test_every_endpoint_is_timed(client):
+    before = {endpoint: api.REQUEST_SECONDS.count(endpoint=endpoint) for endpoint in ("/status", "/export")}
+
+    client.get("/status")
+    client.get("/export")
+
+    assert all(api.REQUEST_SECONDS.count(endpoint=endpoint) == count + 1 for endpoint, count in before.items())
+    text = client.get("/metrics").text
+    assert 'screener_api_request_seconds_count{endpoint="/export"}' in text
+    assert 'screener_response_cache_total{endpoint="/status",result="miss"}' in text
@@ -0,0 +1,43 @@
+import numpy as np
+
+from scoring import ConfluenceScorer
+
+
+def brute_force(scorer, scores, k, min_strategies):
+    eligible = [i for i in range(len(scores)) if scorer.counts[i] >= min_strategies]
+    return sorted(eligible, key=lambda i: (-scores[i], scorer.tiebreak[i]))[:k]
+
+
+def test_top_k_matches_a_full_sort():
+    rng = np.random.default_rng(7)
+    masks = rng.integers(0, 1 << 7, size=500)
+    numeric = {"RSI": rng.uniform(0, 100, size=500)}
+    scorer = ConfluenceScorer([f"S{i}" for i in range(7)], masks, numeric, rng.permutation(500).astype(float))
+
+    for weights, column_weights in [({}, None), ({"S3": 2.5, "S0": 0.0}, None), ({}, {"RSI": 3.0})]:
+        scores = scorer.score(weights, column_weights)
+        for k, min_strategies in [(1, 1), (25, 1), (25, 4), (1000, 2)]:
+            assert scorer.top_k(scores, k, min_strategies).tolist() == brute_force(scorer, scores, k, min_strategies)
+
+
+def test_default_weights_rank_by_strategy_count(client, snapshot):
+    body = client.post("/rank", json={"limit": 10}).json()
+
+    assert body["total"] == len(snapshot.index.keys)
+    assert [record["Name"] for record in body["data"]] == [record["Name"] for record in snapshot.records(1)[:10]]
+    assert [record["Score"] for record in body["data"]] == [record["Strategies_Count"] for record in body["data"]]
+
+
+def test_weights_by_short_name_reorder_the_ranking(client, snapshot):
+    body = client.post("/rank", json={"weights": {"S5": 10}, "limit": 20, "min_strategies": 2}).json()
+
+    assert body["total"] == len(snapshot.records(2))
+    # With S5 weighted far above the rest, every S5 stock outranks every other one
+    in_s5 = ["S5" in record["Strategies"].split(", ") for record in body["data"]]
+    assert in_s5 == sorted(in_s5, reverse=True)
+    assert all(record["Strategies_Count"] >= 2 for record in body["data"])
+
+
+def test_unknown_weights_are_rejected(client):
+    assert "Unknown strategies" in client.post("/rank", json={"weights": {"S9": 2}}).json()["message"]
+    assert "Unknown numeric column" in client.post("/rank", json={"column_weights": {"Name": 1}}).json()["message"]
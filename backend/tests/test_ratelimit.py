@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from conftest import BACKENDS, make_scraper, scrape, screen_url
+from ratelimit import AdaptiveRateLimiter, parse_retry_after
+
+URL = "http://screener.test/screens/1/test/"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("Wed, 21 Oct 2026 07:28:10 GMT", now=1792567680.0) == 10.0
+    assert parse_retry_after("Wed, 21 Oct 2026 07:28:00 GMT", now=1792567690.0) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_throttle_halves_rate_and_holds_host_until_retry_after():
+    limiter = AdaptiveRateLimiter(initial_rate=8.0)
+    limiter.record(URL, 0.1, 429, "3")
+
+    assert limiter.rate(URL) == 4.0
+    assert limiter.reserve(URL) == pytest.approx(3.0 + 1 / 4.0, abs=0.05)
+    assert limiter.stats()["screener.test"]["blocked_for"] == pytest.approx(3.0, abs=0.05)
+
+
+def test_throttles_from_requests_in_flight_count_once():
+    limiter = AdaptiveRateLimiter(initial_rate=8.0)
+    for _ in range(4):
+        limiter.record(URL, 0.1, 429, "2")
+
+    assert limiter.rate(URL) == 4.0
+
+
+def test_throttle_without_retry_after_uses_cooldown():
+    limiter = AdaptiveRateLimiter(initial_rate=8.0, throttle_cooldown=5.0, max_retry_after=10.0)
+    limiter.record(URL, 0.1, 503)
+    assert limiter.stats()["screener.test"]["blocked_for"] == pytest.approx(5.0, abs=0.05)
+
+    # A Retry-After past the cap is cut down to it
+    limiter.record("http://other.test/", 0.1, 429, "3600")
+    assert limiter.stats()["other.test"]["blocked_for"] == pytest.approx(10.0, abs=0.05)
+
+
+def test_rate_follows_responses():
+    limiter = AdaptiveRateLimiter(initial_rate=8.0, increase=0.5, latency_target=1.0)
+    limiter.record(URL, 0.1, 200)
+    assert limiter.rate(URL) == 8.5
+
+    limiter.record(URL, 0.1, 500)
+    assert limiter.rate(URL) == pytest.approx(8.5 * 0.75)
+
+    # Client errors say nothing about load
+    limiter.record(URL, 0.1, 404)
+    assert limiter.rate(URL) == pytest.approx(8.5 * 0.75)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_scrape_waits_out_retry_after(standin, backend):
+    standin.config.retry_after = 1
+    standin.fail(1, 1, status=429)
+    scraper = make_scraper(backend, max_requests_per_second=50.0)
+
+    started = time.monotonic()
+    df = scrape(scraper, screen_url(standin, 1))
+
+    assert len(df) == standin.config.rows_per_screen
+    assert standin.stats["429"] == 1
+    assert time.monotonic() - started >= 0.9
+    assert scraper.rate_limiter.rate(standin.base_url) < 50.0
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_client_errors_are_not_retried(standin, backend):
+    df = scrape(make_scraper(backend), f"{standin.base_url}/missing/")
+
+    assert df.empty
+    assert standin.stats["requests"] == 1
@@ -0,0 +1,86 @@
+import gzip
+
+import pandas as pd
+import pytest
+
+import api
+from responses import EncodedResponse
+
+
+def test_search_is_answered_with_etag_and_304(client, snapshot):
+    response = client.post("/search", json={"min_strategies": 2})
+    etag = response.headers["etag"]
+    assert etag.startswith(f'"v{snapshot.version}-')
+    assert response.headers["x-snapshot-version"] == str(snapshot.version)
+
+    again = client.post("/search", json={"min_strategies": 2}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+
+    weak = client.post("/search", json={"min_strategies": 2}, headers={"If-None-Match": f"W/{etag}"})
+    assert weak.status_code == 304
+
+    other = client.post("/search", json={"min_strategies": 3}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+
+def test_etag_changes_with_a_new_snapshot_of_the_same_version(client, snapshot, monkeypatch):
+    etag = client.post("/search", json={"min_strategies": 2}).headers["etag"]
+
+    # A redeploy that lost the store starts counting versions from 1 again
+    rebuilt = api.restore_snapshot(dict(snapshot.strategy_data), snapshot.version,
+                                   snapshot.created_at + pd.Timedelta(seconds=1))
+    monkeypatch.setitem(api.cache, "snapshot", rebuilt)
+
+    response = client.post("/search", json={"min_strategies": 2}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("accept, encoding", [
+    ("br, gzip", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("identity", None),
+])
+def test_content_encoding_follows_accept_encoding(client, accept, encoding):
+    plain = client.post("/search", json={"min_strategies": 2}, headers={"Accept-Encoding": "identity"})
+    response = client.post("/search", json={"min_strategies": 2}, headers={"Accept-Encoding": accept})
+
+    assert response.headers.get("content-encoding") == encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+    # The client decodes the body, which must be the same JSON in every encoding
+    assert response.content == plain.content
+
+
+def test_small_bodies_are_not_compressed():
+    encoded = EncodedResponse({"success": True}, "tiny")
+    assert encoded.encodings == ()
+    assert encoded.choose_encoding("br, gzip") == "identity"
+
+
+def test_one_off_responses_compress_only_what_is_asked_for():
+    encoded = EncodedResponse({"data": list(range(1000))}, "query", precompress=False)
+    assert set(encoded.variants) == {"identity"}
+    assert gzip.decompress(encoded.variant("gzip")) == encoded.variants["identity"]
+    assert set(encoded.variants) == {"identity", "gzip"}
+
+
+@pytest.mark.parametrize("min_strategies", [0, 1, 8, 79])
+def test_out_of_range_thresholds_are_rejected_without_caching(client, min_strategies):
+    cached = len(api.encoded_responses)
+    body = client.post("/search", json={"min_strategies": min_strategies}).json()
+
+    assert body["success"] is False
+    assert "between 2 and 7" in body["message"]
+    assert len(api.encoded_responses) == cached
+
+
+def test_status_etag_follows_loading_state(client, monkeypatch):
+    idle = client.get("/status")
+    assert idle.json()["is_loading"] is False
+
+    monkeypatch.setitem(api.cache, "is_loading", True)
+    loading = client.get("/status", headers={"If-None-Match": idle.headers["etag"]})
+    assert loading.status_code == 200
+    assert loading.json()["is_loading"] is True
@@ -0,0 +1,155 @@
+from datetime import datetime
+
+import pytest
+
+from main import StrategyManager
+from scheduler import IST, RefreshScheduler, is_market_open, next_market_open
+
+# A Wednesday morning and a Friday evening, in IST
+WEDNESDAY_10AM = datetime(2026, 10, 14, 10, 0, tzinfo=IST).timestamp()
+FRIDAY_4PM = datetime(2026, 10, 16, 16, 0, tzinfo=IST).timestamp()
+MONDAY_OPEN = datetime(2026, 10, 19, 9, 15, tzinfo=IST).timestamp()
+
+MEMBERS = [f"Stock {i}" for i in range(100)]
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def refresh(scheduler: RefreshScheduler, clock: FakeClock, name: str, members, requests: int = 4) -> None:
+    """Move the clock to the strategy's due time, take it and record a refresh"""
+    clock.now += scheduler.seconds_until_due()
+    assert scheduler.due() == [name]
+    scheduler.record(name, members, requests)
+
+
+def interval(scheduler: RefreshScheduler, name: str) -> float:
+    return scheduler.stats()["strategies"][name]["interval"]
+
+
+def test_market_hours():
+    assert is_market_open(WEDNESDAY_10AM)
+    assert not is_market_open(FRIDAY_4PM)
+    assert not is_market_open(datetime(2026, 10, 17, 10, 0, tzinfo=IST).timestamp())
+    assert next_market_open(FRIDAY_4PM) == MONDAY_OPEN
+    assert next_market_open(WEDNESDAY_10AM) == datetime(2026, 10, 15, 9, 15, tzinfo=IST).timestamp()
+
+
+def test_quiet_screen_backs_off_to_max_interval():
+    clock = FakeClock(WEDNESDAY_10AM)
+    scheduler = RefreshScheduler({"A": 3600}, max_interval=8 * 3600, max_growth=1.5, clock=clock)
+
+    refresh(scheduler, clock, "A", MEMBERS)
+    assert interval(scheduler, "A") == 3600
+    refresh(scheduler, clock, "A", MEMBERS)
+    assert interval(scheduler, "A") == 5400
+
+    for _ in range(6):
+        refresh(scheduler, clock, "A", MEMBERS)
+    assert interval(scheduler, "A") == 8 * 3600
+    assert scheduler.stats()["strategies"]["A"]["last_churn"] == 0.0
+
+
+def test_churning_screen_speeds_up_to_min_interval():
+    clock = FakeClock(WEDNESDAY_10AM)
+    scheduler = RefreshScheduler({"A": 3600}, min_interval=900, clock=clock)
+
+    refresh(scheduler, clock, "A", MEMBERS)
+    for round_number in range(1, 4):
+        # Half the screen turns over between refreshes
+        refresh(scheduler, clock, "A", MEMBERS[:50] + [f"New {round_number}-{i}" for i in range(50)])
+    assert interval(scheduler, "A") == 900
+
+
+def test_failed_refresh_retries_sooner_without_adapting():
+    clock = FakeClock(WEDNESDAY_10AM)
+    scheduler = RefreshScheduler({"A": 7200}, retry_delay=600, clock=clock)
+
+    refresh(scheduler, clock, "A", None)
+
+    stats = scheduler.stats()["strategies"]["A"]
+    assert stats["failures"] == 1
+    assert stats["due_in"] == 600
+    assert stats["interval"] == 7200
+
+
+def test_request_budget_holds_back_refreshes():
+    clock = FakeClock(WEDNESDAY_10AM)
+    # 60 requests an hour refill the 10-request bucket at one request a minute
+    scheduler = RefreshScheduler({"A": 900, "B": 900}, min_interval=900, requests_per_hour=60, clock=clock)
+
+    clock.now += 900
+    clock.now += 3600
+    assert scheduler.due() == ["A", "B"]
+    scheduler.record("A", MEMBERS, 8)
+    scheduler.record("B", MEMBERS, 8)
+
+    clock.now += 900
+    assert scheduler.due() == ["A"]
+    # B has to wait for its 8 requests to refill
+    assert scheduler.seconds_until_due() == pytest.approx(7 * 60)
+    clock.now += 7 * 60
+    assert scheduler.due() == ["B"]
+
+
+def test_off_hours_stretch_stops_at_next_open():
+    clock = FakeClock(FRIDAY_4PM)
+    scheduler = RefreshScheduler({"A": 3600, "B": 86400}, off_hours_factor=4, clock=clock)
+
+    due_in = {name: stats["due_in"] for name, stats in scheduler.stats()["strategies"].items()}
+    assert due_in["A"] == 4 * 3600
+    assert due_in["B"] == MONDAY_OPEN - FRIDAY_4PM
+
+
+def test_strategies_start_from_their_own_cadence():
+    clock = FakeClock(WEDNESDAY_10AM)
+    strategies = StrategyManager().get_all_strategies()
+    scheduler = RefreshScheduler({name: config.refresh_interval for name, config in strategies.items()},
+                                 clock=clock)
+
+    due_in = {strategies[name].short_name: stats["due_in"]
+              for name, stats in scheduler.stats()["strategies"].items()}
+    # Daily-volume screens come round hourly, the FII holding screen once a day
+    assert due_in["S1"] == due_in["S2"] == 3600
+    assert due_in["S3"] > due_in["S5"] > due_in["S4"] > due_in["S1"]
+
+
+def test_expedite_makes_strategies_due_within_budget():
+    clock = FakeClock(WEDNESDAY_10AM)
+    scheduler = RefreshScheduler({"A": 3600, "B": 3600}, requests_per_hour=60, clock=clock)
+    clock.now += 3600
+    assert scheduler.due() == ["A", "B"]
+    scheduler.record("A", MEMBERS, 8)
+    scheduler.record("B", MEMBERS, 8)
+    # Long enough to refill the 10-request bucket, well short of the interval
+    clock.now += 1200
+
+    assert scheduler.expedite(["A", "B"]) == ["A", "B"]
+    # The bucket only has room for one 8-request refresh
+    assert len(scheduler.due()) == 1
+
+
+def test_expedite_waits_for_a_failed_refresh_to_retry():
+    clock = FakeClock(WEDNESDAY_10AM)
+    scheduler = RefreshScheduler({"A": 3600}, retry_delay=600, clock=clock)
+    refresh(scheduler, clock, "A", None)
+
+    assert scheduler.expedite(["A"]) == []
+    clock.now += 600
+    assert scheduler.due() == ["A"]
+
+
+def test_expedite_leaves_strategies_refreshed_since_the_close():
+    clock = FakeClock(FRIDAY_4PM)
+    scheduler = RefreshScheduler({"A": 4 * 3600, "B": 4 * 3600}, clock=clock)
+    # A was refreshed after Friday's close, B before it
+    scheduler.record("A", MEMBERS, now=FRIDAY_4PM - 60)
+    scheduler.record("B", MEMBERS, now=FRIDAY_4PM - 3600)
+
+    assert scheduler.expedite(["A", "B"]) == ["B"]
+    assert scheduler.due() == ["B"]
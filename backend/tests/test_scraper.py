@@ -0,0 +1,109 @@
+import pandas as pd
+import pytest
+
+from conftest import BACKENDS, make_scraper, scrape, screen_url
+
+
+def test_sync_and_async_scrapes_match(standin):
+    url = screen_url(standin, 1)
+    sync_df = scrape(make_scraper("sync"), url)
+    async_df = scrape(make_scraper("async"), url)
+
+    assert len(sync_df) == standin.config.rows_per_screen
+    assert sync_df["Name"].is_unique
+    pd.testing.assert_frame_equal(sync_df, async_df)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_pages_without_numbers_are_followed_by_next_link(standin, backend):
+    standin.config.page_links = False
+    df = scrape(make_scraper(backend), screen_url(standin, 1))
+
+    assert len(df) == standin.config.rows_per_screen
+    assert standin.stats["requests"] == standin.config.pages
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_windowed_paginator_is_followed_past_last_number(standin, backend):
+    standin.config.pages = 6
+    standin.config.page_window = 2
+    df = scrape(make_scraper(backend), screen_url(standin, 1))
+
+    assert len(df) == standin.config.rows_per_screen
+    assert df["Name"].is_unique
+    assert standin.stats["requests"] == standin.config.pages
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_failed_page_ends_the_walk(standin, backend):
+    scraper = make_scraper(backend, max_retries=2)
+    standin.fail(1, 3, times=2)
+
+    df = scrape(scraper, screen_url(standin, 1))
+
+    # Pages after the failed one are dropped, as the serial walk would never reach them
+    assert len(df) == 2 * standin.config.rows_per_page
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_failed_page_is_retried(standin, backend):
+    standin.fail(1, 3, times=1)
+    df = scrape(make_scraper(backend, max_retries=2), screen_url(standin, 1))
+
+    assert len(df) == standin.config.rows_per_screen
+    assert standin.stats["500"] == 1
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_truncated_walk_is_not_reused(standin, backend):
+    scraper = make_scraper(backend, max_retries=1)
+    url = screen_url(standin, 1)
+    standin.fail(1, 3)
+    assert len(scrape(scraper, url)) == 2 * standin.config.rows_per_page
+
+    # Page 1 is unchanged, but the short table must not be handed back for it
+    assert len(scrape(scraper, url)) == standin.config.rows_per_screen
+    standin.reset_stats()
+    assert len(scrape(scraper, url)) == standin.config.rows_per_screen
+    assert standin.stats["requests"] == 1
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_quiet_screen_stops_after_first_page(standin, backend):
+    scraper = make_scraper(backend)
+    url = screen_url(standin, 1)
+    first = scrape(scraper, url)
+
+    standin.reset_stats()
+    assert scrape(scraper, url) is first
+    assert standin.stats["requests"] == 1
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_change_past_first_page_is_found_by_periodic_full_walk(standin, backend):
+    scraper = make_scraper(backend)
+    scraper.verify_every = 1
+    url = screen_url(standin, 1)
+    first = scrape(scraper, url)
+    standin.revise(1)
+
+    # Page 1 and the result count still match, so the first check misses the change
+    assert scrape(scraper, url) is first
+
+    standin.reset_stats()
+    revised = scrape(scraper, url)
+    assert standin.stats["requests"] == standin.config.pages
+    assert set(revised["Name"]) != set(first["Name"])
+    assert len(revised) == len(first)
+
+
+def test_forget_scrapes_walks_the_screen_again(standin):
+    scraper = make_scraper("sync")
+    url = screen_url(standin, 1)
+    scrape(scraper, url)
+    scraper.forget_scrapes(url)
+    scraper.page_cache.clear()
+
+    standin.reset_stats()
+    assert len(scrape(scraper, url)) == standin.config.rows_per_screen
+    assert standin.stats["requests"] == standin.config.pages
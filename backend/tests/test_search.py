@@ -0,0 +1,49 @@
+import pytest
+
+from main import StrategyIndex
+
+
+def number(value):
+    return float(StrategyIndex.parse_numbers([value])[0])
+
+
+def test_search_sorts_on_typed_columns(client):
+    body = client.post("/search", json={"min_strategies": 2, "sort": "-P/E"}).json()
+
+    values = [number(record["P/E"]) for record in body["data"]]
+    assert values == sorted(values, reverse=True)
+    # Indian grouping like 1,55,279.18 sorts by value, not as text
+    caps = [number(record["Mar CapRs.Cr."]) for record in
+            client.post("/search", json={"min_strategies": 2, "sort": "Mar CapRs.Cr."}).json()["data"]]
+    assert caps == sorted(caps)
+
+
+def test_search_filters_and_pages(client, snapshot):
+    request = {"min_strategies": 2, "filters": [{"column": "RSI", "min": 30, "max": 70}], "sort": "Name"}
+    full = client.post("/search", json=request).json()
+
+    expected = sorted(record["Name"] for record in snapshot.records(2) if 30 <= number(record["RSI"]) <= 70)
+    assert [record["Name"] for record in full["data"]] == expected
+    assert full["total"] == len(expected)
+
+    page = client.post("/search", json={**request, "limit": 5, "offset": 5}).json()
+    assert page["total"] == full["total"]
+    assert (page["offset"], page["limit"]) == (5, 5)
+    assert page["data"] == full["data"][5:10]
+
+
+def test_unsorted_search_keeps_the_threshold_order(client, snapshot):
+    body = client.post("/search", json={"min_strategies": 3, "limit": 10}).json()
+
+    assert body["data"] == snapshot.records(3)[:10]
+
+
+@pytest.mark.parametrize("request_body", [
+    {"min_strategies": 2, "sort": "Unknown"},
+    {"min_strategies": 2, "filters": [{"column": "Strategies"}]},
+])
+def test_unknown_columns_are_rejected(client, request_body):
+    body = client.post("/search", json=request_body).json()
+
+    assert not body["success"]
+    assert "Unknown numeric column" in body["message"]
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import api
+from cache import SingleFlight
+from responses import ResponseCache
+from scheduler import RefreshScheduler
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(flight.do, "key", slow)
+        started.wait(5)
+        followers = [executor.submit(flight.do, "key", slow) for _ in range(3)]
+        time.sleep(0.05)
+        assert flight.in_flight("key")
+        release.set()
+        results = [first.result()] + [future.result() for future in followers]
+
+    assert results == ["result"] * 4
+    assert len(runs) == 1
+    assert not flight.in_flight("key")
+    # Once finished, the next call runs again
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_failures_reach_every_waiter():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream is down")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(flight.do, "key", failing)
+        started.wait(5)
+        follower = executor.submit(flight.do, "key", failing)
+        time.sleep(0.05)
+        release.set()
+        for future in (first, follower):
+            with pytest.raises(RuntimeError, match="upstream is down"):
+                future.result()
+
+
+def test_cold_searches_share_one_scan(snapshot, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    scans = []
+
+    def scan_strategies(refresh, progress, base):
+        scans.append(refresh)
+        time.sleep(0.2)
+        return api.restore_snapshot(dict(snapshot.strategy_data), snapshot.version, snapshot.created_at)
+
+    monkeypatch.setattr(api, "scan_strategies", scan_strategies)
+    monkeypatch.setitem(api.cache, "snapshot", None)
+    monkeypatch.setattr(api, "snapshot_history", deque(maxlen=api.SNAPSHOT_HISTORY))
+    monkeypatch.setattr(api, "encoded_responses", ResponseCache())
+    monkeypatch.setattr(api.leader_lease, "_fd", -1)
+    monkeypatch.setattr(api.snapshot_store, "save", lambda snapshot: None)
+    monkeypatch.setattr(api, "refresh_scheduler", RefreshScheduler({}))
+    client = TestClient(api.app)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(executor.map(lambda _: client.post("/search", json={"min_strategies": 2}), range(4)))
+
+    assert scans == [False]
+    assert all(response.json()["total"] == len(snapshot.records(2)) for response in responses)
@@ -0,0 +1,42 @@
+import dataclasses
+
+import pytest
+
+import api
+
+
+def test_snapshot_is_immutable(snapshot):
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snapshot.version = 99
+    with pytest.raises(TypeError):
+        snapshot.fetched_at["anything"] = snapshot.created_at
+
+
+def test_one_snapshot_answers_every_threshold(snapshot):
+    totals = [len(snapshot.records(min_strategies)) for min_strategies in range(1, 8)]
+
+    assert totals == sorted(totals, reverse=True)
+    assert totals[0] == len(snapshot.index.keys)
+    # Each threshold's records are built once and shared by every request
+    assert snapshot.records(2) is snapshot.records(2)
+    assert all(record["Strategies_Count"] >= 3 for record in snapshot.records(3))
+
+
+def test_search_serves_the_published_snapshot(client, snapshot):
+    for min_strategies in api.MIN_STRATEGIES_RANGE:
+        body = client.post("/search", json={"min_strategies": min_strategies}).json()
+        assert body["total"] == len(snapshot.records(min_strategies))
+        assert body["snapshot_version"] == snapshot.version
+
+
+def test_only_newer_snapshots_are_published(client, snapshot):
+    older = api.restore_snapshot(dict(snapshot.strategy_data), snapshot.version - 1, snapshot.created_at)
+    newer = api.restore_snapshot(dict(snapshot.strategy_data), snapshot.version + 1, snapshot.created_at)
+    empty = api.restore_snapshot({}, snapshot.version + 2, snapshot.created_at)
+
+    assert not api.publish_snapshot(older)
+    assert not api.publish_snapshot(empty)
+    assert api.cache["snapshot"] is snapshot
+    assert api.publish_snapshot(newer)
+    assert api.cache["snapshot"] is newer
+    assert api.snapshot_history[-1] is newer
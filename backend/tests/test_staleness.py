@@ -0,0 +1,45 @@
+import pandas as pd
+
+import api
+
+
+def test_partial_refresh_keeps_other_tables_fetch_times(analyzer):
+    first = analyzer.scan(refresh=True)
+    names = list(first.strategy_data)
+
+    second = analyzer.refresh_strategies(names[:1], first)
+
+    assert second.fetched_at[names[0]] == second.created_at
+    assert all(second.fetched_at[name] == first.fetched_at[name] for name in names[1:])
+
+
+def test_staleness_is_measured_from_the_oldest_table(snapshot):
+    day_old = snapshot.created_at - pd.Timedelta(days=1)
+    names = list(snapshot.strategy_data)
+    fetched_at = {**{name: snapshot.created_at for name in names},
+                  names[2]: day_old, names[4]: day_old - pd.Timedelta(hours=1)}
+    aged = api.restore_snapshot(dict(snapshot.strategy_data), snapshot.version, snapshot.created_at,
+                                fetched_at=fetched_at)
+
+    assert aged.age_seconds < 3600
+    assert aged.data_age_seconds > 24 * 3600
+    assert aged.stale_strategies(3600) == [names[4], names[2]]
+
+
+def test_stale_tables_are_revalidated_through_the_scheduler(client, snapshot, monkeypatch):
+    names = list(snapshot.strategy_data)
+    stale = api.restore_snapshot(dict(snapshot.strategy_data), snapshot.version, snapshot.created_at,
+                                 fetched_at={names[0]: snapshot.created_at - pd.Timedelta(minutes=10)})
+    started = []
+    monkeypatch.setitem(api.cache, "snapshot", stale)
+    monkeypatch.setattr(api, "STALE_AFTER_SECONDS", 300.0)
+    monkeypatch.setattr(api, "refresh_due_strategies", started.append)
+    monkeypatch.setattr(api.leader_lease, "_fd", -1)
+    monkeypatch.setattr(api, "refresh_scheduler", api.RefreshScheduler(
+        {name: 3600 for name in names}, clock=lambda: pd.Timestamp("2026-10-14 04:30", tz="UTC").timestamp()))
+
+    response = client.post("/search", json={"min_strategies": 2})
+
+    assert response.headers["x-snapshot-stale"] == "true"
+    # Only the stale strategy is refreshed, well before its scheduled interval
+    assert started == [[names[0]]]
@@ -0,0 +1,67 @@
+import sqlite3
+from collections import deque
+
+import pandas as pd
+
+import api
+from store import SnapshotStore
+
+
+def test_snapshot_round_trips_through_the_store(tmp_path, snapshot):
+    store = SnapshotStore(str(tmp_path / "snapshots.db"))
+    store.save(snapshot)
+
+    stored = store.load()
+
+    assert stored.version == snapshot.version
+    assert stored.created_at == snapshot.created_at
+    assert list(stored.strategy_data) == list(snapshot.strategy_data)
+    for name, df in snapshot.strategy_data.items():
+        pd.testing.assert_frame_equal(stored.strategy_data[name], df.reset_index(drop=True), check_dtype=False)
+    assert stored.records[3] == snapshot.records(3)
+    assert stored.fetched_at == dict(snapshot.fetched_at)
+
+
+def test_store_keeps_only_recent_versions(tmp_path, snapshot):
+    store = SnapshotStore(str(tmp_path / "snapshots.db"), keep=2)
+    for version in range(1, 5):
+        store.save(api.restore_snapshot(dict(snapshot.strategy_data), version, snapshot.created_at))
+
+    assert store.latest_version() == 4
+    assert store.load(2) is None
+    assert store.load(3).version == 3
+
+
+def test_refresh_requests_are_taken_once(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.db"))
+
+    assert not store.take_refresh_request()
+    store.request_refresh()
+    assert store.take_refresh_request()
+    assert not store.take_refresh_request()
+
+
+def test_stores_without_fetch_times_still_load(tmp_path, snapshot):
+    path = str(tmp_path / "snapshots.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE strategy_tables (version INTEGER NOT NULL, position INTEGER NOT NULL, "
+                     "strategy TEXT NOT NULL, payload TEXT NOT NULL, PRIMARY KEY (version, strategy))")
+
+    store = SnapshotStore(path)
+    store.save(snapshot)
+
+    assert store.load().fetched_at == dict(snapshot.fetched_at)
+
+
+def test_restart_serves_the_stored_snapshot(client, snapshot, tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path / "snapshots.db"))
+    store.save(snapshot)
+    monkeypatch.setattr(api, "snapshot_store", store)
+    monkeypatch.setitem(api.cache, "snapshot", None)
+    monkeypatch.setattr(api, "snapshot_history", deque(maxlen=api.SNAPSHOT_HISTORY))
+
+    assert api.load_stored_snapshot()
+
+    body = client.post("/search", json={"min_strategies": 2}).json()
+    assert body["snapshot_version"] == snapshot.version
+    assert body["total"] == len(snapshot.records(2))
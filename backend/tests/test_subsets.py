@@ -0,0 +1,55 @@
+from itertools import combinations
+
+import api
+
+
+def short_names(snapshot):
+    return list(snapshot.short_names.values())
+
+
+def test_subset_sizes_match_brute_force(client, snapshot):
+    data = client.get("/subsets").json()["data"]
+    assert len(data) == 2 ** 7 - 1
+
+    members = {short: set(df["Name"]) for short, df in zip(short_names(snapshot), snapshot.strategy_data.values())}
+    for subset in data:
+        common = set.intersection(*(members[short] for short in subset["strategies"]))
+        assert subset["count"] == len(common)
+
+
+def test_subset_records_are_the_common_stocks(client, snapshot):
+    first, second = short_names(snapshot)[:2]
+    body = client.get("/subsets", params={"strategies": f"{first},{second}"}).json()
+
+    names = [df["Name"] for df in list(snapshot.strategy_data.values())[:2]]
+    assert body["strategies"] == [first, second]
+    assert {stock["Name"] for stock in body["data"]} == set(names[0]) & set(names[1])
+    assert body["total"] == len(body["data"])
+
+
+def test_unknown_strategy_is_an_error(client):
+    body = client.get("/subsets", params={"strategies": "S1,S99"}).json()
+    assert body["success"] is False
+    assert "S99" in body["message"]
+
+
+def test_subsets_do_not_evict_prebuilt_thresholds(client, snapshot):
+    warmed = len(api.encoded_responses)
+    for size in (2, 3):
+        for subset in combinations(short_names(snapshot), size):
+            assert client.get("/subsets", params={"strategies": ",".join(subset)}).status_code == 200
+
+    assert len(api.encoded_responses) == warmed
+    response = client.post("/search", json={"min_strategies": 2}, headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+
+
+def test_cooccurrence_is_pairwise_overlap(client, snapshot):
+    body = client.get("/cooccurrence").json()
+    assert body["strategies"] == short_names(snapshot)
+
+    tables = list(snapshot.strategy_data.values())
+    for i, j in combinations(range(7), 2):
+        shared = len(set(tables[i]["Name"]) & set(tables[j]["Name"]))
+        assert body["matrix"][i][j] == body["matrix"][j][i] == shared
+    assert [body["matrix"][i][i] for i in range(7)] == [len(df) for df in tables]
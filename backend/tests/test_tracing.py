@@ -0,0 +1,77 @@
+import api
+from scheduler import RefreshScheduler
+from tracing import profile, span, trace
+
+ADMIN_TOKEN = "secret"
+
+
+def test_spans_are_free_without_a_trace():
+    with span("anything") as outside:
+        outside.set(rows=1)
+
+    with trace() as active:
+        with span("outer"):
+            with span("inner", rows=3):
+                pass
+
+    stages = {stage["stage"]: stage for stage in active.breakdown()}
+    assert set(stages) == {"outer", "inner"}
+    assert active.spans[1].parent_id == active.spans[0].span_id
+    assert active.spans[1].attrs == {"rows": 3}
+
+
+def test_profiled_scan_breaks_down_every_stage(analyzer):
+    snapshot, scan_profile = profile(analyzer.scan, True, interval=0.001)
+
+    stages = {stage["stage"] for stage in scan_profile.stages}
+    assert snapshot.strategy_count == 7
+    assert {"profile", "scan", "fetch_all", "scrape", "fetch_page", "http", "parse", "build_snapshot"} <= stages
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in scan_profile.folded.splitlines())
+
+
+def admin(monkeypatch, profile_scan):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", ADMIN_TOKEN)
+    monkeypatch.setattr(api.leader_lease, "_fd", -1)
+    monkeypatch.setattr(api, "profile_scan", profile_scan)
+    monkeypatch.setattr(api, "refresh_scheduler", RefreshScheduler(
+        {name: 3600 for name in api.strategy_manager.get_all_strategies()}))
+
+
+def test_profile_endpoint_publishes_through_the_shared_scan(client, analyzer, snapshot, monkeypatch):
+    def profile_scan(refresh, interval, progress, base):
+        return profile(analyzer.scan, refresh, progress, base, interval=interval)
+
+    admin(monkeypatch, profile_scan)
+    events = []
+    monkeypatch.setattr(api.event_bus, "publish", lambda event, data: events.append(event))
+
+    response = client.post("/admin/profile", headers={"X-Admin-Token": ADMIN_TOKEN})
+    body = response.json()
+
+    assert body["success"]
+    assert body["snapshot_version"] == api.cache["snapshot"].version
+    assert any(stage["stage"] == "scan" for stage in body["stages"])
+    assert events[0] == "refresh-started" and events[-1] == "refresh-completed"
+    assert "strategy-progress" in events
+
+    folded = client.post("/admin/profile?format=folded", headers={"X-Admin-Token": ADMIN_TOKEN})
+    assert folded.headers["content-type"].startswith("text/plain")
+
+
+def test_failed_profiled_scan_is_reported(client, monkeypatch):
+    def profile_scan(refresh, interval, progress, base):
+        raise RuntimeError("upstream is down")
+
+    admin(monkeypatch, profile_scan)
+
+    body = client.post("/admin/profile", headers={"X-Admin-Token": ADMIN_TOKEN}).json()
+
+    assert body == {"success": False, "message": "Error: upstream is down"}
+    assert not api.cache["is_loading"]
+    assert not api.refresh_lock.locked()
+
+
+def test_profile_endpoint_needs_the_admin_token(client, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", ADMIN_TOKEN)
+
+    assert client.post("/admin/profile").status_code == 404
@@ -0,0 +1,296 @@
+import asyncio
+import contextvars
+import functools
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Tracing is off unless a trace is active in the current context, so spans on
+# the hot path cost one ContextVar lookup when nobody is looking.
+_active_trace: contextvars.ContextVar[Optional['Trace']] = contextvars.ContextVar('active_trace', default=None)
+_open_span: contextvars.ContextVar[Optional['SpanRecord']] = contextvars.ContextVar('open_span', default=None)
+
+
+@dataclass
+class SpanRecord:
+    """One timed stage of a traced run"""
+    span_id: int
+    name: str
+    parent_id: Optional[int]
+    thread: int
+    start: float
+    end: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Trace:
+    """Spans collected from every thread and task running under one trace"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[SpanRecord] = []
+        self._lock = threading.Lock()
+        # Open spans per thread, so a sampler can attribute stacks to stages
+        self._open: Dict[int, List[SpanRecord]] = {}
+
+    def _enter(self, name: str, attrs: Dict[str, Any]) -> SpanRecord:
+        parent = _open_span.get()
+        thread = threading.get_ident()
+        with self._lock:
+            record = SpanRecord(len(self.spans), name, parent.span_id if parent else None, thread,
+                                time.perf_counter(), attrs=attrs)
+            self.spans.append(record)
+            self._open.setdefault(thread, []).append(record)
+        return record
+
+    def _exit(self, record: SpanRecord) -> None:
+        record.end = time.perf_counter()
+        with self._lock:
+            open_spans = self._open.get(record.thread, [])
+            # Interleaved async tasks can close spans out of order
+            for i in range(len(open_spans) - 1, -1, -1):
+                if open_spans[i] is record:
+                    del open_spans[i]
+                    break
+            if not open_spans:
+                self._open.pop(record.thread, None)
+
+    def open_stages(self) -> Dict[int, str]:
+        """Innermost open span name for every thread currently inside the trace"""
+        with self._lock:
+            return {thread: spans[-1].name for thread, spans in self._open.items() if spans}
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """Per-stage count and total, mean, max and self time in seconds, slowest stage first
+
+        Self time subtracts children that ran on the same thread; stages that fan
+        out to worker threads keep their wall time.
+        """
+        with self._lock:
+            spans = list(self.spans)
+
+        child_time: Dict[int, float] = {}
+        for record in spans:
+            if record.parent_id is not None and spans[record.parent_id].thread == record.thread:
+                child_time[record.parent_id] = child_time.get(record.parent_id, 0.0) + record.duration
+
+        stages: Dict[str, Dict[str, Any]] = {}
+        for record in spans:
+            stage = stages.setdefault(record.name, {'stage': record.name, 'count': 0, 'total': 0.0,
+                                                    'self': 0.0, 'max': 0.0})
+            duration = record.duration
+            stage['count'] += 1
+            stage['total'] += duration
+            stage['self'] += max(0.0, duration - child_time.get(record.span_id, 0.0))
+            stage['max'] = max(stage['max'], duration)
+
+        result = []
+        for stage in stages.values():
+            stage['mean'] = stage['total'] / stage['count']
+            result.append({key: round(value, 6) if isinstance(value, float) else value
+                           for key, value in stage.items()})
+        return sorted(result, key=lambda stage: -stage['total'])
+
+
+class _Span:
+    __slots__ = ('_trace', '_name', '_attrs', '_record', '_token')
+
+    def __init__(self, trace: Trace, name: str, attrs: Dict[str, Any]):
+        self._trace = trace
+        self._name = name
+        self._attrs = attrs
+
+    def __enter__(self) -> '_Span':
+        self._record = self._trace._enter(self._name, self._attrs)
+        self._token = _open_span.set(self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _open_span.reset(self._token)
+        self._trace._exit(self._record)
+
+    def set(self, **attrs: Any) -> None:
+        self._record.attrs.update(attrs)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attrs: Any):
+    """Time a block as a stage of the active trace; a no-op when no trace is active"""
+    trace = _active_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name, attrs)
+
+
+def traced(name: str, describe: Optional[Callable[..., Dict[str, Any]]] = None):
+    """Decorator running a function or coroutine function inside a span
+
+    describe, if given, is called with the function's arguments to get span attributes.
+    """
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if _active_trace.get() is None:
+                    return await fn(*args, **kwargs)
+                with span(name, **(describe(*args, **kwargs) if describe else {})):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active_trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(name, **(describe(*args, **kwargs) if describe else {})):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def in_context(fn: Callable) -> Callable:
+    """Bind fn to a copy of the caller's context, so spans it opens on a pool thread join the trace"""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, fn)
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """Collect spans from everything run in this context until the block exits"""
+    active = Trace()
+    token = _active_trace.set(active)
+    try:
+        yield active
+    finally:
+        _active_trace.reset(token)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename.rsplit('/', 1)[-1]
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads inside a trace at a fixed interval
+
+    Only threads with an open span are sampled, so idle server threads stay out
+    of the profile. Stacks are kept in folded form ("root;...;leaf count"),
+    which flamegraph.pl and speedscope read directly.
+    """
+
+    def __init__(self, active: Trace, interval: float = 0.005, max_depth: int = 128):
+        self.trace = active
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.stage_samples: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        stages = self.trace.open_stages()
+        if not stages:
+            return
+        frames = sys._current_frames()
+        names = {thread.ident: re.sub(r'[_-]\d+$', '', thread.name) for thread in threading.enumerate()}
+        for thread, stage in stages.items():
+            frame = frames.get(thread)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                # The span wrappers themselves are just noise in a flame graph
+                if frame.f_code.co_filename != __file__:
+                    stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread, str(thread)))
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.stage_samples[stage] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> 'SamplingProfiler':
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'SamplingProfiler':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def folded(self) -> str:
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common()) + '\n'
+
+
+@dataclass
+class Profile:
+    """Result of a profiled run: wall time, per-stage breakdown and folded stacks"""
+    duration: float
+    interval: float
+    samples: int
+    stages: List[Dict[str, Any]]
+    stage_samples: Dict[str, int]
+    folded: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'duration': round(self.duration, 6),
+            'interval': self.interval,
+            'samples': self.samples,
+            'stages': self.stages,
+            'stage_samples': self.stage_samples,
+            'folded': self.folded
+        }
+
+
+def profile(fn: Callable[..., Any], *args: Any, interval: float = 0.005, **kwargs: Any) -> Tuple[Any, Profile]:
+    """Run fn under a trace and a sampling profiler, returning its result and the profile"""
+    with trace() as active, SamplingProfiler(active, interval) as profiler:
+        started = time.perf_counter()
+        with span('profile'):
+            result = fn(*args, **kwargs)
+        duration = time.perf_counter() - started
+
+    return result, Profile(
+        duration=duration,
+        interval=interval,
+        samples=profiler.samples,
+        stages=active.breakdown(),
+        stage_samples=dict(profiler.stage_samples.most_common()),
+        folded=profiler.folded()
+    )
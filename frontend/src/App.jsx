@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import './App.css';
 
 console.log('=== DEBUG INFO ===');
@@ -15,6 +15,9 @@ function App() {
   const [loading, setLoading] = useState(false);
   const [serverStatus, setServerStatus] = useState(null);
   const [refreshing, setRefreshing] = useState(false);
+  // Snapshot version of the results on screen, and the latest search handler for event callbacks
+  const shownVersion = useRef(null);
+  const searchRef = useRef(null);
   
 
   // Check server status on mount
@@ -22,6 +25,21 @@ function App() {
     checkServerStatus();
   }, []);
 
+  // Follow refreshes as the server pushes them instead of polling /status
+  useEffect(() => {
+    const events = new EventSource(`${API_BASE_URL}/events`);
+    events.addEventListener('refresh-started', () => checkServerStatus());
+    events.addEventListener('refresh-completed', (event) => {
+      checkServerStatus();
+      // Refetch once when results are showing and a new snapshot was published
+      const { snapshot_version } = JSON.parse(event.data);
+      if (shownVersion.current !== null && snapshot_version !== shownVersion.current) {
+        searchRef.current();
+      }
+    });
+    return () => events.close();
+  }, []);
+
   const checkServerStatus = async () => {
     try {
       const response = await fetch(`${API_BASE_URL}/status`);
@@ -47,6 +65,7 @@ function App() {
       });
       
       const data = await response.json();
+      shownVersion.current = data.snapshot_version ?? null;
       setResults(data);
       
       // Update server status after search
@@ -64,6 +83,8 @@ function App() {
     }
   };
 
+  searchRef.current = handleSearch;
+
   const handleRefreshCache = async () => {
     if (refreshing) return;
     
@@ -172,7 +193,7 @@ function App() {
                 <span className="background-loading">📊 PRE-LOADING STRATEGIES...</span>
               )}
               <div className="cache-info">
-                <span className="cache-refresh-info">🕐 Auto-refresh every 3 hours</span>
+                <span className="cache-refresh-info">🕐 Auto-refresh per strategy, more often while the market is open</span>
               </div>
             </div>
           )}